@@ -0,0 +1,304 @@
+# analytics.py
+#
+# Columnar vote/round analytics for the deploy server: rows are appended to
+# fixed-width binary files and aggregated with numpy (optional; without it the
+# store stays disabled).
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+log = logging.getLogger("overlay")
+
+ROUND_OUTCOMES = ("no_votes", "no_voters", "placed", "placement_timeout")  # as in overlay_rounds_total
+
+
+class AnalyticsStore:
+    # Append-only columnar store. Each UTC day is a directory holding one file
+    # per table (rounds.bin, votes.bin) of packed little-endian records, laid
+    # out as described by the day's schema.json. Queries numpy.memmap those
+    # files and aggregate whole columns, so no per-row Python objects are built
+    # even over millions of rounds. Room names and user ids are stored as
+    # integer codes; rooms.txt / users.txt at the top level list them in code
+    # order. Rows are buffered on the loop and written by one worker thread,
+    # which is also the only place codes are handed out.
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, root: str, item_keys, flush_seconds: float = 2.0, max_buffer: int = 200000,
+                 user_names: Optional[Dict[str, str]] = None):
+        self.root = Path(root) if root else None
+        self.enabled = self.root is not None and np is not None
+        self.items = list(item_keys)
+        self.flush_seconds = flush_seconds
+        self.max_buffer = max_buffer
+        self.user_names = user_names if user_names is not None else {}  # user id -> display name
+        self.item_index: Dict[str, int] = {k: i for i, k in enumerate(self.items)}
+        self.rounds: list = []  # (ts, room, round_id, winner, outcome, voters, votes per item)
+        self.votes: list = []   # (ts, room, round_id, user_id, item, previous item)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics")
+
+        # Code dictionaries, loaded on first use by the writer or a query
+        self.load_lock = threading.Lock()
+        self.loaded = False
+        self.room_codes: Dict[str, int] = {}
+        self.room_names: list = []
+        self.user_codes: Dict[str, int] = {}
+        self.user_ids: list = []
+        self.segment_dirs: Dict[str, Path] = {}  # day -> directory written today
+
+        # metrics
+        self.records = 0
+        self.dropped = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    @staticmethod
+    def round_dtype(n_items: int):
+        return np.dtype([("ts", "<f8"), ("room", "<u2"), ("round_id", "<u4"), ("winner", "i1"),
+                         ("outcome", "i1"), ("voters", "<u4"), ("votes", "<u4", (n_items,))])
+
+    @staticmethod
+    def vote_dtype():
+        return np.dtype([("ts", "<f8"), ("room", "<u2"), ("round_id", "<u4"), ("user", "<u4"),
+                         ("item", "i1"), ("previous", "i1")])
+
+    # --- recording (event loop) ---
+    def record_round(self, room, round_id: int, winner_key: Optional[str], votes: Dict[str, int],
+                     voters: int, outcome: str) -> None:
+        if self.enabled:
+            self._append(self.rounds, (time.time(), room.name, round_id, self.item_index.get(winner_key, -1),
+                                       ROUND_OUTCOMES.index(outcome), voters, [votes.get(k, 0) for k in self.items]))
+
+    def record_vote(self, room, user_id: str, item_key: str, previous: Optional[str]) -> None:
+        if self.enabled:
+            self._append(self.votes, (time.time(), room.name, room.round_id, user_id, self.item_index[item_key],
+                                      self.item_index.get(previous, -1)))
+
+    def _append(self, buffer: list, row: tuple) -> None:
+        if len(self.rounds) + len(self.votes) >= self.max_buffer:
+            self.dropped += 1
+            return
+        buffer.append(row)
+        self.records += 1
+
+    async def run(self) -> None:
+        if not self.enabled:
+            return
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.rounds and not self.votes:
+            return
+        rounds, votes = self.rounds, self.votes
+        self.rounds, self.votes = [], []
+        t0 = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._write, rounds, votes)
+        except Exception as e:
+            self.last_error = str(e)
+            log.error("Analytics write failed: %s", e, extra={"category": "analytics", "fields": {
+                "records": len(rounds) + len(votes)}})
+            return
+        self.batches += 1
+        self.last_flush_ms = (time.perf_counter() - t0) * 1000.0
+
+    async def close(self) -> None:
+        if self.enabled:
+            await self.flush()
+        self.executor.shutdown(wait=True)
+
+    # --- writing (analytics thread) ---
+    def _load(self) -> None:
+        with self.load_lock:
+            if self.loaded:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            for path, codes, names in ((self.root / "rooms.txt", self.room_codes, self.room_names),
+                                       (self.root / "users.txt", self.user_codes, self.user_ids)):
+                if path.exists():
+                    with open(path, "r", encoding="utf-8") as f:
+                        for line in f:
+                            name = line.rstrip("\n")
+                            codes.setdefault(name, len(names))
+                            names.append(name)
+            self.loaded = True
+
+    def _encode(self, values, codes: Dict[str, int], names: list, path: Path) -> list:
+        out, new = [], []
+        for value in values:
+            value = str(value).replace("\n", " ")
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(names)
+                names.append(value)
+                new.append(value)
+            out.append(code)
+        if new:
+            # Dictionary first, so every code on disk can be resolved
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(v + "\n" for v in new))
+        return out
+
+    def _segment_dir(self, day: str) -> Path:
+        path = self.segment_dirs.get(day)
+        if path is not None:
+            return path
+        schema = {"version": self.SCHEMA_VERSION, "items": self.items}
+        n = 0
+        while True:
+            # A day written with a different item list continues in "<day>.1", ...
+            path = self.root / (day if n == 0 else f"{day}.{n}")
+            schema_path = path / "schema.json"
+            if not schema_path.exists():
+                path.mkdir(parents=True, exist_ok=True)
+                schema_path.write_text(json.dumps(schema), encoding="utf-8")
+                break
+            if json.loads(schema_path.read_text(encoding="utf-8")) == schema:
+                break
+            n += 1
+        self.segment_dirs = {day: path}  # only the current day is ever appended to
+        return path
+
+    def _write(self, rounds: list, votes: list) -> None:
+        self._load()
+        for table, rows in (("rounds", rounds), ("votes", votes)):
+            by_day: Dict[str, list] = {}
+            for row in rows:
+                by_day.setdefault(time.strftime("%Y-%m-%d", time.gmtime(row[0])), []).append(row)
+            for day, day_rows in sorted(by_day.items()):
+                arr = self._columns(table, day_rows)
+                with open(self._segment_dir(day) / f"{table}.bin", "ab") as f:
+                    f.write(arr.tobytes())
+
+    def _columns(self, table: str, rows: list):
+        if table == "rounds":
+            arr = np.zeros(len(rows), self.round_dtype(len(self.items)))
+            arr["winner"] = [r[3] for r in rows]
+            arr["outcome"] = [r[4] for r in rows]
+            arr["voters"] = [r[5] for r in rows]
+            arr["votes"] = [r[6] for r in rows]
+        else:
+            arr = np.zeros(len(rows), self.vote_dtype())
+            arr["user"] = self._encode([r[3] for r in rows], self.user_codes, self.user_ids, self.root / "users.txt")
+            arr["item"] = [r[4] for r in rows]
+            arr["previous"] = [r[5] for r in rows]
+        arr["ts"] = [r[0] for r in rows]
+        arr["room"] = self._encode([r[1] for r in rows], self.room_codes, self.room_names, self.root / "rooms.txt")
+        arr["round_id"] = [r[2] for r in rows]
+        return arr
+
+    # --- queries (worker thread) ---
+    def _segments(self, table: str, room: Optional[str], start: Optional[str], end: Optional[str]):
+        # -> (item keys, memory-mapped rows of `room`) per day segment in [start, end], oldest first
+        self._load()
+        room_code = None
+        if room is not None:
+            room_code = self.room_codes.get(room)
+            if room_code is None:
+                return
+        for path in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            day = path.name[:10]
+            if (start and day < start) or (end and day > end):
+                continue
+            data_path, schema_path = path / f"{table}.bin", path / "schema.json"
+            if not data_path.exists() or not schema_path.exists():
+                continue
+            items = json.loads(schema_path.read_text(encoding="utf-8"))["items"]
+            dtype = self.round_dtype(len(items)) if table == "rounds" else self.vote_dtype()
+            n = data_path.stat().st_size // dtype.itemsize  # a batch being appended is not counted yet
+            if not n:
+                continue
+            arr = np.memmap(data_path, dtype=dtype, mode="r", shape=(n,))
+            yield items, arr if room_code is None else arr[arr["room"] == room_code]
+
+    def win_rates(self, room: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None) -> dict:
+        rounds = decided = 0
+        totals: Dict[str, list] = {k: [0, 0, 0] for k in self.items}  # wins, placed, final votes
+        placed_code = ROUND_OUTCOMES.index("placed")
+        for items, arr in self._segments("rounds", room, start, end):
+            winner = arr["winner"]
+            won = winner >= 0
+            rounds += len(arr)
+            decided += int(won.sum())
+            wins = np.bincount(winner[won], minlength=len(items))
+            placed = np.bincount(winner[won & (arr["outcome"] == placed_code)], minlength=len(items))
+            votes = arr["votes"].sum(axis=0, dtype=np.int64)
+            for i, key in enumerate(items):
+                row = totals.setdefault(key, [0, 0, 0])
+                row[0] += int(wins[i])
+                row[1] += int(placed[i])
+                row[2] += int(votes[i])
+        all_votes = sum(row[2] for row in totals.values())
+        return {
+            "rounds": rounds,
+            "decided": decided,
+            "items": {key: {
+                "wins": wins,
+                "win_rate": round(wins / decided, 4) if decided else 0.0,
+                "placed": placed,
+                "placement_rate": round(placed / wins, 4) if wins else 0.0,
+                "votes": votes,
+                "vote_share": round(votes / all_votes, 4) if all_votes else 0.0,
+            } for key, (wins, placed, votes) in totals.items()},
+        }
+
+    def votes_per_round(self, room: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                        percentiles: tuple = (50, 90, 99)) -> dict:
+        # Final votes per round (one per voter) over every round, including empty ones
+        parts = [arr["votes"].sum(axis=1, dtype=np.int64) for _, arr in self._segments("rounds", room, start, end)]
+        votes = np.concatenate(parts) if parts else np.zeros(0, np.int64)
+        if not len(votes):
+            return {"rounds": 0}
+        return {
+            "rounds": int(len(votes)),
+            "empty_rounds": int((votes == 0).sum()),
+            "mean": round(float(votes.mean()), 3),
+            "max": int(votes.max()),
+            "percentiles": {f"p{p:g}": float(v) for p, v in zip(percentiles, np.percentile(votes, percentiles))},
+        }
+
+    def top_voters(self, room: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                   limit: int = 10) -> dict:
+        # Votes cast (switching counts as a new vote) per user code, summed over segments
+        counts = np.zeros(0, np.int64)
+        for _, arr in self._segments("votes", room, start, end):
+            c = np.bincount(arr["user"])
+            if len(c) > len(counts):
+                counts = np.pad(counts, (0, len(c) - len(counts)))
+            counts[:len(c)] += c
+        voters = int(np.count_nonzero(counts))
+        k = min(max(1, limit), voters)
+        top = np.argpartition(-counts, k - 1)[:k] if k else np.zeros(0, np.int64)
+        top = top[np.argsort(-counts[top], kind="stable")]
+        return {
+            "voters": voters,
+            "votes": int(counts.sum()),
+            "top": [{"user_id": self.user_ids[c], "name": self.user_names.get(self.user_ids[c]),
+                     "votes": int(counts[c])} for c in top.tolist()],
+        }
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "path": str(self.root) if self.root else None,
+            "buffered": len(self.rounds) + len(self.votes),
+            "records": self.records,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "flush_ms_last": round(self.last_flush_ms, 3),
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# bench_codec.py
+#
+# Compares the runtime backends python_server_deploy.py can pick at startup
+# (JSON_BACKEND / EVENT_LOOP) on the overlay's own message mix:
+#
+#   - JSON: encode the server -> overlay mix (votes_delta, mouse_event, state,
+#     round/placement announcements, pong) and decode the overlay -> server
+#     mix (mouse_event, vote_click, ping, overlay_hello), for every installed
+#     backend (json, ujson, orjson)
+#   - event loop: one publisher fanning encoded frames out to N per-client
+#     queues + writer tasks (what BroadcastHub does), and framed messages over
+#     a loopback TCP stream (what the state bus and game link do), for asyncio
+#     and, if installed, uvloop
+#
+#   python bench_codec.py                       # everything available
+#   python bench_codec.py --messages 200000 --out bench_codec.json
+
+import os
+import sys
+import json
+import time
+import struct
+import random
+import asyncio
+import argparse
+import platform
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("JOURNAL_FILE", os.path.join(os.environ.get("TMPDIR", "/tmp"), "bench_journal.jsonl"))
+
+import python_server_deploy as srv
+
+
+# =========================
+# Message mix
+# =========================
+def outbound_mix(rng: random.Random) -> list:
+    # (weight, payload) shaped like what the server actually broadcasts
+    keys = list(srv.ITEMS.keys())
+    state = {
+        "type": "state",
+        "round": {"active": True, "round_id": 412, "duration_remaining": 7},
+        "votes": {k: rng.randint(0, 500) for k in keys},
+        "pending_placement": None,
+        "options": srv.item_options(),
+        "version": 1792335087387,
+    }
+    return [
+        (40, {"type": "votes_delta", "round_id": 412,
+              "votes": {k: rng.randint(0, 500) for k in rng.sample(keys, 3)}}),
+        (40, {"type": "mouse_event", "mouse_type": 2, "x": rng.randint(0, 960), "y": rng.randint(0, 640)}),
+        (10, state),
+        (5, {"type": "placement_request", "round_id": 412, "item_key": "fire", "emoji": "🔥",
+             "label": "Power Core", "chosen_user": "viewer_123", "chosen_user_id": "123456789",
+             "hint": "Click the overlay to place your item!"}),
+        (5, {"type": "pong", "t": int(time.time() * 1000)}),
+    ]
+
+def inbound_mix(rng: random.Random) -> list:
+    return [
+        (60, json.dumps({"type": "mouse_event", "mouse_type": 0, "x": rng.randint(0, 960), "y": rng.randint(0, 640)})),
+        (30, json.dumps({"type": "vote_click", "item": rng.choice(list(srv.ITEMS.keys()))})),
+        (5, json.dumps({"type": "ping"})),
+        (5, json.dumps({"type": "overlay_hello", "want_state": True, "twitch_user_id": "123456789",
+                        "protocol": "compact", "version": 1792335087387})),
+    ]
+
+def expand(mix: list, n: int, rng: random.Random) -> list:
+    weights = [w for w, _ in mix]
+    items = [m for _, m in mix]
+    return rng.choices(items, weights=weights, k=n)
+
+
+# =========================
+# JSON backends
+# =========================
+def bench_json(name: str, messages: int, rng: random.Random):
+    backend, dumpb, loads = srv.load_json_backend(name)
+    if backend != name:
+        return None  # not installed
+    outbound = expand(outbound_mix(rng), messages, rng)
+    inbound = expand(inbound_mix(rng), messages, rng)
+
+    t0 = time.perf_counter()
+    nbytes = 0
+    for msg in outbound:
+        nbytes += len(dumpb(msg))
+    encode_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for raw in inbound:
+        loads(raw)
+    decode_s = time.perf_counter() - t0
+
+    return {
+        "backend": backend,
+        "encode_msgs_per_s": round(messages / encode_s),
+        "encode_us_per_msg": round(1e6 * encode_s / messages, 3),
+        "encode_avg_bytes": round(nbytes / messages, 1),
+        "decode_msgs_per_s": round(messages / decode_s),
+        "decode_us_per_msg": round(1e6 * decode_s / messages, 3),
+    }
+
+
+# =========================
+# Event loops
+# =========================
+async def fanout(frames: list, clients: int) -> float:
+    queues = [asyncio.Queue(maxsize=256) for _ in range(clients)]
+    received = [0]
+    done = asyncio.Event()
+    total = len(frames) * clients
+
+    async def writer(q):
+        while True:
+            await q.get()
+            received[0] += 1
+            if received[0] == total:
+                done.set()
+
+    tasks = [asyncio.create_task(writer(q)) for q in queues]
+    t0 = time.perf_counter()
+    for i, frame in enumerate(frames):
+        for q in queues:
+            while q.full():
+                await asyncio.sleep(0)
+            q.put_nowait(frame)
+        if i % 64 == 0:
+            await asyncio.sleep(0)
+    await done.wait()
+    elapsed = time.perf_counter() - t0
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return elapsed
+
+async def stream(frames: list) -> float:
+    # '<I' length-prefixed frames over loopback TCP, read back with readexactly
+    got = asyncio.get_running_loop().create_future()
+
+    async def handle(reader, writer):
+        count = 0
+        try:
+            while count < len(frames):
+                header = await reader.readexactly(4)
+                await reader.readexactly(struct.unpack('<I', header)[0])
+                count += 1
+        finally:
+            got.set_result(count)
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    t0 = time.perf_counter()
+    for i in range(0, len(frames), 32):
+        writer.writelines(struct.pack('<I', len(f)) + f for f in frames[i:i + 32])
+        await writer.drain()
+    await got
+    elapsed = time.perf_counter() - t0
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    return elapsed
+
+def bench_loop(name: str, messages: int, clients: int, rng: random.Random):
+    if name == "uvloop":
+        try:
+            import uvloop
+        except ImportError:
+            return None
+        loop = uvloop.new_event_loop()
+    else:
+        loop = asyncio.new_event_loop()
+    _, dumpb, _ = srv.load_json_backend("json")
+    frames = [dumpb(m) for m in expand(outbound_mix(rng), messages, rng)]
+    fanout_frames = frames[:max(1, messages // clients)]
+    try:
+        fanout_s = loop.run_until_complete(fanout(fanout_frames, clients))
+        stream_s = loop.run_until_complete(stream(frames))
+    finally:
+        loop.close()
+    delivered = len(fanout_frames) * clients
+    return {
+        "loop": name,
+        "fanout_clients": clients,
+        "fanout_deliveries_per_s": round(delivered / fanout_s),
+        "stream_frames_per_s": round(len(frames) / stream_s),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JSON codecs and event loops on the overlay message mix.")
+    parser.add_argument("--messages", type=int, default=100000, help="messages per measurement")
+    parser.add_argument("--clients", type=int, default=500, help="queues in the fan-out measurement")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "server_default_json": srv.JSON_BACKEND_NAME,
+        },
+        "json": [],
+        "loop": [],
+    }
+    for name in ("json", "ujson", "orjson"):
+        result = bench_json(name, args.messages, random.Random(args.seed))
+        if result is not None:
+            report["json"].append(result)
+    for name in ("asyncio", "uvloop"):
+        result = bench_loop(name, args.messages, args.clients, random.Random(args.seed))
+        if result is not None:
+            report["loop"].append(result)
+
+    base = report["json"][0]
+    for r in report["json"]:
+        r["encode_speedup"] = round(base["encode_us_per_msg"] / r["encode_us_per_msg"], 2)
+        r["decode_speedup"] = round(base["decode_us_per_msg"] / r["decode_us_per_msg"], 2)
+    base = report["loop"][0]
+    for r in report["loop"]:
+        r["fanout_speedup"] = round(r["fanout_deliveries_per_s"] / base["fanout_deliveries_per_s"], 2)
+        r["stream_speedup"] = round(r["stream_frames_per_s"] / base["stream_frames_per_s"], 2)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Saved to {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# bench_server.py
+#
+# Load generator / benchmark for python_server_deploy.py.
+#
+# Starts the aiohttp app in-process (no Twitch connection: the synthetic chat
+# source feeds !item commands through the normal command path), then opens many simulated overlays on /ws from
+# separate client processes. Each overlay sends overlay_hello, vote_click and
+# (for a few "placers") mouse_event traffic, in JSON or the compact binary
+# protocol (--protocol compact), optionally subscribed to only some broadcast
+# topics (--topics votes,round).
+#
+# Measured:
+#   - broadcast latency p50/p99: the server publishes a timestamped probe frame
+#     through the broadcast hub and every client records when it arrives
+#   - server CPU per message (process_time of the server process only)
+#   - server memory per connection (RSS delta after all clients connected)
+#
+# Results are written as JSON so runs can be compared across changes:
+#   python bench_server.py --clients 2000 --duration 20 --out bench_results.json
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import random
+import struct
+import subprocess
+import multiprocessing as mp
+
+# Keep the server quiet and its journal out of the working tree
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("JOURNAL_FILE", os.path.join(os.environ.get("TMPDIR", "/tmp"), "bench_journal.jsonl"))
+os.environ.setdefault("ANALYTICS_DIR", os.path.join(os.environ.get("TMPDIR", "/tmp"), "bench_analytics"))
+
+import aiohttp
+from aiohttp import web
+
+import python_server_deploy as srv
+from compact import OP_MOUSE_INPUT, OP_VOTE_CLICK
+
+
+# =========================
+# Helpers
+# =========================
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is KiB on Linux, bytes on macOS; peak rather than current
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+# =========================
+# Client processes
+# =========================
+async def run_overlay(session, url, user_id, args, stats, stop_at, placer):
+    try:
+        ws = await session.ws_connect(url, heartbeat=None, max_msg_size=0)
+    except Exception:
+        stats["connect_errors"] += 1
+        return
+    stats["connected"] += 1
+
+    compact = args.protocol == "compact"
+    hello = {"type": "overlay_hello", "want_state": True, "twitch_user_id": user_id, "protocol": args.protocol}
+    if args.topics:
+        hello["topics"] = args.topics.split(",")
+    await ws.send_str(json.dumps(hello))
+    stats["sent"] += 1
+
+    async def reader():
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.BINARY:
+                stats["received"] += 1
+                stats["bytes"] += len(msg.data)
+                continue
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            stats["received"] += 1
+            stats["bytes"] += len(msg.data)
+            if '"bench_probe"' in msg.data[:40]:
+                t = json.loads(msg.data)["t"]
+                stats["latencies"].append((time.monotonic() - t) * 1000.0)
+
+    read_task = asyncio.create_task(reader())
+    keys = list(srv.ITEMS.keys())
+    mouse_interval = 1.0 / args.mouse_hz if args.mouse_hz > 0 else None
+    vote_interval = 1.0 / args.vote_rate if args.vote_rate > 0 else None
+    next_vote = time.monotonic() + (random.random() * vote_interval if vote_interval else 0)
+    try:
+        while time.monotonic() < stop_at and not ws.closed:
+            now = time.monotonic()
+            if vote_interval and now >= next_vote:
+                item = random.choice(keys)
+                if compact:
+                    await ws.send_bytes(bytes((OP_VOTE_CLICK, srv.ITEM_TYPE_MAP[item])))
+                else:
+                    await ws.send_str(json.dumps({"type": "vote_click", "item": item}))
+                stats["sent"] += 1
+                next_vote = now + random.expovariate(1.0 / vote_interval)
+            if placer and mouse_interval:
+                x, y = random.randint(0, 960), random.randint(0, 640)
+                if compact:
+                    await ws.send_bytes(struct.pack("<BBhh", OP_MOUSE_INPUT, 0, x, y))
+                else:
+                    await ws.send_str(json.dumps({"type": "mouse_event", "mouse_type": 0, "x": x, "y": y}))
+                stats["sent"] += 1
+                await asyncio.sleep(mouse_interval)
+            else:
+                await asyncio.sleep(min(0.05, max(0.0, next_vote - now)) if vote_interval else 0.05)
+    finally:
+        read_task.cancel()
+        await ws.close()
+
+async def client_process_main(index, url, user_ids, args, stop_at, result_queue):
+    stats = {"connected": 0, "connect_errors": 0, "sent": 0, "received": 0, "bytes": 0, "latencies": []}
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = []
+        for n, user_id in enumerate(user_ids):
+            placer = index == 0 and n < args.placers
+            tasks.append(asyncio.create_task(run_overlay(session, url, user_id, args, stats, stop_at, placer)))
+            if args.connect_rate > 0:
+                await asyncio.sleep(1.0 / args.connect_rate)
+        await asyncio.gather(*tasks, return_exceptions=True)
+    result_queue.put(stats)
+
+def client_process(index, url, user_ids, args, stop_at, result_queue):
+    asyncio.run(client_process_main(index, url, user_ids, args, stop_at, result_queue))
+
+
+# =========================
+# Server side
+# =========================
+async def probe_loop(args, stop_at):
+    while time.monotonic() < stop_at:
+        srv.default_room.hub.publish(srv.encode_ws({"type": "bench_probe", "t": time.monotonic()}))
+        await asyncio.sleep(args.probe_interval)
+
+async def bench(args):
+    # One long round for the whole run
+    srv.ROUND_DURATION = int(args.duration + args.warmup + 60)
+
+    app = srv.create_app()
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    port = runner.addresses[0][1]
+    url = f"http://127.0.0.1:{port}/ws"
+
+    tasks = srv.start_background_tasks()
+    await asyncio.sleep(3.5)  # rounds_loop opens the first round after 3s
+
+    rss_before = rss_bytes()
+    loop = asyncio.get_running_loop()
+    stop_at = time.monotonic() + args.warmup + args.duration
+
+    ctx = mp.get_context("spawn")
+    result_queue = ctx.Queue()
+    user_ids = [f"viewer{i}" for i in range(args.clients)]
+    procs = []
+    for i in range(args.procs):
+        chunk = user_ids[i::args.procs]
+        p = ctx.Process(target=client_process, args=(i, url, chunk, args, stop_at, result_queue), daemon=True)
+        p.start()
+        procs.append(p)
+
+    await asyncio.sleep(args.warmup)
+    rss_connected = rss_bytes()
+    clients_connected = srv.total_clients()
+
+    chat = srv.SyntheticChatSource(users=args.chat_users, rate=args.chat_rate, switch_prob=args.chat_switch,
+                                   burst_every=args.chat_burst_every, seed=1)
+    srv.chat_source = chat
+    frames_before = srv.broadcast_totals()["frames_sent"]
+    cpu_before = time.process_time()
+    wall_before = time.monotonic()
+    side_tasks = [asyncio.create_task(chat.run()),
+                  asyncio.create_task(probe_loop(args, stop_at))]
+
+    await asyncio.sleep(max(0.0, stop_at - time.monotonic()))
+    cpu_used = time.process_time() - cpu_before
+    wall = time.monotonic() - wall_before
+    hub_stats = srv.broadcast_totals()
+    frames_out = hub_stats["frames_sent"] - frames_before
+
+    results = [await loop.run_in_executor(None, result_queue.get) for _ in procs]
+    for p in procs:
+        p.join(timeout=5)
+    for t in side_tasks:
+        t.cancel()
+    await srv.stop_background_tasks(tasks)
+    await runner.cleanup()
+
+    latencies = sorted(l for r in results for l in r["latencies"])
+    msgs_in = sum(r["sent"] for r in results) + chat.generated
+    messages = msgs_in + frames_out
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "aiohttp": aiohttp.__version__,
+            "event_loop": args.loop_impl,
+            "json_backend": srv.JSON_BACKEND_NAME,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "loop_impl")},
+        "results": {
+            "clients_requested": args.clients,
+            "clients_connected": clients_connected,
+            "connect_errors": sum(r["connect_errors"] for r in results),
+            "wall_s": round(wall, 3),
+            "messages_in": msgs_in,
+            "chat_messages": chat.generated,
+            "frames_out": frames_out,
+            "messages_in_per_s": round(msgs_in / wall, 1) if wall else 0.0,
+            "frames_out_per_s": round(frames_out / wall, 1) if wall else 0.0,
+            "server_cpu_s": round(cpu_used, 3),
+            "server_cpu_pct": round(100.0 * cpu_used / wall, 1) if wall else 0.0,
+            "cpu_us_per_message": round(1e6 * cpu_used / messages, 2) if messages else 0.0,
+            "rss_before_mb": round(rss_before / 2**20, 2),
+            "rss_connected_mb": round(rss_connected / 2**20, 2),
+            "rss_per_connection_kb": round((rss_connected - rss_before) / 1024 / clients_connected, 2) if clients_connected else 0.0,
+            "probes_received": len(latencies),
+            "broadcast_latency_p50_ms": round(percentile(latencies, 50), 3),
+            "broadcast_latency_p90_ms": round(percentile(latencies, 90), 3),
+            "broadcast_latency_p99_ms": round(percentile(latencies, 99), 3),
+            "broadcast_latency_max_ms": round(latencies[-1], 3) if latencies else 0.0,
+            "client_bytes_received": sum(r["bytes"] for r in results),
+            "hub": hub_stats,
+        },
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the overlay WebSocket/vote server.")
+    parser.add_argument("--clients", type=int, default=1000, help="simulated overlays")
+    parser.add_argument("--procs", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="client processes")
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds for clients to connect before measuring")
+    parser.add_argument("--connect-rate", type=float, default=500.0, help="new connections per second per client process")
+    parser.add_argument("--vote-rate", type=float, default=0.2, help="vote_click per second per overlay")
+    parser.add_argument("--chat-rate", type=float, default=200.0, help="fake !item commands per second")
+    parser.add_argument("--chat-users", type=int, default=5000)
+    parser.add_argument("--chat-switch", type=float, default=0.1, help="chance a repeat chat voter switches item")
+    parser.add_argument("--chat-burst-every", type=float, default=0.0, help="seconds between chat bursts (0 = off)")
+    parser.add_argument("--placers", type=int, default=1, help="overlays streaming mouse_event")
+    parser.add_argument("--mouse-hz", type=float, default=120.0)
+    parser.add_argument("--protocol", choices=("json", "compact"), default="json", help="overlay wire protocol")
+    parser.add_argument("--topics", default="", help="broadcast topics overlays subscribe to, e.g. votes,round (default all)")
+    parser.add_argument("--probe-interval", type=float, default=0.25)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--loop", choices=("auto", "uvloop", "asyncio"), default=srv.EVENT_LOOP,
+                        help="server event loop (JSON_BACKEND env picks the codec)")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args(argv)
+    args.procs = max(1, min(args.procs, args.clients))
+
+    args.loop_impl = srv.install_event_loop(args.loop)
+    report = asyncio.run(bench(args))
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["results"], indent=2))
+    print(f"Saved to {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
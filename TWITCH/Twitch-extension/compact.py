@@ -0,0 +1,50 @@
+# compact.py
+#
+# Compact wire protocol between the deploy server and the overlay.
+#
+# An overlay can ask for "protocol": "compact" in overlay_hello. The hot frames
+# (votes_delta and mouse_event, both directions) then travel as small
+# little-endian binary messages with items as ITEM_TYPE_MAP indexes; everything
+# else stays JSON text. Overlays that do not ask keep getting plain JSON.
+
+import struct
+from typing import Dict, Optional
+
+from event_injector import ITEM_TYPE_MAP
+
+OP_VOTES_DELTA = 0x01  # server: <B op><I round_id><B n> then n * <B item><I count>
+OP_MOUSE_EVENT = 0x02  # server: <B op><B mouse_type><h x><h y>
+OP_VOTE_CLICK = 0x81   # client: <B op><B item>
+OP_MOUSE_INPUT = 0x82  # client: <B op><B mouse_type><h x><h y>
+
+ITEM_BY_INDEX = {v: k for k, v in ITEM_TYPE_MAP.items()}
+
+_COMPACT_DELTA_HEAD = struct.Struct("<BIB")
+_COMPACT_DELTA_ITEM = struct.Struct("<BI")
+_COMPACT_MOUSE = struct.Struct("<BBhh")
+
+
+def _clamp_i16(v: int) -> int:
+    return max(-32768, min(32767, int(v)))
+
+def compact_votes_delta(round_id: int, votes: Dict[str, int]) -> bytes:
+    parts = [_COMPACT_DELTA_HEAD.pack(OP_VOTES_DELTA, round_id & 0xFFFFFFFF, len(votes))]
+    for key, count in votes.items():
+        parts.append(_COMPACT_DELTA_ITEM.pack(ITEM_TYPE_MAP[key], count))
+    return b"".join(parts)
+
+def compact_mouse_event(m_state: int, x: int, y: int) -> bytes:
+    return _COMPACT_MOUSE.pack(OP_MOUSE_EVENT, m_state & 0xFF, _clamp_i16(x), _clamp_i16(y))
+
+def decode_compact(data: bytes) -> Optional[dict]:
+    # Client frames -> the same dicts the JSON path produces
+    try:
+        op = data[0]
+        if op == OP_VOTE_CLICK:
+            return {"type": "vote_click", "item": ITEM_BY_INDEX.get(data[1])}
+        if op == OP_MOUSE_INPUT:
+            _, m_state, x, y = _COMPACT_MOUSE.unpack_from(data)
+            return {"type": "mouse_event", "mouse_type": m_state, "x": x, "y": y}
+    except (IndexError, struct.error):
+        pass
+    return None
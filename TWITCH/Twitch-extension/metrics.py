@@ -0,0 +1,113 @@
+# metrics.py
+#
+# Minimal Prometheus-style registry (text exposition format on /metrics).
+# Updates are a dict lookup plus an add, so they are safe on hot paths;
+# formatting only happens when something scrapes the endpoint.
+
+import bisect
+from typing import Dict
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _metric_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: tuple = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1.0) -> None:
+        self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def render(self) -> list:
+        return [f"{self.name}{_metric_labels(self.labels, k)} {v:g}" for k, v in self.values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self.values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        row = self.values.get(label_values)
+        if row is None:
+            row = self.values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def render(self) -> list:
+        lines = []
+        for k, row in self.values.items():
+            total = 0
+            for bound, count in zip(self.buckets, row):
+                total += count
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_metric_labels(self.labels, k, le)} {total}")
+            total += row[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_metric_labels(self.labels, k, le)} {total}")
+            lines.append(f"{self.name}_sum{_metric_labels(self.labels, k)} {row[-1]:g}")
+            lines.append(f"{self.name}_count{_metric_labels(self.labels, k)} {total}")
+        return lines
+
+
+class Gauge:
+    # Read at scrape time from a callable returning a number or {label values: number}
+    def __init__(self, name: str, doc: str, fn, labels: tuple = (), kind: str = "gauge"):
+        self.name = name
+        self.doc = doc
+        self.fn = fn
+        self.labels = labels
+        self.kind = kind
+
+    def render(self) -> list:
+        value = self.fn()
+        if isinstance(value, dict):
+            return [f"{self.name}{_metric_labels(self.labels, k)} {v:g}" for k, v in value.items()]
+        return [f"{self.name} {value:g}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: list = []
+
+    def counter(self, name: str, doc: str, labels: tuple = ()) -> Counter:
+        return self._add(Counter(name, doc, labels))
+
+    def histogram(self, name: str, doc: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, doc, labels, buckets))
+
+    def gauge(self, name: str, doc: str, fn, labels: tuple = (), kind: str = "gauge") -> Gauge:
+        return self._add(Gauge(name, doc, fn, labels, kind))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for m in self.metrics:
+            try:
+                body = m.render()
+            except Exception:
+                continue  # a gauge whose source is not available in this role
+            lines.append(f"# HELP {m.name} {m.doc}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(body)
+        return "\n".join(lines) + "\n"
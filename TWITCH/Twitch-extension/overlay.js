@@ -1,5 +1,10 @@
 let SERVER_HOST = "https://spending-vector-mba-cannon.trycloudflare.com";
 const WS_PATH = "/ws";
+// Server room (match) to watch; "" = the server's first room. ?room=<name> on the overlay URL overrides it.
+const ROOM = new URLSearchParams(window.location.search).get("room") || "";
+// Broadcast topics to receive ("votes", "round", "mouse"); ?topics=votes,round on the overlay URL
+// skips the rest (e.g. the placing viewer's cursor echo). Empty = everything.
+const TOPICS = (new URLSearchParams(window.location.search).get("topics") || "").split(",").filter(Boolean);
 
 // Configuration
 const DEBUG = false; // Toggle this to show/hide debug box
@@ -42,6 +47,19 @@ let isLockedIn = false;
 
 const NO_VOTE_EMOJI = "😶";
 
+// Wire protocol: we ask for "compact" in overlay_hello and switch once the
+// server acks it. Older servers never ack, so everything stays JSON.
+let compactProtocol = false;
+let itemIndex = {};   // item key -> index (server's ITEM_TYPE_MAP)
+let itemByIndex = {}; // index -> item key
+let itemOptions = null; // cached: compact state frames omit the options list
+let stateVersion = null; // last state version seen; sent back so the server can skip unchanged state
+
+const OP_VOTES_DELTA = 0x01;
+const OP_MOUSE_EVENT = 0x02;
+const OP_VOTE_CLICK = 0x81;
+const OP_MOUSE_INPUT = 0x82;
+
 // Automatically identify viewer via Twitch extension
 if (window.Twitch && window.Twitch.ext) {
   window.Twitch.ext.onAuthorized((auth) => {
@@ -67,9 +85,11 @@ function connectWS() {
   }
 
   const host = SERVER_HOST.replace(/^https?:\/\//i, "").split("/")[0];
-  const url = `wss://${host}${WS_PATH}`;
+  const url = `wss://${host}${WS_PATH}${ROOM ? "/" + encodeURIComponent(ROOM) : ""}`;
   logDebug(`Connecting to WS: ${url}`);
   ws = new WebSocket(url);
+  ws.binaryType = "arraybuffer";
+  compactProtocol = false;
 
   ws.onopen = () => {
     logDebug("WS Connected");
@@ -82,12 +102,17 @@ function connectWS() {
         type: "overlay_hello",
         want_state: true,
         twitch_user_id: myTwitchUserId,
+        protocol: "compact",
+        version: stateVersion,
+        ...(ROOM ? { room: ROOM } : {}),
+        ...(TOPICS.length ? { topics: TOPICS } : {}),
       })
     );
   };
 
   ws.onmessage = (e) => {
-    const data = JSON.parse(e.data);
+    const data = typeof e.data === "string" ? JSON.parse(e.data) : decodeCompact(e.data);
+    if (!data) return;
     // logDebug(`RX: ${data.type}`); // Optional: log every message type
     handleMessage(data);
   };
@@ -99,8 +124,62 @@ function connectWS() {
   };
 }
 
+// Binary frames -> the same objects the JSON messages produce
+function decodeCompact(buf) {
+  const view = new DataView(buf);
+  if (view.byteLength < 1) return null;
+  const op = view.getUint8(0);
+  if (op === OP_VOTES_DELTA && view.byteLength >= 6) {
+    const votes = {};
+    const n = view.getUint8(5);
+    for (let i = 0, off = 6; i < n && off + 5 <= view.byteLength; i++, off += 5) {
+      const key = itemByIndex[view.getUint8(off)];
+      if (key) votes[key] = view.getUint32(off + 1, true);
+    }
+    return { type: "votes_delta", round_id: view.getUint32(1, true), votes: votes };
+  }
+  if (op === OP_MOUSE_EVENT && view.byteLength >= 6) {
+    return {
+      type: "mouse_event",
+      mouse_type: view.getUint8(1),
+      x: view.getInt16(2, true),
+      y: view.getInt16(4, true),
+    };
+  }
+  return null;
+}
+
+function sendVoteClick(key) {
+  if (!ws || ws.readyState !== WebSocket.OPEN) return;
+  if (compactProtocol && itemIndex[key] !== undefined) {
+    ws.send(new Uint8Array([OP_VOTE_CLICK, itemIndex[key]]));
+  } else {
+    ws.send(JSON.stringify({ type: "vote_click", item: key }));
+  }
+}
+
+function sendMouse(type, x, y) {
+  if (!ws || ws.readyState !== WebSocket.OPEN) return;
+  if (compactProtocol) {
+    const view = new DataView(new ArrayBuffer(6));
+    view.setUint8(0, OP_MOUSE_INPUT);
+    view.setUint8(1, type);
+    view.setInt16(2, x, true);
+    view.setInt16(4, y, true);
+    ws.send(view.buffer);
+  } else {
+    ws.send(JSON.stringify({ type: "mouse_event", mouse_type: type, x: x, y: y }));
+  }
+}
+
 function handleMessage(data) {
-  if (data.type === "round_start") {
+  if (data.type === "hello_ack") {
+    compactProtocol = data.protocol === "compact";
+    itemIndex = data.items || {};
+    itemByIndex = {};
+    Object.keys(itemIndex).forEach(key => { itemByIndex[itemIndex[key]] = key; });
+    logDebug(`Protocol: ${data.protocol}`);
+  } else if (data.type === "round_start") {
     logDebug(`Round Start: ${data.round_id}`);
     roundActive = true;
     roundEndTime = Date.now() + data.duration * 1000;
@@ -112,7 +191,8 @@ function handleMessage(data) {
     resetMouseVisuals(); // Clear old arrows
     document.getElementById("root").style.display = "block"; // Show voting UI
 
-    renderItems(data.options, {});
+    if (data.options) itemOptions = data.options;
+    renderItems(itemOptions, {});
   } else if (data.type === "vote_update") {
     // Full refresh of vote counts
     const votes = data.votes || {};
@@ -123,6 +203,17 @@ function handleMessage(data) {
             voteEl.textContent = count === 0 ? `${NO_VOTE_EMOJI} 0 VOTES` : `${count} VOTES`;
         }
     });
+  } else if (data.type === "votes_delta" || data.type === "state_delta") {
+    // Batched per server tick (or since our last state version): only the items whose count changed
+    if (data.type === "state_delta") stateVersion = data.version;
+    const votes = data.votes || {};
+    Object.keys(votes).forEach(key => {
+        const voteEl = document.querySelector(`[data-key="${key}"] .votes`);
+        if (voteEl) {
+            const c = Number(votes[key] || 0);
+            voteEl.textContent = c === 0 ? `${NO_VOTE_EMOJI} 0 VOTES` : `${c} VOTES`;
+        }
+    });
   } else if (data.type === "vote") {
     // logDebug(`Vote update: ${data.item} = ${data.count}`); // Too spammy?
     const voteEl = document.querySelector(`[data-key="${data.item}"] .votes`);
@@ -193,13 +284,21 @@ function handleMessage(data) {
     document.getElementById("winner-banner").classList.remove("show"); // Hide banner
   } else if (data.type === "mouse_event") {
     handleRemoteMouse(data);
+  } else if (data.type === "state_not_modified") {
+    // Reply to our version: what is on screen is still current, keep it
+    logDebug(`State unchanged (v${data.version})`);
+  } else if (data.type === "room_unknown") {
+    // The server keeps us in the room from the URL (or the default one)
+    console.warn(`Unknown room "${data.room}", available: ${(data.rooms || []).join(", ")}`);
   } else if (data.type === "state" || data.type === "sync") {
     logDebug("State Sync Received");
+    if (data.version !== undefined) stateVersion = data.version;
     if (data.round) {
       roundActive = !!data.round.active;
       roundEndTime = Date.now() + data.round.duration_remaining * 1000;
     }
-    renderItems(data.options, data.votes || {});
+    if (data.options) itemOptions = data.options;
+    renderItems(itemOptions, data.votes || {});
   }
 }
 
@@ -237,12 +336,7 @@ function renderItems(options, votes) {
         div.classList.add('locked');
 
         logDebug(`Vote sent: ${opt.key}`);
-        if (ws && ws.readyState === WebSocket.OPEN) {
-            ws.send(JSON.stringify({
-                type: "vote_click",
-                item: opt.key
-            }));
-        }
+        sendVoteClick(opt.key);
         
         // Visual feedback
         div.style.transition = "transform 0.1s ease-out";
@@ -333,16 +427,7 @@ function initMouse() {
   let arrow = createArrow('local-mouse-arrow', zone);
 
   // Helper to send mouse event
-  const sendMouseEvent = (type, x, y) => {
-    if (ws && ws.readyState === WebSocket.OPEN) {
-      ws.send(JSON.stringify({
-        type: "mouse_event",
-        mouse_type: type,
-        x: x,
-        y: y
-      }));
-    }
-  };
+  const sendMouseEvent = (type, x, y) => sendMouse(type, x, y);
 
   const updateArrow = (x1, y1, x2, y2) => {
       const dx = x2 - x1;
@@ -0,0 +1,147 @@
+# profiling.py
+#
+# Event loop stall watchdog and on-demand sampling profiler for the deploy
+# server. Both read other threads' stacks through sys._current_frames(), so
+# they see where a blocked loop is stuck without touching the loop itself.
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Set
+
+log = logging.getLogger("overlay")
+
+
+def fold_stack(frame, limit: int = 64) -> str:
+    # Root-first "func (file:line);..." as used by flamegraph.pl / speedscope
+    parts = []
+    while frame is not None and len(parts) < limit:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
+
+
+class LoopWatchdog:
+    # A daemon thread expects the loop_lag_monitor heartbeat. When it is late
+    # by more than LOOP_STALL_MS, the loop is blocked: the thread samples the
+    # loop thread's stack until the heartbeat comes back, then records how long
+    # the stall lasted, which task was running and where the time went.
+
+    SAMPLE_SECONDS = 0.01
+
+    def __init__(self, threshold_ms: float = 100.0, keep: int = 50):
+        self.threshold = threshold_ms / 1000.0
+        self.stalls: deque = deque(maxlen=keep)
+        self.loop = None
+        self.interval = 0.0  # set by start()
+        self.loop_thread_id: Optional[int] = None
+        self.last_beat = time.monotonic()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+        # metrics
+        self.stall_count = 0
+        self.stall_ms_max = 0.0
+
+    def start(self, loop, interval: float) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.loop = loop
+        self.interval = interval
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def beat(self) -> None:
+        self.last_beat = time.monotonic()
+
+    def _running_task(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self.loop)
+        except Exception:
+            return None
+        if task is None:
+            return None
+        coro = task.get_coro()
+        return f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+
+    def _watch(self) -> None:
+        while not self.stop_event.wait(self.SAMPLE_SECONDS):
+            beat = self.last_beat
+            late = time.monotonic() - beat - self.interval
+            if late < self.threshold:
+                continue
+
+            # Stalled: sample until the heartbeat moves again
+            samples: Dict[str, int] = {}
+            task = self._running_task()
+            while self.last_beat == beat and not self.stop_event.is_set():
+                frame = sys._current_frames().get(self.loop_thread_id)
+                if frame is not None:
+                    stack = fold_stack(frame)
+                    samples[stack] = samples.get(stack, 0) + 1
+                time.sleep(self.SAMPLE_SECONDS)
+
+            stall_ms = (time.monotonic() - beat - self.interval) * 1000.0
+            top = max(samples.items(), key=lambda kv: kv[1])[0] if samples else None
+            self.stall_count += 1
+            self.stall_ms_max = max(self.stall_ms_max, stall_ms)
+            self.stalls.append({
+                "ts": round(time.time(), 3),
+                "stall_ms": round(stall_ms, 1),
+                "task": task,
+                "top_stack": top,
+                "samples": samples,
+            })
+            log.warning("event loop blocked for %.0f ms", stall_ms, extra={"category": "loop", "fields": {
+                "task": task, "where": top.rsplit(";", 3)[-3:] if top else None}})
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": round(self.threshold * 1000.0, 1),
+            "stalls": self.stall_count,
+            "stall_ms_max": round(self.stall_ms_max, 1),
+            "last_stall": {k: v for k, v in self.stalls[-1].items() if k != "samples"} if self.stalls else None,
+        }
+
+
+
+class SamplingProfiler:
+    # Wall-clock sampler over sys._current_frames(); runs in a worker thread for
+    # a fixed window and returns folded stacks. One profile at a time.
+
+    MAX_SECONDS = 60.0
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def profile(self, seconds: float, hz: float, thread_ids: Optional[Set[int]] = None) -> Optional[Dict[str, int]]:
+        if not self.lock.acquire(blocking=False):
+            return None
+        try:
+            me = threading.get_ident()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            interval = 1.0 / max(1.0, min(hz, 1000.0))
+            deadline = time.monotonic() + max(0.1, min(seconds, self.MAX_SECONDS))
+            folded: Dict[str, int] = {}
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == me or (thread_ids is not None and ident not in thread_ids):
+                        continue
+                    stack = f"{names.get(ident, ident)};{fold_stack(frame)}"
+                    folded[stack] = folded.get(stack, 0) + 1
+                time.sleep(interval)
+            return folded
+        finally:
+            self.lock.release()
@@ -13,22 +13,33 @@ import os
 import ssl
 import json
 import time
+import queue
 import asyncio
+import logging
+import logging.handlers
 import contextlib
+import functools
+import gzip
+import heapq
 import random
-import socket
+import shutil
 import struct
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from collections import deque
 from typing import Dict, Set, Any, Optional
 import sys
 
-# Add src_python to path for protobuf
+# Add src_python to path for protobuf and the game event injector
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../src_python'))
 try:
     import message_pb2
 except ImportError:
     print("Warning: message_pb2 not found. Game events will not be sent.")
     message_pb2 = None
+from event_injector import ITEM_TYPE_MAP, AsyncEventInjector, encode_event
 
 import certifi
 import aiohttp
@@ -36,6 +47,15 @@ from aiohttp import web, TCPConnector
 from aiohttp_cors import setup, ResourceOptions
 from twitchio.ext import commands
 
+# Self-contained parts of the server, next to this file
+from compact import compact_votes_delta, compact_mouse_event, decode_compact
+from metrics import MetricsRegistry
+from profiling import LoopWatchdog, SamplingProfiler
+from analytics import AnalyticsStore
+from statebus import (BUS_BROADCAST, BUS_STATE, BUS_VOTE, BUS_MOUSE, BUS_STATS, bus_frame, bus_pack_pair,
+                      bus_unpack_pair, bus_read_frame, bus_open_connection, bus_start_server)
+from supervisor import supervise
+
 # =========================
 # Protobuf (optional)
 # =========================
@@ -54,18 +74,198 @@ ssl._create_default_https_context = lambda: _ssl_context  # noqa
 # =========================
 # Configuration
 # =========================
-HTTP_HOST = "0.0.0.0"
-HTTP_PORT = 8080
-
-ROUND_DURATION = 10
-ROUND_BREAK_SECONDS = 5
-PLACEMENT_TIMEOUT = 5
+HTTP_HOST = os.environ.get("HTTP_HOST", "0.0.0.0").strip()
+HTTP_PORT = int(os.environ.get("HTTP_PORT", "8080"))
+
+# Process role:
+#   "standalone"  -> everything in one process (default)
+#   "coordinator" -> owns rounds, votes, chat and the game link; serves /ws too and
+#                    publishes every broadcast + state snapshots on the state bus
+#   "edge"        -> stateless WebSocket front end: fans out what the coordinator
+#                    publishes and forwards votes / mouse input to it
+SERVER_ROLE = os.environ.get("SERVER_ROLE", "standalone").strip().lower()
+BUS_ADDRESS = os.environ.get("BUS_ADDRESS", "unix:/tmp/overlay_state_bus.sock").strip()  # or "tcp:127.0.0.1:8790"
+BUS_MAX_BUFFER = int(os.environ.get("BUS_MAX_BUFFER", str(8 * 1024 * 1024)))  # per edge, bytes
+BUS_STATE_REFRESH = 1.0  # seconds; keeps duration_remaining fresh on edges
+
+# Multi-process launcher: SERVER_WORKERS > 1 turns this process into a supervisor
+# that starts one coordinator plus N edge workers. The edges all bind
+# HTTP_HOST:HTTP_PORT with SO_REUSEPORT so the kernel spreads connections over
+# them; each also answers /health on a private 127.0.0.1 port, and the
+# supervisor serves the combined view on SUPERVISOR_PORT.
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", "1"))
+HTTP_REUSE_PORT = os.environ.get("HTTP_REUSE_PORT", "0").strip() == "1"
+WORKER_ADMIN_PORT = int(os.environ.get("WORKER_ADMIN_PORT", "0"))
+WORKER_ADMIN_BASE = int(os.environ.get("WORKER_ADMIN_BASE", "18100"))
+SUPERVISOR_PORT = int(os.environ.get("SUPERVISOR_PORT", str(HTTP_PORT + 1)))
+
+# Round phases, in seconds: vote -> grace (late votes still count) -> placement
+# (only with a winner; ends early once the item is placed) -> break. Deadlines
+# are absolute on the event loop clock, so time spent at a phase boundary does
+# not push later phases back. The "N seconds left" chat countdown only uses
+# checkpoints shorter than the vote itself.
+ROUND_DURATION = int(os.environ.get("ROUND_DURATION", "10"))
+ROUND_GRACE_SECONDS = float(os.environ.get("ROUND_GRACE_SECONDS", "0.5"))
+PLACEMENT_TIMEOUT = int(os.environ.get("PLACEMENT_TIMEOUT", "5"))
+ROUND_BREAK_SECONDS = int(os.environ.get("ROUND_BREAK_SECONDS", "5"))         # after a round without placement
+PLACEMENT_BREAK_SECONDS = float(os.environ.get("PLACEMENT_BREAK_SECONDS", "0"))  # after the placement phase
+ROUND_COUNTDOWN = tuple(int(c) for c in os.environ.get("ROUND_COUNTDOWN", "20,10,5").split(",") if c.strip())
 
 TWITCH_TOKEN = os.environ.get("TWITCH_TOKEN", "oauth:facx4e33l8089ysaih1ttihovdd6de").strip()
 TWITCH_CHANNEL = os.environ.get("TWITCH_CHANNEL", "aigameapg").strip()
 
+# Where chat commands come from: "twitch" (live IRC via twitchio) or "synthetic"
+# (offline generator for load tests, tuned by the SYNTH_CHAT_* variables below)
+CHAT_SOURCE = os.environ.get("CHAT_SOURCE", "twitch").strip().lower()
+SYNTH_CHAT_USERS = int(os.environ.get("SYNTH_CHAT_USERS", "1000"))
+SYNTH_CHAT_RATE = float(os.environ.get("SYNTH_CHAT_RATE", "200"))            # !item commands per second
+SYNTH_CHAT_SWITCH = float(os.environ.get("SYNTH_CHAT_SWITCH", "0.1"))        # chance a repeat voter switches item
+SYNTH_CHAT_WEIGHTS = os.environ.get("SYNTH_CHAT_WEIGHTS", "").strip()        # e.g. "fire:5,bomb:2" (others 1)
+SYNTH_CHAT_BURST_EVERY = float(os.environ.get("SYNTH_CHAT_BURST_EVERY", "0"))  # seconds between bursts, 0 = off
+SYNTH_CHAT_BURST_SECONDS = float(os.environ.get("SYNTH_CHAT_BURST_SECONDS", "2"))
+SYNTH_CHAT_BURST_FACTOR = float(os.environ.get("SYNTH_CHAT_BURST_FACTOR", "10"))
+SYNTH_CHAT_INVALID = float(os.environ.get("SYNTH_CHAT_INVALID", "0.01"))     # share of malformed commands
+
 LOG_FILE = "spawn_log.jsonl"
 
+# Event journal (votes, round results, placements, game events), kept apart
+# from the legacy LOG_FILE so old spawn logs are never appended to or rotated.
+# Records are buffered and written in batches from a worker thread; the file is
+# rotated and gzipped once it grows past JOURNAL_MAX_BYTES.
+JOURNAL_FILE = os.environ.get("JOURNAL_FILE", "round_journal.jsonl").strip()
+JOURNAL_FLUSH_SECONDS = float(os.environ.get("JOURNAL_FLUSH_SECONDS", "1.0"))
+JOURNAL_FLUSH_RECORDS = int(os.environ.get("JOURNAL_FLUSH_RECORDS", "500"))
+JOURNAL_MAX_BUFFER = int(os.environ.get("JOURNAL_MAX_BUFFER", "50000"))
+JOURNAL_MAX_BYTES = int(os.environ.get("JOURNAL_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Analytics store: round outcomes and individual votes are also appended as
+# fixed-width columns under ANALYTICS_DIR (one directory per UTC day) and
+# aggregated with numpy on /analytics/<query>. Needs numpy; "" turns it off.
+ANALYTICS_DIR = os.environ.get("ANALYTICS_DIR", "analytics").strip()
+ANALYTICS_FLUSH_SECONDS = float(os.environ.get("ANALYTICS_FLUSH_SECONDS", "2.0"))
+ANALYTICS_MAX_BUFFER = int(os.environ.get("ANALYTICS_MAX_BUFFER", "200000"))
+
+# Broadcast fan-out: every client gets its own bounded outbound queue + writer task.
+# When a slow client's queue is full, the policy decides what happens:
+#   "drop"       -> throw away its backlog and resync it with a fresh state snapshot
+#   "disconnect" -> close the socket, the overlay reconnects on its own
+BROADCAST_QUEUE_SIZE = int(os.environ.get("BROADCAST_QUEUE_SIZE", "256"))
+BROADCAST_SLOW_POLICY = os.environ.get("BROADCAST_SLOW_POLICY", "drop").strip().lower()
+
+# Game event socket (Java SocketGameEvent). With GAME_BATCH the link connects as
+# role 7 and sends every drained run of events as one GrpcGameEventBatch frame
+# (at most GAME_BATCH_MAX events each); GAME_BATCH=0 keeps one GrpcGameEvent per
+# frame on role 6, for game builds that predate batching.
+GAME_HOST = os.environ.get("GAME_HOST", "127.0.0.1").strip()
+GAME_PORT = int(os.environ.get("GAME_PORT", "31415"))
+GAME_QUEUE_SIZE = int(os.environ.get("GAME_QUEUE_SIZE", "512"))
+GAME_BATCH = os.environ.get("GAME_BATCH", "1").strip() != "0"
+GAME_BATCH_MAX = max(1, int(os.environ.get("GAME_BATCH_MAX", "64")))
+GAME_RECONNECT_MIN = 0.5
+GAME_RECONNECT_MAX = 10.0
+
+# Rooms: several matches served by one process, as "name=channel@host:port,...".
+# The channel defaults to the room name and the game address to GAME_HOST:GAME_PORT.
+# Overlays join a room through /ws/<name> or "room" in overlay_hello (plain /ws
+# is the first room), and chat commands are routed by the channel they came
+# from. Empty -> a single room "default" on TWITCH_CHANNEL.
+def _parse_rooms(spec: str) -> list:
+    rooms = []
+    for part in spec.split(","):  # e.g. "main=aigameapg,match2=other@127.0.0.1:31416"
+        name, _, rest = part.strip().partition("=")
+        if not name.strip():
+            continue
+        channel, _, address = rest.partition("@")
+        host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+        rooms.append((name.strip().lower(), (channel.strip() or name.strip()).lower(),
+                      host.strip() or GAME_HOST, int(port) if port.strip() else GAME_PORT))
+    return rooms or [("default", TWITCH_CHANNEL.lower(), GAME_HOST, GAME_PORT)]
+
+ROOM_SPECS = _parse_rooms(os.environ.get("ROOMS", ""))
+
+# Hover/drag positions are coalesced (last value wins) and flushed at this rate,
+# which matches the game's 30 fps frame loop. Start/End are never coalesced.
+MOUSE_FLUSH_HZ = float(os.environ.get("MOUSE_FLUSH_HZ", "30"))
+
+# Optional speedups, picked at startup when installed: uvloop for the event loop
+# and orjson (then ujson) for the JSON on the hot paths. "asyncio" / "json" force
+# the stdlib; naming a backend that is missing falls back with a warning.
+EVENT_LOOP = os.environ.get("EVENT_LOOP", "auto").strip().lower()      # auto | uvloop | asyncio
+JSON_BACKEND = os.environ.get("JSON_BACKEND", "auto").strip().lower()  # auto | orjson | ujson | json
+
+# Logging: records are handed to a background thread through a queue and written
+# as JSON lines (LOG_FORMAT=text for the old console look). Chatty categories are
+# capped at N records per second; the rest are counted and reported as "suppressed".
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").strip().upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json").strip().lower()
+LOG_RATE_LIMITS: Dict[str, float] = {"mouse": 5, "game": 20, "chat": 50, "http": 20, "ws": 20}
+for _part in os.environ.get("LOG_RATE_LIMITS", "").split(","):  # e.g. "mouse:2,chat:100"
+    if ":" in _part:
+        _cat, _rate = _part.split(":", 1)
+        LOG_RATE_LIMITS[_cat.strip()] = float(_rate)
+
+# /metrics: event loop lag is sampled by a timer firing this often (seconds)
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL", "0.25"))
+
+# A watchdog thread reports the loop as blocked once that timer is LOOP_STALL_MS
+# late and samples the loop thread's stack until it recovers. /admin/* endpoints
+# (stall history, on-demand sampling profiler) need the X-Admin-Token header to
+# match ADMIN_TOKEN and are disabled while it is empty.
+LOOP_STALL_MS = float(os.environ.get("LOOP_STALL_MS", "100"))
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "").strip()
+
+# Vote changes are collected and sent as one "votes_delta" frame per tick
+VOTE_TICK_SECONDS = float(os.environ.get("VOTE_TICK_SECONDS", "0.1"))
+
+# Admission control. Token buckets as (rate per second, burst), overridable with
+# "type:rate/burst,..." strings. WebSocket messages are checked per connection
+# and per twitch_user_id ("*" = any message, then the message's own type); chat
+# commands per chatter; chat replies per chatter and in total, to stay well under
+# Twitch's outbound limit. Over-budget input is dropped and counted.
+# MAX_CONNECTIONS caps concurrent sockets (503 before the upgrade, 0 = no cap).
+def _parse_limits(env_name: str, defaults: Dict[str, tuple]) -> Dict[str, tuple]:
+    limits = dict(defaults)
+    for part in os.environ.get(env_name, "").split(","):  # e.g. "vote_click:2/4,*:100/200"
+        if ":" in part:
+            key, spec = part.split(":", 1)
+            rate, _, burst = spec.partition("/")
+            limits[key.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+# Outbound chat goes through one outbox task: a bounded priority queue sent at
+# most CHAT_BUDGET_PER_30S messages per rolling 30s (Twitch allows 20 for a
+# regular account, 100 if the bot is a moderator). Messages with the same
+# coalescing key replace each other while still queued, and expired ones are skipped.
+CHAT_BUDGET_PER_30S = int(os.environ.get("CHAT_BUDGET_PER_30S", "20"))
+CHAT_OUTBOX_SIZE = int(os.environ.get("CHAT_OUTBOX_SIZE", "50"))
+CHAT_PRIORITY_HIGH = 0    # round start, winner
+CHAT_PRIORITY_NORMAL = 1  # vote summary, no-vote notice
+CHAT_PRIORITY_LOW = 2     # countdown, command replies
+
+MAX_CONNECTIONS = int(os.environ.get("MAX_CONNECTIONS", "20000"))
+# State goes out in reply to overlay_hello (which carries the client's last
+# version) or get_state; a client that sends neither this long after connecting
+# gets the full state anyway.
+HELLO_GRACE_SECONDS = float(os.environ.get("HELLO_GRACE_SECONDS", "1.0"))
+WS_CONN_LIMITS = _parse_limits("WS_CONN_LIMITS", {
+    "*": (300, 600),
+    "mouse_event": (250, 500),
+    "mouse_placement": (4, 8),  # placement Start/End, kept apart from hover/drag
+    "vote_click": (5, 10),
+    "get_state": (2, 5),       # also "sync"
+    "overlay_hello": (1, 3),
+    "ping": (2, 5),
+})
+WS_USER_LIMITS = _parse_limits("WS_USER_LIMITS", {
+    "*": (400, 800),           # shared by every tab/connection of one viewer
+    "vote_click": (5, 10),
+})
+CHAT_LIMITS = _parse_limits("CHAT_LIMITS", {
+    "command": (2, 4),         # per chatter
+    "reply": (0.1, 1),         # per chatter: one reply, then one per 10s
+    "reply_total": (0.5, 5),   # all replies
+})
+
 ITEMS: Dict[str, Dict[str, str]] = {
     "freeze":  {"emoji": "🧊", "label": "Freeze Orb"},
     "fire":    {"emoji": "🔥", "label": "Power Core"},
@@ -77,137 +277,1154 @@ ITEMS: Dict[str, Dict[str, str]] = {
     "spout":   {"emoji": "🌋", "label": "Flame Spout"},
 }
 
+# =========================
+# Runtime (event loop / JSON codec)
+# =========================
+def load_json_backend(name: str = JSON_BACKEND):
+    # -> (backend name, dumps(obj) -> UTF-8 bytes, loads(str | bytes))
+    candidates = ("orjson", "ujson") if name == "auto" else (name,)
+    for candidate in candidates:
+        try:
+            if candidate == "orjson":
+                import orjson
+                option = orjson.OPT_NON_STR_KEYS
+                return "orjson", lambda obj: orjson.dumps(obj, option=option), orjson.loads
+            if candidate == "ujson":
+                import ujson
+                return "ujson", lambda obj: ujson.dumps(obj, ensure_ascii=False).encode("utf-8"), ujson.loads
+        except ImportError:
+            if name != "auto":
+                print(f"Warning: JSON_BACKEND={name} is not installed, using the stdlib json module.")
+    return "json", lambda obj: json.dumps(obj, ensure_ascii=False).encode("utf-8"), json.loads
+
+def install_event_loop(name: str = EVENT_LOOP) -> str:
+    # Call before asyncio.run(); returns the loop implementation in use
+    if name in ("auto", "uvloop"):
+        try:
+            import uvloop
+        except ImportError:
+            if name == "uvloop":
+                print("Warning: EVENT_LOOP=uvloop but uvloop is not installed, using asyncio.")
+            return "asyncio"
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    return "asyncio"
+
+
+JSON_BACKEND_NAME, json_dumpb, json_loads = load_json_backend()
+
+# =========================
+# Logging
+# =========================
+log = logging.getLogger("overlay")
+
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "category": getattr(record, "category", "app"),
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextLogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"[{getattr(record, 'category', 'app').upper()}] {record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock QueueHandler formats the message on the calling thread; here the
+    # record goes over untouched and the listener thread does all the work.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class CategoryRateLimiter:
+    # Token bucket per category, checked before a record is even created.
+    def __init__(self, limits: Dict[str, float]):
+        self.limits = dict(limits)
+        self.tokens: Dict[str, float] = {k: float(v) for k, v in limits.items()}
+        self.updated: Dict[str, float] = {}
+        self.suppressed: Dict[str, int] = {}  # since the last record that got through
+        self.suppressed_total: Dict[str, int] = {}
+
+    def allow(self, category: str) -> bool:
+        rate = self.limits.get(category)
+        if rate is None:
+            return True
+        now = time.monotonic()
+        tokens = min(rate, self.tokens[category] + (now - self.updated.get(category, now)) * rate)
+        self.updated[category] = now
+        if tokens < 1.0:
+            self.tokens[category] = tokens
+            self.suppressed[category] = self.suppressed.get(category, 0) + 1
+            self.suppressed_total[category] = self.suppressed_total.get(category, 0) + 1
+            return False
+        self.tokens[category] = tokens - 1.0
+        return True
+
+    def take_suppressed(self, category: str) -> int:
+        return self.suppressed.pop(category, 0)
+
+
+log_limiter = CategoryRateLimiter(LOG_RATE_LIMITS)
+
+
+def log_event(category: str, msg: str, *args, level: int = logging.INFO, **fields) -> None:
+    # `msg` uses %-style args so nothing is formatted on the event loop.
+    if not log.isEnabledFor(level) or not log_limiter.allow(category):
+        return
+    suppressed = log_limiter.take_suppressed(category)
+    if suppressed:
+        fields["suppressed"] = suppressed
+    log.log(level, msg, *args, extra={"category": category, "fields": fields})
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(TextLogFormatter() if LOG_FORMAT == "text" else JsonLogFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    log.handlers[:] = [DeferredQueueHandler(log_queue)]
+    log.setLevel(LOG_LEVEL)
+    log.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+# =========================
+# Metrics
+# =========================
+metrics = MetricsRegistry()  # served on /metrics
+
+WS_MESSAGE_TYPES = {"ping", "overlay_hello", "vote_click", "get_state", "sync", "mouse_event"}
+
+ws_messages_total = metrics.counter("overlay_ws_messages_total", "WebSocket messages received, by type", ("type",))
+ws_handle_seconds = metrics.histogram("overlay_ws_handle_seconds", "Time spent handling one WebSocket message", ("type",))
+broadcasts_total = metrics.counter("overlay_broadcasts_total", "Messages broadcast to overlays, by type", ("type",))
+broadcast_fanout_seconds = metrics.histogram("overlay_broadcast_fanout_seconds", "Time to enqueue one broadcast for every client")
+votes_total = metrics.counter("overlay_votes_total", "Votes registered, by outcome", ("outcome",))
+game_events_total = metrics.counter("overlay_game_events_total", "Game events queued for the game socket, by kind", ("kind",))
+game_drain_seconds = metrics.histogram("overlay_game_drain_seconds", "Time to write one batch to the game socket")
+game_event_latency_seconds = metrics.histogram("overlay_game_event_latency_seconds", "Game event enqueue -> written to the socket")
+chat_command_seconds = metrics.histogram("overlay_chat_command_seconds", "Chat command handling time", ("command",))
+loop_lag_seconds = metrics.histogram("overlay_event_loop_lag_seconds", "How late the event loop woke a periodic timer")
+round_skew_seconds = metrics.histogram("overlay_round_timing_skew_seconds", "Round phase timer lateness vs its deadline")
+rounds_total = metrics.counter("overlay_rounds_total", "Finished rounds, by outcome", ("outcome",))
+
+
+async def loop_lag_monitor(interval: float = LOOP_LAG_INTERVAL) -> None:
+    loop = asyncio.get_running_loop()
+    loop_watchdog.start(loop, interval)
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        loop_lag_seconds.observe(max(0.0, loop.time() - start - interval))
+        loop_watchdog.beat()
+
+
+# =========================
+# Loop watchdog / sampling profiler
+# =========================
+loop_watchdog = LoopWatchdog(LOOP_STALL_MS)
+profiler = SamplingProfiler()
+
+
+# =========================
+# Event journal
+# =========================
+class EventJournal:
+    def __init__(self, path: str = JOURNAL_FILE):
+        self.path = Path(path)
+        self.buffer: list = []
+        self.wakeup = asyncio.Event()
+        # One worker keeps batches in order and off the event loop
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+
+        # metrics
+        self.records = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+        self.last_flush_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    def record(self, record_type: str, **fields) -> None:
+        if len(self.buffer) >= JOURNAL_MAX_BUFFER:
+            self.dropped += 1
+            return
+        fields["type"] = record_type
+        fields["ts"] = time.time()
+        self.buffer.append(fields)
+        self.records += 1
+        if len(self.buffer) >= JOURNAL_FLUSH_RECORDS:
+            self.wakeup.set()
+
+    async def run(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.wakeup.wait(), JOURNAL_FLUSH_SECONDS)
+            self.wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.buffer:
+            return
+        batch = self.buffer
+        self.buffer = []
+        t0 = time.perf_counter()
+        try:
+            rotated = await asyncio.get_running_loop().run_in_executor(self.executor, self._write_batch, batch)
+        except Exception as e:
+            self.last_error = str(e)
+            log_event("journal", "Journal write failed: %s", e, level=logging.ERROR, records=len(batch))
+            return
+        self.batches += 1
+        self.rotations += rotated
+        self.last_flush_ms = (time.perf_counter() - t0) * 1000.0
+
+    def _write_batch(self, batch: list) -> int:
+        # Runs on the journal thread
+        data = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in batch)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        if size < JOURNAL_MAX_BYTES:
+            return 0
+
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        rotated = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        n = 1
+        while rotated.exists() or Path(str(rotated) + ".gz").exists():
+            rotated = self.path.with_name(f"{self.path.stem}.{stamp}-{n}{self.path.suffix}")
+            n += 1
+        os.replace(self.path, rotated)
+        with open(rotated, "rb") as src, gzip.open(str(rotated) + ".gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        rotated.unlink()
+        return 1
+
+    async def close(self) -> None:
+        await self.flush()
+        self.executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "buffered": len(self.buffer),
+            "records": self.records,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "rotations": self.rotations,
+            "flush_ms_last": round(self.last_flush_ms, 3),
+            "last_error": self.last_error,
+        }
+
+
+journal = EventJournal()
+
+
+# =========================
+# Vote ledger
+# =========================
+class VoteLedger:
+    # One vote per user per round. Counts live in a list indexed like `keys`, and
+    # user_item maps user_id -> item index, so cast/switch/retract and tallies are
+    # O(1) regardless of how many viewers voted. counts[i] == len(voters[i]) always.
+
+    def __init__(self, item_keys):
+        self.keys = list(item_keys)
+        self.index: Dict[str, int] = {k: i for i, k in enumerate(self.keys)}
+        self.counts = [0] * len(self.keys)
+        self.voters = [set() for _ in self.keys]  # item index -> user ids (winner draw)
+        self.user_item: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.user_item)
+
+    def reset(self) -> None:
+        self.counts = [0] * len(self.keys)
+        self.voters = [set() for _ in self.keys]
+        self.user_item = {}
+
+    def cast(self, user_id: str, item_key: str) -> tuple:
+        # -> (item the user voted for before or None, changed). A repeat vote for
+        # the same item is a no-op: (item_key, False). Raises KeyError for unknown items.
+        idx = self.index[item_key]
+        prev = self.user_item.get(user_id)
+        if prev == idx:
+            return item_key, False
+        if prev is not None:
+            self.voters[prev].remove(user_id)
+            self.counts[prev] -= 1
+        self.user_item[user_id] = idx
+        self.voters[idx].add(user_id)
+        self.counts[idx] += 1
+        return (self.keys[prev] if prev is not None else None), True
+
+    def retract(self, user_id: str) -> Optional[str]:
+        prev = self.user_item.pop(user_id, None)
+        if prev is None:
+            return None
+        self.voters[prev].remove(user_id)
+        self.counts[prev] -= 1
+        return self.keys[prev]
+
+    def vote_of(self, user_id: str) -> Optional[str]:
+        idx = self.user_item.get(user_id)
+        return self.keys[idx] if idx is not None else None
+
+    def count(self, item_key: str) -> int:
+        idx = self.index.get(item_key)
+        return self.counts[idx] if idx is not None else 0
+
+    def voters_of(self, item_key: str) -> list:
+        idx = self.index.get(item_key)
+        return list(self.voters[idx]) if idx is not None else []
+
+    def snapshot(self) -> Dict[str, int]:
+        # Taken synchronously, so no other coroutine can interleave a vote.
+        return dict(zip(self.keys, self.counts))
+
+    def leader(self):
+        # (item_key, votes) of the first item with the highest count, or (None, 0)
+        best = max(self.counts) if self.counts else 0
+        if best <= 0:
+            return None, 0
+        return self.keys[self.counts.index(best)], best
+
+
 # =========================
 # Global state
 # =========================
-clients: Set[web.WebSocketResponse] = set()
+# Per-match state (round, votes, placement, overlays, game socket) lives on Room.
 
 # WS -> twitch_user_id map (so we can authorize winner)
 ws_user_id: Dict[web.WebSocketResponse, Optional[str]] = {}
+# WS -> the room it watches
+ws_room: Dict[web.WebSocketResponse, "Room"] = {}
 
-BOT_INSTANCE: Optional["ChatBot"] = None
+chat_source: Optional["ChatSource"] = None
 
-current_round_active: bool = False
-current_round_id: int = 0
-current_votes: Dict[str, int] = {k: 0 for k in ITEMS.keys()}
-
-# Track voters by item using Twitch user_id (not only names)
-votes_by_item_ids: Dict[str, Set[str]] = {k: set() for k in ITEMS.keys()}
 user_id_to_name: Dict[str, str] = {}  # id -> latest name
 
-round_end_ts: float = 0.0
-
-# pending placement:
-# { "round_id": int, "item_key": str, "chosen_user": str, "chosen_user_id": str, "ts": float }
-pending_placement: Optional[Dict[str, Any]] = None
-
-# Game socket
-# GAME_SOCKET and send_game_event removed as requested
-game_writer = None
-game_event_id = 0
-active_mouse_start = (0, 0)
-
-ITEM_TYPE_MAP = {
-    "freeze": 1,
-    "fire": 2,
-    "wind": 3,
-    "shield": 4,
-    "chaos": 5,
-    "warp": 6,
-    "bomb": 7,
-    "spout": 8
+
+# =========================
+# Analytics store
+# =========================
+analytics = AnalyticsStore(ANALYTICS_DIR, ITEMS.keys(), ANALYTICS_FLUSH_SECONDS, ANALYTICS_MAX_BUFFER,
+                           user_id_to_name)
+
+
+# =========================
+# Broadcast hub
+# =========================
+# Broadcast topics. An overlay lists the ones it wants as "topics" in
+# overlay_hello and only gets those; overlays that never ask get all of them.
+# Direct replies (state, pong, hello_ack) are not topics and always arrive.
+TOPICS = ("votes", "round", "mouse")
+TOPIC_CODES = {t: i for i, t in enumerate(TOPICS)}  # one byte on the state bus
+MESSAGE_TOPICS = {
+    "votes_delta": "votes",
+    "round_start": "round",
+    "round_result": "round",
+    "placement_request": "round",
+    "placement_complete": "round",
+    "mouse_event": "mouse",
 }
 
+def parse_topics(value) -> frozenset:
+    # "topics" from overlay_hello; unknown names are ignored, anything but a list means all
+    if not isinstance(value, list):
+        return frozenset(TOPICS)
+    return frozenset(t for t in value if t in TOPIC_CODES)
+
+
+class ClientConnection:
+    __slots__ = ("ws", "queue", "task", "sent", "dropped", "compact", "options_sent", "topics")
+
+    def __init__(self, ws: web.WebSocketResponse, queue_size: int):
+        self.ws = ws
+        # (payload, enqueue perf_counter, binary)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+        self.compact = False       # negotiated at overlay_hello
+        self.options_sent = False  # compact clients get state without options after this
+        self.topics = frozenset(TOPICS)
+
+
+class BroadcastHub:
+    # The overlays of one room, also indexed by topic (and by protocol per
+    # topic), so a message only costs anything for the clients that take it:
+    # publish_topic() skips encoding when nobody would receive the result.
+
+    def __init__(self, room: Optional["Room"] = None, queue_size: int = BROADCAST_QUEUE_SIZE,
+                 slow_policy: str = BROADCAST_SLOW_POLICY):
+        self.room = room
+        self.queue_size = max(1, queue_size)
+        self.slow_policy = slow_policy if slow_policy in ("drop", "disconnect") else "drop"
+        self.conns: Dict[web.WebSocketResponse, ClientConnection] = {}
+        self.subscribers: Dict[str, Dict[web.WebSocketResponse, ClientConnection]] = {t: {} for t in TOPICS}
+        self.compact_subscribers: Dict[str, int] = {t: 0 for t in TOPICS}
+        # Called with every published (payload, compact, topic) (the coordinator mirrors to edges)
+        self.mirrors: list = []
+        # Close handshakes of disconnected slow clients, held until done so they are not collected
+        self.closing: Set[asyncio.Task] = set()
+
+        # metrics
+        self.published = 0
+        self.published_by_topic: Dict[str, int] = {t: 0 for t in TOPICS}
+        self.skipped_by_topic: Dict[str, int] = {t: 0 for t in TOPICS}  # not encoded: no audience
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.bytes_sent = 0
+        self.slow_resyncs = 0
+        self.slow_disconnects = 0
+        self.send_failures = 0
+        self.last_fanout_ms = 0.0
+        self.max_fanout_ms = 0.0
+        self.avg_delivery_ms = 0.0  # EWMA of enqueue -> written
+
+    def __len__(self) -> int:
+        return len(self.conns)
+
+    def register(self, ws: web.WebSocketResponse, compact: bool = False,
+                 topics: frozenset = frozenset(TOPICS)) -> ClientConnection:
+        conn = ClientConnection(ws, self.queue_size)
+        conn.compact = compact
+        conn.topics = topics
+        conn.task = asyncio.create_task(self._writer(conn))
+        self.conns[ws] = conn
+        self._index(conn)
+        return conn
+
+    async def unregister(self, ws: web.WebSocketResponse) -> None:
+        conn = self._forget(ws)
+        if conn is None or conn.task is None:
+            return
+        conn.task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await conn.task
+
+    def configure(self, ws: web.WebSocketResponse, compact: bool, topics: frozenset) -> Optional[ClientConnection]:
+        # Protocol and topics as negotiated at overlay_hello
+        conn = self.conns.get(ws)
+        if conn is not None:
+            self._unindex(conn)
+            conn.compact = compact
+            conn.topics = topics
+            self._index(conn)
+        return conn
+
+    def _index(self, conn: ClientConnection) -> None:
+        for topic in conn.topics:
+            self.subscribers[topic][conn.ws] = conn
+            self.compact_subscribers[topic] += conn.compact
+
+    def _unindex(self, conn: ClientConnection) -> None:
+        for topic in conn.topics:
+            if self.subscribers[topic].pop(conn.ws, None) is not None:
+                self.compact_subscribers[topic] -= conn.compact
+
+    def _forget(self, ws: web.WebSocketResponse) -> Optional[ClientConnection]:
+        conn = self.conns.pop(ws, None)
+        if conn is not None:
+            self._unindex(conn)
+        return conn
+
+    def wants(self, topic: Optional[str], compact: bool = False) -> bool:
+        # Would a `topic` message (in compact form) reach anyone? Edges take everything.
+        if topic is None or self.mirrors:
+            return True
+        return self.compact_subscribers[topic] > 0 if compact else bool(self.subscribers[topic])
+
+    def publish_topic(self, topic: str, make_payload, make_compact=None) -> bool:
+        # Encodes only for an audience: nothing without subscribers, and no
+        # compact frame unless a compact client subscribes to the topic
+        if not self.wants(topic):
+            self.skipped_by_topic[topic] += 1
+            return False
+        compact = make_compact() if make_compact is not None and self.wants(topic, compact=True) else None
+        self.publish(make_payload(), compact, topic)
+        return True
+
+    def publish(self, payload: bytes, compact: Optional[bytes] = None, topic: Optional[str] = None) -> None:
+        # One encoded payload per protocol shared by every queue; never awaits on a socket.
+        # With a topic only its subscribers get it, otherwise every client does.
+        self.published += 1
+        if topic is not None:
+            self.published_by_topic[topic] += 1
+        for mirror in self.mirrors:
+            mirror(payload, compact, topic)
+        targets = self.conns if topic is None else self.subscribers[topic]
+        if not targets:
+            return
+        t0 = time.perf_counter()
+        for conn in list(targets.values()):
+            if compact is not None and conn.compact:
+                self._enqueue(conn, compact, t0, True)
+            else:
+                self._enqueue(conn, payload, t0)
+        fanout = time.perf_counter() - t0
+        broadcast_fanout_seconds.observe(fanout)
+        fanout_ms = fanout * 1000.0
+        self.last_fanout_ms = fanout_ms
+        if fanout_ms > self.max_fanout_ms:
+            self.max_fanout_ms = fanout_ms
+
+    def send_to(self, ws: web.WebSocketResponse, payload: bytes, binary: bool = False) -> None:
+        conn = self.conns.get(ws)
+        if conn is not None:
+            self._enqueue(conn, payload, time.perf_counter(), binary)
+
+    def _enqueue(self, conn: ClientConnection, payload: bytes, t0: float, binary: bool = False) -> None:
+        try:
+            conn.queue.put_nowait((payload, t0, binary))
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.slow_policy == "disconnect":
+            self.slow_disconnects += 1
+            self._forget(conn.ws)
+            if conn.task is not None:
+                conn.task.cancel()
+            task = asyncio.create_task(conn.ws.close(code=aiohttp.WSCloseCode.TRY_AGAIN_LATER, message=b"too slow"))
+            self.closing.add(task)
+            task.add_done_callback(self.closing.discard)
+            return
+
+        # "drop": discard the whole backlog, then resync with a fresh snapshot so the
+        # client does not keep showing counts from messages it never received.
+        dropped = conn.queue.qsize()
+        while not conn.queue.empty():
+            conn.queue.get_nowait()
+        conn.dropped += dropped
+        self.frames_dropped += dropped
+        self.slow_resyncs += 1
+        state = encode_state(self.room, lean=conn.compact and conn.options_sent)
+        if state is not None:
+            conn.queue.put_nowait((state, t0, False))
+
+    async def _writer(self, conn: ClientConnection) -> None:
+        ws = conn.ws
+        send_frame = getattr(ws, "send_frame", None)  # aiohttp >= 3.11 sends bytes as-is
+        while True:
+            payload, t0, binary = await conn.queue.get()
+            try:
+                if send_frame is not None:
+                    await send_frame(payload, web.WSMsgType.BINARY if binary else web.WSMsgType.TEXT)
+                elif binary:
+                    await ws.send_bytes(payload)
+                else:
+                    await ws.send_str(payload.decode("utf-8"))
+            except Exception:
+                self.send_failures += 1
+                self._forget(ws)
+                return
+            conn.sent += 1
+            self.frames_sent += 1
+            self.bytes_sent += len(payload)
+            delivery_ms = (time.perf_counter() - t0) * 1000.0
+            self.avg_delivery_ms += (delivery_ms - self.avg_delivery_ms) * 0.05
+
+    def stats(self) -> dict:
+        depths = [c.queue.qsize() for c in self.conns.values()]
+        return {
+            "clients": len(self.conns),
+            "compact_clients": sum(1 for c in self.conns.values() if c.compact),
+            "subscribers": {t: len(self.subscribers[t]) for t in TOPICS},
+            "slow_policy": self.slow_policy,
+            "queue_size": self.queue_size,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths) if depths else 0,
+            "published": self.published,
+            "published_by_topic": dict(self.published_by_topic),
+            "skipped_by_topic": dict(self.skipped_by_topic),
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "bytes_sent": self.bytes_sent,
+            "slow_resyncs": self.slow_resyncs,
+            "slow_disconnects": self.slow_disconnects,
+            "send_failures": self.send_failures,
+            "fanout_ms_last": round(self.last_fanout_ms, 3),
+            "fanout_ms_max": round(self.max_fanout_ms, 3),
+            "delivery_ms_avg": round(self.avg_delivery_ms, 3),
+        }
+
+
+
+# =========================
+# Vote delta batching
+# =========================
+class VoteDeltaBatcher:
+    def __init__(self, room: "Room", tick_seconds: float = VOTE_TICK_SECONDS):
+        self.room = room
+        self.tick_seconds = max(0.01, tick_seconds)
+        self.dirty: Set[str] = set()
+        self.frames = 0
+        self.changes = 0
+
+    def mark(self, item_key: str) -> None:
+        self.dirty.add(item_key)
+        self.changes += 1
+
+    def clear(self) -> None:
+        self.dirty.clear()
+
+    def flush(self) -> None:
+        if not self.dirty:
+            return
+        room = self.room
+        changed = {k: room.vote_ledger.count(k) for k in self.dirty}
+        self.dirty.clear()
+        self.frames += 1
+        room.state_cache.touch_items(changed)
+        room.hub.publish_topic("votes", lambda: encode_ws({
+            "type": "votes_delta",
+            "round_id": room.round_id,
+            "votes": changed,
+        }), lambda: compact_votes_delta(room.round_id, changed))
+
+    def stats(self) -> dict:
+        return {
+            "tick_seconds": self.tick_seconds,
+            "pending": len(self.dirty),
+            "vote_changes": self.changes,
+            "delta_frames": self.frames,
+        }
+
+
+
+# =========================
+# State snapshots
+# =========================
+class StateSnapshot:
+    # Versioned, cached encodings of build_state_payload. The version moves when
+    # a round starts or ends, a placement opens, or a votes_delta tick goes out,
+    # so a reconnect wave shares one json.dumps per version (and per second of
+    # the countdown). Clients that send their last version get state_not_modified
+    # or a state_delta with just the items that changed since.
+
+    DELTA_CACHE_SIZE = 64
+
+    def __init__(self, room: "Room"):
+        self.room = room
+        # Start from the clock so versions from a previous process never look current
+        self.version = int(time.time() * 1000)
+        self.base_version = self.version  # last round/placement change; older needs a full state
+        self.item_versions: Dict[str, int] = {}
+        self.cache_key = None
+        self.cache: Dict[bool, bytes] = {}
+        self.delta_cache: Dict[int, bytes] = {}
+        self.not_modified_payload: Optional[bytes] = None
+
+        # metrics
+        self.encodes = 0
+        self.hits = 0
+        self.not_modified = 0
+        self.deltas = 0
+
+    def _bump(self) -> None:
+        self.version += 1
+        self.delta_cache.clear()
+        self.not_modified_payload = None
+
+    def touch(self) -> None:
+        self._bump()
+        self.base_version = self.version
+        self.item_versions.clear()
+
+    def touch_items(self, keys) -> None:
+        self._bump()
+        for key in keys:
+            self.item_versions[key] = self.version
+
+    def encode(self, lean: bool = False) -> bytes:
+        key = (self.version, self.room.remaining_seconds())
+        if key != self.cache_key:
+            self.cache_key = key
+            self.cache.clear()
+        payload = self.cache.get(lean)
+        if payload is not None:
+            self.hits += 1
+            return payload
+        state = self.room.build_state_payload(include_options=not lean)
+        state["version"] = self.version
+        payload = encode_ws(state)
+        self.cache[lean] = payload
+        self.encodes += 1
+        return payload
+
+    def reply(self, since: Optional[int], lean: bool = False) -> bytes:
+        if since == self.version:
+            self.not_modified += 1
+            if self.not_modified_payload is None:
+                self.not_modified_payload = encode_ws({"type": "state_not_modified", "version": self.version})
+            return self.not_modified_payload
+        if since is not None and self.base_version <= since < self.version:
+            self.deltas += 1
+            payload = self.delta_cache.get(since)
+            if payload is None:
+                if len(self.delta_cache) >= self.DELTA_CACHE_SIZE:
+                    self.delta_cache.clear()
+                payload = encode_ws({
+                    "type": "state_delta",
+                    "version": self.version,
+                    "round_id": self.room.round_id,
+                    "votes": {k: self.room.vote_ledger.count(k) for k, v in self.item_versions.items() if v > since},
+                })
+                self.delta_cache[since] = payload
+            return payload
+        return self.encode(lean)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "encodes": self.encodes,
+            "cache_hits": self.hits,
+            "not_modified": self.not_modified,
+            "deltas": self.deltas,
+        }
+
+
 
 # =========================
 # Helpers
 # =========================
-def compute_remaining_seconds() -> int:
-    if not current_round_active:
-        return 0
-    remain = int(round_end_ts - time.time())
-    return max(0, remain)
-
-def build_state_payload() -> dict:
-    return {
-        "type": "state",
-        "round": {
-            "active": current_round_active,
-            "round_id": current_round_id,
-            "duration_remaining": compute_remaining_seconds(),
-        },
-        "options": [{"key": k, "emoji": v["emoji"], "label": v["label"]} for k, v in ITEMS.items()],
-        "votes": current_votes,
-        "pending_placement": pending_placement,
-    }
-
-async def broadcast_ws(data: dict) -> None:
-    if not clients:
+def item_options() -> list:
+    return [{"key": k, "emoji": v["emoji"], "label": v["label"]} for k, v in ITEMS.items()]
+
+def encode_ws(data: dict) -> bytes:
+    return json_dumpb(data)
+
+async def broadcast_ws(room: "Room", data: dict) -> None:
+    kind = data.get("type", "unknown")
+    broadcasts_total.inc(kind)
+    topic = MESSAGE_TOPICS.get(kind)
+    if topic is None:
+        room.hub.publish(encode_ws(data))
+    else:
+        room.hub.publish_topic(topic, lambda: encode_ws(data))
+
+def encode_state(room: "Room", lean: bool = False, since: Optional[int] = None) -> Optional[bytes]:
+    if edge_link is not None:
+        # Edges serve the coordinator's latest snapshot as-is
+        return edge_link.state_reply(room, since, lean)
+    return room.state_cache.reply(since, lean)
+
+async def send_state(ws: web.WebSocketResponse, since: Optional[int] = None) -> None:
+    room = ws_room.get(ws)
+    conn = room.hub.conns.get(ws) if room is not None else None
+    if conn is None:
         return
-    msg = json.dumps(data, ensure_ascii=False)
-    dead = []
-    for ws in list(clients):
-        try:
-            await ws.send_str(msg)
-        except Exception:
-            dead.append(ws)
-    for ws in dead:
-        clients.discard(ws)
-        ws_user_id.pop(ws, None)
+    payload = encode_state(room, lean=conn.compact and conn.options_sent, since=since)
+    if payload is None:
+        if edge_link is not None:
+            # No state from the coordinator yet; answered when the first one arrives
+            edge_link.defer_state(room, ws)
+        return
+    conn.options_sent = True
+    room.hub.send_to(ws, payload)
 
-async def send_state(ws: web.WebSocketResponse) -> None:
-    await ws.send_str(json.dumps(build_state_payload(), ensure_ascii=False))
+async def send_state_unless_greeted(ws: web.WebSocketResponse) -> None:
+    # Fallback for clients that never send overlay_hello; cancelled when they do
+    await asyncio.sleep(HELLO_GRACE_SECONDS)
+    await send_state(ws)
 
-async def send_chat_message(message: str) -> None:
-    global BOT_INSTANCE
-    if not BOT_INSTANCE:
+def client_state_version(data: dict) -> Optional[int]:
+    version = data.get("version")
+    return version if isinstance(version, int) else None
+
+def send_chat_message(room: "Room", message: str, priority: int = CHAT_PRIORITY_NORMAL,
+                      key: Optional[str] = None, ttl: Optional[float] = None) -> None:
+    # Never blocks: the chat outbox sends it to the room's channel when the budget allows
+    if not chat_source:
         return
-    try:
-        channel = BOT_INSTANCE.get_channel(TWITCH_CHANNEL)
-        if channel:
-            await channel.send(message)
-    except Exception as e:
-        print(f"[CHAT ERROR] Failed to send message: {e}")
+    chat_outbox.post(message, priority=priority, key=f"{room.name}:{key}" if key else None, ttl=ttl,
+                     send=room.say)
 
 # place_item_in_game removed as requested
 
-async def register_vote(user_id: str, item_key: str):
-    global current_votes, votes_by_item_ids, user_id_to_name
-
-    # Check if user already voted
-    previous_vote = None
-    for k, voters in votes_by_item_ids.items():
-        if user_id in voters:
-            previous_vote = k
-            break
-    
-    if previous_vote == item_key:
+async def register_vote(room: "Room", user_id: str, item_key: str):
+    previous_vote, changed = room.vote_ledger.cast(user_id, item_key)
+    if not changed:
+        votes_total.inc("repeat")
         return # Already voted for this item
+    votes_total.inc("changed" if previous_vote else "new")
+
+    journal.record("vote", room=room.name, round_id=room.round_id, user_id=user_id, item=item_key,
+                   previous=previous_vote)
+    analytics.record_vote(room, user_id, item_key, previous_vote)
 
+    # Counts go out with the next votes_delta tick
     if previous_vote:
-        # Remove previous vote
-        votes_by_item_ids[previous_vote].discard(user_id)
-        current_votes[previous_vote] = max(0, current_votes.get(previous_vote, 1) - 1)
-        
-        # Broadcast update for the old item
-        await broadcast_ws({
-            "type": "vote",
-            "item": previous_vote,
-            "emoji": ITEMS[previous_vote]["emoji"],
-            "count": current_votes[previous_vote],
-        })
-    
-    # Add new vote
-    current_votes[item_key] = current_votes.get(item_key, 0) + 1
-    votes_by_item_ids.setdefault(item_key, set()).add(user_id)
-
-    # Broadcast update for the new item
-    await broadcast_ws({
-        "type": "vote",
-        "item": item_key,
-        "emoji": ITEMS[item_key]["emoji"],
-        "count": current_votes[item_key],
-    })
+        room.vote_batcher.mark(previous_vote)
+    room.vote_batcher.mark(item_key)
+
+# =========================
+# Admission control
+# =========================
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.stamp = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class AdmissionControl:
+    # Buckets are created on first use. Per-user and per-chatter buckets that
+    # have been idle long enough to be full again are pruned periodically, so
+    # memory follows active users rather than everyone ever seen.
+
+    PRUNE_SECONDS = 30.0
+    TYPE_ALIASES = {"sync": "get_state"}
+    # Placement Start (1) and End (3) bracket a drag; dropping either leaves the
+    # game mid-placement, so they have their own small bucket that a burst of
+    # hover (0) / drag (2) traffic cannot empty.
+    PLACEMENT_MOUSE_TYPES = (1, 3)
+
+    def __init__(self, conn_limits: Dict[str, tuple] = WS_CONN_LIMITS, user_limits: Dict[str, tuple] = WS_USER_LIMITS,
+                 chat_limits: Dict[str, tuple] = CHAT_LIMITS, max_connections: int = MAX_CONNECTIONS):
+        self.conn_limits = conn_limits
+        self.user_limits = user_limits
+        self.chat_limits = chat_limits
+        self.max_connections = max_connections
+        self.conn_buckets: Dict[Any, Dict[str, TokenBucket]] = {}
+        self.user_buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self.chat_buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self.reply_total = TokenBucket(*chat_limits["reply_total"], time.monotonic())
+        self.next_prune = time.monotonic() + self.PRUNE_SECONDS
+
+        # metrics: "<scope>:<type>" -> rejected count
+        self.rejected: Dict[str, int] = {}
+        self.connections_refused = 0
+
+    def _reject(self, key: str) -> bool:
+        self.rejected[key] = self.rejected.get(key, 0) + 1
+        return False
+
+    @staticmethod
+    def _take(buckets: Dict[str, TokenBucket], limits: Dict[str, tuple], kind: str, now: float) -> bool:
+        bucket = buckets.get(kind)
+        if bucket is None:
+            limit = limits.get(kind)
+            if limit is None:
+                return True
+            bucket = buckets[kind] = TokenBucket(limit[0], limit[1], now)
+        return bucket.take(now)
+
+    def admit_connection(self, current: int) -> bool:
+        if self.max_connections > 0 and current >= self.max_connections:
+            self.connections_refused += 1
+            return False
+        return True
+
+    @classmethod
+    def message_kind(cls, data: dict) -> str:
+        # Bucket name for a decoded message (see allow_message)
+        msg_type = data.get("type")
+        if msg_type == "mouse_event" and data.get("mouse_type") in cls.PLACEMENT_MOUSE_TYPES:
+            return "mouse_placement"
+        return cls.TYPE_ALIASES.get(msg_type, msg_type)
+
+    def allow_frame(self, ws) -> bool:
+        # Checked before the frame is even parsed
+        now = time.monotonic()
+        buckets = self.conn_buckets.setdefault(ws, {})
+        if not self._take(buckets, self.conn_limits, "*", now):
+            return self._reject("conn:*")
+        return True
+
+    def allow_message(self, ws, user_id: Optional[str], kind: str) -> bool:
+        now = time.monotonic()
+        if not self._take(self.conn_buckets.setdefault(ws, {}), self.conn_limits, kind, now):
+            return self._reject(f"conn:{kind}")
+        if user_id:
+            buckets = self.user_buckets.setdefault(user_id, {})
+            if not self._take(buckets, self.user_limits, "*", now):
+                return self._reject("user:*")
+            if not self._take(buckets, self.user_limits, kind, now):
+                return self._reject(f"user:{kind}")
+        self._maybe_prune(now)
+        return True
+
+    def forget(self, ws) -> None:
+        self.conn_buckets.pop(ws, None)
+
+    def allow_chat(self, user_key: str) -> bool:
+        now = time.monotonic()
+        if not self._take(self.chat_buckets.setdefault(user_key, {}), self.chat_limits, "command", now):
+            return self._reject("chat:command")
+        self._maybe_prune(now)
+        return True
+
+    def limited_reply(self, user_key: str, reply):
+        # Wraps a chat source's reply so error/help replies cannot flood the channel
+        async def send(text: str) -> None:
+            now = time.monotonic()
+            if not self._take(self.chat_buckets.setdefault(user_key, {}), self.chat_limits, "reply", now):
+                self._reject("chat:reply")
+                return
+            if not self.reply_total.take(now):
+                self._reject("chat:reply_total")
+                return
+            await reply(text)
+        return send
+
+    def _maybe_prune(self, now: float) -> None:
+        if now < self.next_prune:
+            return
+        self.next_prune = now + self.PRUNE_SECONDS
+        for table in (self.user_buckets, self.chat_buckets):
+            idle = [k for k, buckets in table.items()
+                    if all(b.tokens + (now - b.stamp) * b.rate >= b.burst for b in buckets.values())]
+            for k in idle:
+                del table[k]
+
+    def stats(self) -> dict:
+        return {
+            "max_connections": self.max_connections,
+            "connections_refused": self.connections_refused,
+            "tracked_connections": len(self.conn_buckets),
+            "tracked_users": len(self.user_buckets),
+            "tracked_chatters": len(self.chat_buckets),
+            "rejected": dict(self.rejected),
+            "rejected_total": sum(self.rejected.values()),
+        }
+
+
+admission = AdmissionControl()
+
+# =========================
+# Chat outbox
+# =========================
+class ChatOutbox:
+    WINDOW_SECONDS = 30.0
+
+    def __init__(self, budget: int = CHAT_BUDGET_PER_30S, max_pending: int = CHAT_OUTBOX_SIZE):
+        self.budget = max(1, budget)
+        self.max_pending = max(1, max_pending)
+        # [priority, seq, text, expires (monotonic) or None, send or None, live]
+        self.heap: list = []
+        self.by_key: Dict[str, list] = {}
+        self.pending = 0
+        self.seq = 0
+        self.sent_at: deque = deque()
+        self.wakeup = asyncio.Event()
+
+        # metrics
+        self.posted = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def post(self, text: str, priority: int = CHAT_PRIORITY_NORMAL, key: Optional[str] = None,
+             ttl: Optional[float] = None, send=None) -> None:
+        self.posted += 1
+        if key is not None:
+            stale = self.by_key.pop(key, None)
+            if stale is not None and stale[5]:
+                stale[5] = False
+                self.pending -= 1
+                self.coalesced += 1
+
+        if self.pending >= self.max_pending and not self._evict_below(priority):
+            self.dropped += 1
+            return
+
+        self.seq += 1
+        entry = [priority, self.seq, text, time.monotonic() + ttl if ttl is not None else None, send, True]
+        heapq.heappush(self.heap, entry)
+        self.pending += 1
+        if key is not None:
+            self.by_key[key] = entry
+        self.wakeup.set()
+
+    def reply_sender(self, reply, ttl: float = 15.0):
+        # Command replies share the channel budget, at the lowest priority
+        async def send(text: str) -> None:
+            self.post(text, priority=CHAT_PRIORITY_LOW, ttl=ttl, send=reply)
+        return send
+
+    def _evict_below(self, priority: int) -> bool:
+        # Full: make room by dropping the newest live entry of a lower priority
+        victim = None
+        for entry in self.heap:
+            if entry[5] and entry[0] > priority and (victim is None or entry[:2] > victim[:2]):
+                victim = entry
+        if victim is None:
+            return False
+        victim[5] = False
+        self.pending -= 1
+        self.dropped += 1
+        return True
+
+    def _pop(self) -> Optional[list]:
+        now = time.monotonic()
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            if not entry[5]:
+                continue
+            entry[5] = False
+            self.pending -= 1
+            if entry[3] is not None and now > entry[3]:
+                self.expired += 1
+                continue
+            return entry
+        return None
+
+    async def run(self) -> None:
+        while True:
+            if not self.pending:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            # Rolling-window budget
+            now = time.monotonic()
+            while self.sent_at and now - self.sent_at[0] >= self.WINDOW_SECONDS:
+                self.sent_at.popleft()
+            if len(self.sent_at) >= self.budget:
+                await asyncio.sleep(self.WINDOW_SECONDS - (now - self.sent_at[0]))
+                continue
+
+            entry = self._pop()
+            if entry is None:
+                continue
+            send = entry[4] or (chat_source.send if chat_source else None)
+            if send is None:
+                continue
+            # A failed send still counts: Twitch may have received it
+            self.sent_at.append(time.monotonic())
+            try:
+                await send(entry[2])
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                log_event("chat", "Failed to send message: %s", e, level=logging.ERROR)
+
+    def stats(self) -> dict:
+        return {
+            "budget_per_30s": self.budget,
+            "pending": self.pending,
+            "sent_last_30s": sum(1 for t in self.sent_at if time.monotonic() - t < self.WINDOW_SECONDS),
+            "posted": self.posted,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+chat_outbox = ChatOutbox()
+
+# =========================
+# Chat commands
+# =========================
+class ChatMessage:
+    __slots__ = ("user_id", "user_name", "content", "channel")
+
+    def __init__(self, user_id: str, user_name: str, content: str, channel: str = ""):
+        self.user_id = user_id
+        self.user_name = user_name
+        self.content = content
+        self.channel = channel
+
+
+async def cmd_items(msg: ChatMessage, reply) -> None:
+    items_list = " | ".join([f"{v['emoji']} {k}" for k, v in ITEMS.items()])
+    await reply(f"Available items: {items_list} | Vote with: !item <name>")
+
+async def cmd_item(msg: ChatMessage, reply) -> None:
+    parts = msg.content.split(maxsplit=1)
+    if len(parts) < 2:
+        await reply("Usage: !item <item_key>")
+        return
+
+    choice = parts[1].strip().lower()
+    if choice not in ITEMS:
+        await reply(f"Unknown item. Try: {', '.join(ITEMS.keys())}")
+        return
+
+    room = room_for_channel(msg.channel)
+    if room is None:
+        return
+
+    if not room.round_active:
+        await reply("No vote running right now. Wait for the next round!")
+        return
+
+    if not msg.user_id:
+        return
+
+    # remember name
+    user_id_to_name[msg.user_id] = msg.user_name
+
+    await register_vote(room, msg.user_id, choice)
+
+async def cmd_place(msg: ChatMessage, reply) -> None:
+    # Deprecated: Placement is now done via overlay click
+    await reply("Please click on the overlay to place your item!")
+
+CHAT_COMMANDS = {
+    "items": cmd_items,
+    "item": cmd_item,
+    "place": cmd_place,
+}
+
+async def dispatch_chat_message(msg: ChatMessage, reply) -> None:
+    # Entry point for chat sources that do not do their own command parsing
+    if not msg.content.startswith("!"):
+        return
+    name = msg.content[1:].split(maxsplit=1)[0].lower() if len(msg.content) > 1 else ""
+    handler = CHAT_COMMANDS.get(name)
+    if handler is not None:
+        await run_chat_command(handler, msg, reply)
+
+async def run_chat_command(handler, msg: ChatMessage, reply) -> None:
+    user_key = msg.user_id or msg.user_name
+    if not admission.allow_chat(user_key):
+        return
+    t0 = time.perf_counter()
+    try:
+        await handler(msg, admission.limited_reply(user_key, chat_outbox.reply_sender(reply)))
+    finally:
+        chat_command_seconds.observe(time.perf_counter() - t0, handler.__name__.replace("cmd_", "", 1))
 
 # =========================
 # Twitch bot
@@ -220,127 +1437,282 @@ class ChatBot(commands.Bot):
         super().__init__(
             token=TWITCH_TOKEN,
             prefix="!",
-            initial_channels=[TWITCH_CHANNEL],
+            initial_channels=sorted({room.channel for room in rooms.values()}),
         )
         self._http.session = self._custom_session
 
     async def event_ready(self):
-        print(f"--- BOT CONNECTED: {self.nick} --- (channel: {TWITCH_CHANNEL})")
+        log_event("chat", "Bot connected: %s", self.nick, channels=sorted(rooms_by_channel))
 
     async def event_message(self, message):
         # Check for echo (bot's own message)
         if getattr(message, "echo", False):
-            print(f"[CHAT] [BOT]: {message.content}")
+            log_event("chat", "%s", message.content, user="[BOT]")
             return
 
         # If author is missing, it's likely the bot itself (in some twitchio versions)
         # or a system message. We treat it as the bot to avoid "Unknown".
         if not message.author:
-            print(f"[CHAT] [BOT*]: {message.content}")
+            log_event("chat", "%s", message.content, user="[BOT*]")
             return
 
-        print(f"[CHAT] {message.author.name}: {message.content}")
+        log_event("chat", "%s", message.content, user=message.author.name)
         await self.handle_commands(message)
 
+    @staticmethod
+    def _to_chat_message(ctx: commands.Context) -> ChatMessage:
+        author = ctx.author
+        return ChatMessage(
+            user_id=str(getattr(author, "id", "")) if author else "",
+            user_name=author.name if author else "Unknown",
+            content=ctx.message.content,
+            channel=ctx.channel.name if ctx.channel else "",
+        )
+
     @commands.command(name="items")
     async def items_command(self, ctx: commands.Context):
-        items_list = " | ".join([f"{v['emoji']} {k}" for k, v in ITEMS.items()])
-        await ctx.send(f"Available items: {items_list} | Vote with: !item <name>")
+        await run_chat_command(cmd_items, self._to_chat_message(ctx), ctx.send)
 
     @commands.command(name="item")
     async def item_command(self, ctx: commands.Context):
-        global current_round_active
+        await run_chat_command(cmd_item, self._to_chat_message(ctx), ctx.send)
 
-        parts = ctx.message.content.split(maxsplit=1)
-        if len(parts) < 2:
-            await ctx.send("Usage: !item <item_key>")
-            return
+    @commands.command(name="place")
+    async def place_command(self, ctx: commands.Context):
+        await run_chat_command(cmd_place, self._to_chat_message(ctx), ctx.send)
 
-        choice = parts[1].strip().lower()
-        if choice not in ITEMS:
-            await ctx.send(f"Unknown item. Try: {', '.join(ITEMS.keys())}")
-            return
+# =========================
+# Chat sources
+# =========================
+class ChatSource(ABC):
+    # Feeds chat commands into the vote pipeline and carries the server's
+    # announcements back out. run() blocks for the lifetime of the server.
+    name = "base"
 
-        if not current_round_active:
-            await ctx.send("No vote running right now. Wait for the next round!")
-            return
+    @abstractmethod
+    async def run(self) -> None:
+        ...
 
-        author = ctx.author
-        user_name = author.name if author else "Unknown"
-        user_id = str(getattr(author, "id", "")) if author else ""
+    @abstractmethod
+    async def send(self, message: str, channel: str = "") -> None:
+        # channel "" -> the first room's channel
+        ...
 
-        if not user_id:
-            return
+    async def close(self) -> None:
+        pass
 
-        # remember name
-        user_id_to_name[user_id] = user_name
+    def stats(self) -> dict:
+        return {"source": self.name}
 
-        await register_vote(user_id, choice)
 
-    @commands.command(name="place")
-    async def place_command(self, ctx: commands.Context):
-        # Deprecated: Placement is now done via overlay click
-        await ctx.send("Please click on the overlay to place your item!")
+class TwitchChatSource(ChatSource):
+    name = "twitch"
 
-async def connect_game_socket():
-    global game_writer
-    try:
-        _, writer = await asyncio.open_connection('127.0.0.1', 31415)
-        writer.write(b'\x06') # Role: Game Event Injector
-        await writer.drain()
-        game_writer = writer
-        print("Connected to game server.")
-    except Exception as e:
-        print(f"Game connection failed: {e}")
-        game_writer = None
-
-async def send_game_event(event_type, x, y, vx, vy, terminate):
-    global game_writer, game_event_id
+    def __init__(self):
+        self.bot = ChatBot()
+        self.channels: Dict[str, Any] = {}
+
+    async def run(self) -> None:
+        await self.bot.start()
+
+    async def send(self, message: str, channel: str = "") -> None:
+        name = channel or default_room.channel
+        target = self.channels.get(name)
+        if target is None:
+            target = self.bot.get_channel(name)
+            if target is None:
+                return
+            self.channels[name] = target
+        await target.send(message)
+
+    async def close(self) -> None:
+        with contextlib.suppress(Exception):
+            await self.bot.close()
+        with contextlib.suppress(Exception):
+            await self.bot._custom_session.close()
+
+
+class SyntheticChatSource(ChatSource):
+    # Offline stand-in for Twitch chat: N fake users sending !item commands at a
+    # configurable rate and item distribution. Users keep their pick and switch
+    # with probability `switch_prob`; bursts multiply the rate for a few seconds
+    # and pile onto one "hype" item. Each fake user chats in one room's channel.
+    # Messages are generated in per-tick batches, so tens of thousands per
+    # second are possible on one core.
+    name = "synthetic"
+    TICK_SECONDS = 0.01
+
+    def __init__(self, users: int = SYNTH_CHAT_USERS, rate: float = SYNTH_CHAT_RATE,
+                 weights: Optional[Dict[str, float]] = None, switch_prob: float = SYNTH_CHAT_SWITCH,
+                 burst_every: float = SYNTH_CHAT_BURST_EVERY, burst_seconds: float = SYNTH_CHAT_BURST_SECONDS,
+                 burst_factor: float = SYNTH_CHAT_BURST_FACTOR, invalid_ratio: float = SYNTH_CHAT_INVALID,
+                 channels: Optional[list] = None, seed: Optional[int] = None):
+        self.users = max(1, users)
+        self.rate = max(0.0, rate)
+        self.switch_prob = switch_prob
+        self.burst_every = burst_every
+        self.burst_seconds = burst_seconds
+        self.burst_factor = burst_factor
+        self.invalid_ratio = invalid_ratio
+        self.channels = channels or [room.channel for room in rooms.values()]
+        self.rng = random.Random(seed)
+
+        self.keys = list(ITEMS.keys())
+        if weights is None:
+            weights = self.parse_weights(SYNTH_CHAT_WEIGHTS)
+        cum, total = [], 0.0
+        for k in self.keys:
+            total += max(0.0, weights.get(k, 1.0))
+            cum.append(total)
+        self.cum_weights = cum
+        self.picks: Dict[int, str] = {}
+        self.burst_item: Optional[str] = None
+
+        # metrics
+        self.generated = 0
+        self.replies = 0
+        self.sent: deque = deque(maxlen=100)  # announcements the server "posted"
+        self.started_at = 0.0
+
+    @staticmethod
+    def parse_weights(spec: str) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for part in spec.split(","):
+            if ":" in part:
+                k, w = part.split(":", 1)
+                weights[k.strip().lower()] = float(w)
+        return weights
+
+    def current_rate(self, elapsed: float) -> float:
+        if self.burst_every <= 0:
+            self.burst_item = None
+            return self.rate
+        in_burst = (elapsed % self.burst_every) < self.burst_seconds and elapsed >= self.burst_every
+        if not in_burst:
+            self.burst_item = None
+            return self.rate
+        if self.burst_item is None:
+            self.burst_item = self.rng.choice(self.keys)
+        return self.rate * self.burst_factor
+
+    def next_message(self) -> ChatMessage:
+        rng = self.rng
+        uid = rng.randrange(self.users)
+        user_id, user_name = f"synth{uid}", f"synth_user{uid}"
+        channel = self.channels[uid % len(self.channels)]
+        self.generated += 1
+
+        if rng.random() < self.invalid_ratio:
+            return ChatMessage(user_id, user_name, rng.choice(("!item", "!item nope", "!items")), channel)
+
+        pick = self.picks.get(uid)
+        if pick is None or rng.random() < self.switch_prob:
+            if self.burst_item is not None and rng.random() < 0.5:
+                pick = self.burst_item
+            else:
+                pick = rng.choices(self.keys, cum_weights=self.cum_weights)[0]
+            self.picks[uid] = pick
+        return ChatMessage(user_id, user_name, f"!item {pick}", channel)
+
+    async def _reply(self, text: str) -> None:
+        self.replies += 1
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.started_at = last = loop.time()
+        owed = 0.0
+        while True:
+            await asyncio.sleep(self.TICK_SECONDS)
+            now = loop.time()
+            owed += self.current_rate(now - self.started_at) * (now - last)
+            last = now
+            n = int(owed)
+            owed -= n
+            for _ in range(n):
+                await dispatch_chat_message(self.next_message(), self._reply)
+
+    async def send(self, message: str, channel: str = "") -> None:
+        self.sent.append(message)
+        log_event("chat", "%s", message, user="[BOT]", channel=channel or default_room.channel)
+
+    def stats(self) -> dict:
+        return {
+            "source": self.name,
+            "users": self.users,
+            "rate": self.rate,
+            "channels": len(self.channels),
+            "generated": self.generated,
+            "replies": self.replies,
+            "burst_item": self.burst_item,
+        }
+
+
+def create_chat_source(kind: str = CHAT_SOURCE) -> ChatSource:
+    if kind == "synthetic":
+        return SyntheticChatSource()
+    return TwitchChatSource()
+
+# =========================
+# Game link
+# =========================
+class GameLink(AsyncEventInjector):
+    # Supervised connection to the game's event socket: event_injector's asyncio
+    # sender (queue, batching, single-buffer writes, reconnect with backoff)
+    # with the server's logging and metrics attached through its hooks.
+
+    def __init__(self, host: str = GAME_HOST, port: int = GAME_PORT, queue_size: int = GAME_QUEUE_SIZE,
+                 batch: bool = GAME_BATCH, batch_max: int = GAME_BATCH_MAX):
+        super().__init__(host, port, batch=batch, batch_max=batch_max, queue_size=queue_size,
+                         reconnect_min=GAME_RECONNECT_MIN, reconnect_max=GAME_RECONNECT_MAX)
+
+    def on_connect(self) -> None:
+        log_event("game", "Connected to game server", address=f"{self.host}:{self.port}", role=self.role[0])
+
+    def on_connect_error(self, error: Exception, retry_in: float) -> None:
+        log_event("game", "Game connection failed: %s", error, level=logging.WARNING, retry_in=round(retry_in, 2))
+
+    def on_disconnect(self, error: Exception) -> None:
+        log_event("game", "Game connection lost: %s", error, level=logging.WARNING)
+
+    def on_drain(self, items: list, frames: list, seconds: float) -> None:
+        game_drain_seconds.observe(seconds)
+        now = time.perf_counter()
+        for item in items:
+            game_event_latency_seconds.observe(now - item[2])
+
+    def stats(self) -> dict:
+        return {"enabled": message_pb2 is not None, **super().stats()}
+
+
+def send_game_event(room: "Room", event_type, x, y, vx, vy, terminate):
     if not message_pb2: return
-    
-    if game_writer is None:
-        await connect_game_socket()
-        if game_writer is None: return
 
-    try:
-        event = message_pb2.GrpcGameEvent()
-        event.event_id = game_event_id
-        event.event_type = event_type
-        event.x = int(x)
-        event.y = int(y)
-        event.vx = int(vx)
-        event.vy = int(vy)
-        event.time = 180
-        event.terminate = terminate
-        
-        data = event.SerializeToString()
-        game_writer.write(struct.pack('<I', len(data)))
-        game_writer.write(data)
-        await game_writer.drain()
-        print(f"Sent Game Event: Type={event_type}, X={x}, Y={y}, VX={vx}, VY={vy}, Term={terminate}")
-
-        if terminate:
-            game_event_id += 1
-    except Exception as e:
-        print(f"Failed to send game event: {e}")
-        game_writer = None
-
-async def handle_game_mouse_event(m_state, x, y, ws):
-    global active_mouse_start, pending_placement
-    
-    user_id = ws_user_id.get(ws)
+    journal.record("game_event", room=room.name, event_id=room.game_event_id, event_type=event_type,
+                   x=int(x), y=int(y), vx=int(vx), vy=int(vy), terminate=terminate)
+
+    game_events_total.inc("placement" if terminate else "hover" if event_type == 0 else "other")
+    room.game_link.send(encode_event(room.game_event_id, event_type, x, y, vx, vy, terminate),
+                        hover=(event_type == 0 and not terminate))
+    log_event("game", "Queued game event", room=room.name, type=event_type, x=x, y=y, vx=vx, vy=vy, term=terminate)
+
+    if terminate:
+        room.game_event_id += 1
+
+def handle_game_mouse_event(room: "Room", m_state, x, y, user_id):
+    pending_placement = room.pending_placement
+
     # Check if this user is the chosen one
     if not pending_placement or str(pending_placement.get("chosen_user_id")) != str(user_id):
         return
 
     if m_state == 0: # Hover
-        await send_game_event(0, x, y, 0, 0, False)
+        send_game_event(room, 0, x, y, 0, 0, False)
         
     elif m_state == 1: # Start
-        active_mouse_start = (x, y)
+        room.active_mouse_start = (x, y)
         
     elif m_state == 3: # End
-        start_x, start_y = active_mouse_start
+        start_x, start_y = room.active_mouse_start
         dx = x - start_x
         dy = y - start_y
         
@@ -350,54 +1722,243 @@ async def handle_game_mouse_event(m_state, x, y, ws):
         item_key = pending_placement.get("item_key")
         item_type = max(min(ITEM_TYPE_MAP.get(item_key, 1),5),0)
         
-        await send_game_event(item_type, start_x, start_y, vx, vy, True)
+        send_game_event(room, item_type, start_x, start_y, vx, vy, True)
+        journal.record("placement", room=room.name, round_id=pending_placement.get("round_id"), item=item_key,
+                       from_user_id=user_id, x=start_x, y=start_y, vx=vx, vy=vy)
+        room.round_scheduler.end_phase("placement")
+
+# =========================
+# Mouse coalescing
+# =========================
+class MouseCoalescer:
+    # Browsers fire mousemove at hundreds of Hz. Hover (0) and drag (2) positions
+    # are kept per placement session and type, and only the latest of each is
+    # forwarded on each flush (a drag never hides the hover the game needs);
+    # Start (1) and End (3) flush the session first and then go out
+    # immediately, so ordering is preserved and they are never dropped.
+
+    CONTINUOUS = (0, 2)
+
+    def __init__(self, room: "Room", flush_hz: float = MOUSE_FLUSH_HZ):
+        self.room = room
+        self.interval = 1.0 / max(1.0, flush_hz)
+        # (placement round_id, user key, m_state) -> (m_state, x, y, user_id)
+        self.pending: Dict[tuple, tuple] = {}
+        self.received = 0
+        self.coalesced = 0
+        self.forwarded = 0
+
+    def submit(self, user_id: Optional[str], conn_key, m_state: int, x: int, y: int) -> None:
+        self.received += 1
+        pending_placement = self.room.pending_placement
+        session = pending_placement.get("round_id") if pending_placement else 0
+        user_key = user_id or conn_key
+
+        if m_state in self.CONTINUOUS:
+            key = (session, user_key, m_state)
+            if key in self.pending:
+                self.coalesced += 1
+            self.pending[key] = (m_state, x, y, user_id)
+            return
+
+        for continuous in self.CONTINUOUS:
+            queued = self.pending.pop((session, user_key, continuous), None)
+            if queued is not None:
+                self._forward(*queued)
+        self._forward(m_state, x, y, user_id)
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        batch = self.pending
+        self.pending = {}
+        for m_state, x, y, user_id in batch.values():
+            self._forward(m_state, x, y, user_id)
+
+    def _forward(self, m_state: int, x: int, y: int, user_id: Optional[str]) -> None:
+        self.forwarded += 1
+        handle_game_mouse_event(self.room, m_state, x, y, user_id)
+        self.room.hub.publish_topic("mouse", lambda: encode_ws({
+            "type": "mouse_event",
+            "mouse_type": m_state,
+            "x": x,
+            "y": y
+        }), lambda: compact_mouse_event(m_state, x, y))
+
+    def stats(self) -> dict:
+        return {
+            "flush_hz": round(1.0 / self.interval, 2),
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "forwarded": self.forwarded,
+            "pending": len(self.pending),
+        }
+
 
 # =========================
 # Rounds loop
 # =========================
-async def rounds_loop():
-    global current_round_active, current_votes, current_round_id, votes_by_item_ids, pending_placement, round_end_ts
+class RoundScheduler:
+    # Runs the round phases against absolute deadlines on loop.time(). A phase
+    # starts at the previous phase's planned end, not at whenever the work done
+    # at the boundary (broadcasts, journaling, chat) finished, so rounds do not
+    # drift. The current deadline can be moved or ended early from elsewhere.
+
+    RESYNC_SECONDS = 1.0  # further behind than this (e.g. a long stall) -> restart the clock
+
+    def __init__(self):
+        self.phase: Optional[str] = None
+        self.phase_start = 0.0
+        self.deadline: Optional[float] = None
+        self.ended_early = False
+        self.wake: Optional[asyncio.Event] = None
+
+        # metrics: lateness of every timer wake-up vs its deadline
+        self.timers = 0
+        self.resyncs = 0
+        self.jitter_ms_last = 0.0
+        self.jitter_ms_max = 0.0
+        self.jitter_ms_avg = 0.0  # EWMA
+        self.phase_counts: Dict[str, int] = {}
+
+    @staticmethod
+    def now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def remaining(self) -> float:
+        if self.deadline is None:
+            return 0.0
+        return max(0.0, self.deadline - self.now())
+
+    def reschedule(self, phase: str, deadline: float) -> bool:
+        # Move the current phase's deadline (loop.time() based)
+        if self.phase != phase or self.wake is None:
+            return False
+        self.deadline = deadline
+        self.wake.set()
+        return True
+
+    def end_phase(self, phase: str) -> bool:
+        if self.phase != phase or self.wake is None:
+            return False
+        self.ended_early = True
+        return self.reschedule(phase, self.now())
+
+    async def run_phase(self, phase: str, duration: float, checkpoints=(), on_checkpoint=None) -> bool:
+        # Returns False if the phase was ended early. on_checkpoint(seconds_left)
+        # runs at deadline - c for every c in checkpoints shorter than the phase.
+        if self.wake is None:
+            self.wake = asyncio.Event()
+        now = self.now()
+        start = self.deadline if self.deadline is not None else now
+        if now - start > self.RESYNC_SECONDS:
+            self.resyncs += 1
+            start = now
+        self.phase = phase
+        self.phase_start = start
+        self.deadline = start + max(0.0, duration)
+        self.ended_early = False
+        self.phase_counts[phase] = self.phase_counts.get(phase, 0) + 1
+
+        try:
+            for left in sorted((c for c in checkpoints if c < duration), reverse=True):
+                await self._wait_until(lambda: self.deadline - left)
+                if self.ended_early:
+                    return False
+                if on_checkpoint is not None:
+                    on_checkpoint(left)
+            await self._wait_until(lambda: self.deadline)
+            return not self.ended_early
+        finally:
+            self.phase = None
+
+    async def _wait_until(self, target) -> None:
+        # target() is re-read after every wake-up, so reschedule() takes effect at once
+        while True:
+            delay = target() - self.now()
+            if delay <= 0 or self.ended_early:
+                break
+            self.wake.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.wake.wait(), delay)
+        if not self.ended_early:
+            self._record_jitter((self.now() - target()) * 1000.0)
+
+    def _record_jitter(self, late_ms: float) -> None:
+        late_ms = max(0.0, late_ms)
+        round_skew_seconds.observe(late_ms / 1000.0)
+        self.timers += 1
+        self.jitter_ms_last = late_ms
+        self.jitter_ms_max = max(self.jitter_ms_max, late_ms)
+        self.jitter_ms_avg += (late_ms - self.jitter_ms_avg) * 0.1
+
+    def stats(self) -> dict:
+        return {
+            "phase": self.phase,
+            "phase_remaining": round(self.remaining(), 3) if self.phase else 0.0,
+            "phases": dict(self.phase_counts),
+            "timers": self.timers,
+            "resyncs": self.resyncs,
+            "jitter_ms_last": round(self.jitter_ms_last, 3),
+            "jitter_ms_max": round(self.jitter_ms_max, 3),
+            "jitter_ms_avg": round(self.jitter_ms_avg, 3),
+        }
+
+
+
+def announce_countdown(room: "Room", left: int) -> None:
+    if room.round_active:
+        send_chat_message(room, f"⏰ {left} seconds left to vote!",
+                          priority=CHAT_PRIORITY_LOW, key="countdown", ttl=left)
+
+def record_round_outcome(room: "Room", round_id: int, outcome: str, winner_key: Optional[str],
+                         final_votes: Dict[str, int], voters: int) -> None:
+    rounds_total.inc(outcome)
+    analytics.record_round(room, round_id, winner_key, final_votes, voters, outcome)
+
+async def rounds_loop(room: "Room"):
+    scheduler = room.round_scheduler
+    ledger = room.vote_ledger
 
     await asyncio.sleep(3)
 
     while True:
-        current_round_id += 1
-        print(f"=== Starting round {current_round_id} ===")
+        room.round_id += 1
+        round_id = room.round_id
+        log_event("round", "Starting round %d", round_id, room=room.name)
 
-        current_votes = {k: 0 for k in ITEMS.keys()}
-        votes_by_item_ids = {k: set() for k in ITEMS.keys()}
-        pending_placement = None
+        ledger.reset()
+        room.pending_placement = None
+        room.vote_batcher.clear()
 
-        current_round_active = True
-        round_end_ts = time.time() + ROUND_DURATION
+        room.round_active = True
+        room.state_cache.touch()
 
         items_list = " | ".join([f"{v['emoji']} {k}" for k, v in ITEMS.items()])
-        await send_chat_message(
-            f"🎮 Round {current_round_id} starts! Vote with: !item <name> | {ROUND_DURATION}s | {items_list}"
+        send_chat_message(
+            room, f"🎮 Round {round_id} starts! Vote with: !item <name> | {ROUND_DURATION}s | {items_list}",
+            priority=CHAT_PRIORITY_HIGH, key="round", ttl=ROUND_DURATION
         )
 
-        await broadcast_ws({
+        await broadcast_ws(room, {
             "type": "round_start",
-            "round_id": current_round_id,
+            "round_id": round_id,
             "duration": ROUND_DURATION,
-            "options": [{"key": k, "emoji": v["emoji"], "label": v["label"]} for k, v in ITEMS.items()],
+            "options": item_options(),
         })
 
-        for remaining in (20, 10, 5):
-            await asyncio.sleep(max(0, round_end_ts - time.time() - remaining))
-            if current_round_active and remaining > 0:
-                await send_chat_message(f"⏰ {remaining} seconds left to vote!")
+        await scheduler.run_phase("vote", ROUND_DURATION, ROUND_COUNTDOWN,
+                                  lambda left: announce_countdown(room, left))
 
-        await asyncio.sleep(max(0, round_end_ts - time.time()))
-        
-        # Wait a bit for final "locked in" votes or timeout votes to arrive
-        await asyncio.sleep(0.5)
+        # Grace: final "locked in" votes still in flight are counted
+        await scheduler.run_phase("grace", ROUND_GRACE_SECONDS)
 
-        current_round_active = False
-        round_end_ts = 0.0
+        room.round_active = False
+        room.state_cache.touch()
+        room.vote_batcher.flush()
 
-        max_votes = max(current_votes.values()) if current_votes else 0
-        winner_key = max(current_votes, key=lambda k: current_votes[k]) if max_votes > 0 else None
+        final_votes = ledger.snapshot()
+        winner_key, max_votes = ledger.leader()
 
         winner = None
         if winner_key:
@@ -405,61 +1966,491 @@ async def rounds_loop():
                 "key": winner_key,
                 "emoji": ITEMS[winner_key]["emoji"],
                 "label": ITEMS[winner_key]["label"],
-                "votes": current_votes[winner_key],
+                "votes": max_votes,
             }
 
-        await broadcast_ws({
+        await broadcast_ws(room, {
             "type": "round_result",
-            "round_id": current_round_id,
+            "round_id": round_id,
             "winner": winner,
-            "votes": current_votes,
+            "votes": final_votes,
         })
+        journal.record("round_result", room=room.name, round_id=round_id, winner=winner_key, votes=final_votes,
+                       voters=len(ledger))
 
         if not winner_key:
-            await send_chat_message(f"❌ Round {current_round_id} ended with no votes. Next round in {ROUND_BREAK_SECONDS}s...")
-            await asyncio.sleep(ROUND_BREAK_SECONDS)
+            send_chat_message(room, f"❌ Round {round_id} ended with no votes. Next round in {ROUND_BREAK_SECONDS}s...",
+                              key="round", ttl=ROUND_BREAK_SECONDS)
+            record_round_outcome(room, round_id, "no_votes", None, final_votes, len(ledger))
+            await scheduler.run_phase("break", ROUND_BREAK_SECONDS)
             continue
 
-        vote_summary = " | ".join([f"{ITEMS[k]['emoji']} {v}" for k, v in current_votes.items() if v > 0])
-        await send_chat_message(f"📊 Votes: {vote_summary}")
+        vote_summary = " | ".join([f"{ITEMS[k]['emoji']} {v}" for k, v in final_votes.items() if v > 0])
+        send_chat_message(room, f"📊 Votes: {vote_summary}", key="summary", ttl=ROUND_BREAK_SECONDS)
 
         # Choose winner among voters (by user_id)
-        voter_ids = list(votes_by_item_ids.get(winner_key, []))
-        if voter_ids:
-            chosen_user_id = random.choice(voter_ids)
-            chosen_user = user_id_to_name.get(chosen_user_id, "Overlay Viewer")
-
-            pending_placement = {
-                "round_id": current_round_id,
-                "item_key": winner_key,
-                "chosen_user": chosen_user,
-                "chosen_user_id": chosen_user_id,
-                "ts": time.time(),
-            }
+        voter_ids = ledger.voters_of(winner_key)
+        if not voter_ids:
+            record_round_outcome(room, round_id, "no_voters", winner_key, final_votes, len(ledger))
+            await scheduler.run_phase("break", ROUND_BREAK_SECONDS)
+            continue
 
-            # Only mention user if we actually know their name (from chat)
-            # Otherwise just say "A viewer" or similar
-            if chosen_user == "Overlay Viewer":
-                msg = (f"🏆 {ITEMS[winner_key]['emoji']} {ITEMS[winner_key]['label']} wins! "
-                       f"A viewer is placing it! ({PLACEMENT_TIMEOUT}s)")
-            else:
-                msg = (f"🏆 {ITEMS[winner_key]['emoji']} {ITEMS[winner_key]['label']} wins! "
-                       f"@{chosen_user} - Click the overlay to place it! ({PLACEMENT_TIMEOUT}s)")
-            
-            await send_chat_message(msg)
-
-            await broadcast_ws({
-                "type": "placement_request",
-                "round_id": current_round_id,
-                "item_key": winner_key,
-                "emoji": ITEMS[winner_key]["emoji"],
-                "label": ITEMS[winner_key]["label"],
-                "chosen_user": chosen_user,
-                "chosen_user_id": chosen_user_id,
-                "hint": "Click the overlay to place your item!",
-            })
+        chosen_user_id = random.choice(voter_ids)
+        chosen_user = user_id_to_name.get(chosen_user_id, "Overlay Viewer")
+
+        room.pending_placement = {
+            "round_id": round_id,
+            "item_key": winner_key,
+            "chosen_user": chosen_user,
+            "chosen_user_id": chosen_user_id,
+            "ts": time.time(),
+        }
+        room.state_cache.touch()
+        journal.record("placement_request", room=room.name, round_id=round_id, item=winner_key,
+                       chosen_user_id=chosen_user_id, candidates=len(voter_ids))
+
+        # Only mention user if we actually know their name (from chat)
+        # Otherwise just say "A viewer" or similar
+        if chosen_user == "Overlay Viewer":
+            msg = (f"🏆 {ITEMS[winner_key]['emoji']} {ITEMS[winner_key]['label']} wins! "
+                   f"A viewer is placing it! ({PLACEMENT_TIMEOUT}s)")
+        else:
+            msg = (f"🏆 {ITEMS[winner_key]['emoji']} {ITEMS[winner_key]['label']} wins! "
+                   f"@{chosen_user} - Click the overlay to place it! ({PLACEMENT_TIMEOUT}s)")
+
+        send_chat_message(room, msg, priority=CHAT_PRIORITY_HIGH, key="round", ttl=PLACEMENT_TIMEOUT)
+
+        await broadcast_ws(room, {
+            "type": "placement_request",
+            "round_id": round_id,
+            "item_key": winner_key,
+            "emoji": ITEMS[winner_key]["emoji"],
+            "label": ITEMS[winner_key]["label"],
+            "chosen_user": chosen_user,
+            "chosen_user_id": chosen_user_id,
+            "hint": "Click the overlay to place your item!",
+        })
+
+        # Ends early once the winner releases the mouse (see handle_game_mouse_event)
+        placed = not await scheduler.run_phase("placement", PLACEMENT_TIMEOUT)
+        record_round_outcome(room, round_id, "placed" if placed else "placement_timeout", winner_key, final_votes,
+                             len(ledger))
+
+        room.pending_placement = None
+        room.state_cache.touch()
+        await broadcast_ws(room, {"type": "placement_complete", "round_id": round_id, "placed": placed})
 
-        await asyncio.sleep(ROUND_BREAK_SECONDS)
+        await scheduler.run_phase("break", PLACEMENT_BREAK_SECONDS)
+
+# =========================
+# Rooms
+# =========================
+class Room:
+    # One match: a Twitch channel, a game instance and the overlays watching it.
+    # Each room runs its own rounds, vote ledger, broadcast hub and game link;
+    # the chat connection and its budget, the journal, admission control and
+    # the event loop are shared by all rooms.
+
+    def __init__(self, name: str, channel: str, game_host: str = GAME_HOST, game_port: int = GAME_PORT):
+        self.name = name
+        self.channel = channel
+
+        self.round_active = False
+        self.round_id = 0
+        # pending placement:
+        # { "round_id": int, "item_key": str, "chosen_user": str, "chosen_user_id": str, "ts": float }
+        self.pending_placement: Optional[Dict[str, Any]] = None
+        # Track votes by Twitch user_id (not only names)
+        self.vote_ledger = VoteLedger(ITEMS.keys())
+
+        # Game socket (see GameLink)
+        self.game_event_id = 0
+        self.active_mouse_start = (0, 0)
+
+        self.hub = BroadcastHub(self)
+        self.vote_batcher = VoteDeltaBatcher(self)
+        self.state_cache = StateSnapshot(self)
+        self.game_link = GameLink(game_host, game_port)
+        self.mouse_coalescer = MouseCoalescer(self)
+        self.round_scheduler = RoundScheduler()
+
+    def remaining_seconds(self) -> int:
+        # Vote time left, from the scheduler's loop.time() deadline so it always
+        # matches when the round actually closes
+        if not self.round_active:
+            return 0
+        phase = self.round_scheduler.phase
+        if phase == "vote":
+            return int(self.round_scheduler.remaining())
+        # "grace": voting time is up; anything else: the vote phase starts next
+        return 0 if phase == "grace" else ROUND_DURATION
+
+    def build_state_payload(self, include_options: bool = True) -> dict:
+        state = {
+            "type": "state",
+            "room": self.name,
+            "round": {
+                "active": self.round_active,
+                "round_id": self.round_id,
+                "duration_remaining": self.remaining_seconds(),
+            },
+            "votes": self.vote_ledger.snapshot(),
+            "pending_placement": self.pending_placement,
+        }
+        if include_options:
+            # The item list never changes while running; compact clients cache it
+            state["options"] = item_options()
+        return state
+
+    async def say(self, text: str) -> None:
+        if chat_source is not None:
+            await chat_source.send(text, self.channel)
+
+    def start(self) -> list:
+        tasks = [asyncio.create_task(rounds_loop(self))]
+        if message_pb2:
+            tasks.append(asyncio.create_task(self.game_link.run()))
+        return tasks
+
+    def stats(self) -> dict:
+        return {
+            "channel": self.channel,
+            "clients": len(self.hub),
+            "round_active": self.round_active,
+            "round_id": self.round_id,
+            "pending": self.pending_placement,
+            "rounds": self.round_scheduler.stats(),
+            "broadcast": self.hub.stats(),
+            "votes": self.vote_batcher.stats(),
+            "state": self.state_cache.stats(),
+            "game": self.game_link.stats(),
+            "mouse": self.mouse_coalescer.stats(),
+        }
+
+
+rooms: Dict[str, Room] = {name: Room(name, channel, host, port) for name, channel, host, port in ROOM_SPECS}
+default_room = next(iter(rooms.values()))
+rooms_by_channel: Dict[str, Room] = {}
+for _room in rooms.values():
+    rooms_by_channel.setdefault(_room.channel, _room)  # one room per channel; the first one wins
+
+
+def room_for_channel(channel: str) -> Optional[Room]:
+    if not channel:
+        return default_room
+    return rooms_by_channel.get(channel.lower().lstrip("#"))
+
+def total_clients() -> int:
+    return sum(len(room.hub) for room in rooms.values())
+
+def broadcast_totals() -> dict:
+    # hub.stats() of every room added up
+    totals = {k: 0 for k in ("clients", "compact_clients", "queue_depth_total", "published", "frames_sent",
+                             "frames_dropped", "bytes_sent", "slow_resyncs", "slow_disconnects", "send_failures")}
+    totals.update(queue_depth_max=0, fanout_ms_max=0.0)
+    for room in rooms.values():
+        stats = room.hub.stats()
+        for k in totals:
+            totals[k] = max(totals[k], stats[k]) if k.endswith("_max") else totals[k] + stats[k]
+    return totals
+
+async def rooms_tick(interval: float, flush) -> None:
+    # One timer drives a periodic flush for every room instead of a task per room
+    while True:
+        await asyncio.sleep(interval)
+        for room in rooms.values():
+            flush(room)
+
+# =========================
+# State bus (coordinator <-> edges)
+# =========================
+# Framing and frame kinds: see statebus.py. Room-tagged payloads start with the
+# room name ('<B' length + name).
+def bus_pack_room(room: Room, payload: bytes) -> bytes:
+    name = room.name.encode("utf-8")
+    return bytes((len(name),)) + name + payload
+
+def bus_unpack_room(payload: bytes):
+    # -> (Room or None if this process does not know it, rest of the payload)
+    n = payload[0]
+    return rooms.get(payload[1:1 + n].decode("utf-8", "replace")), payload[1 + n:]
+
+
+class StateBusServer:
+    # Runs in the coordinator. Every room's hub broadcasts are mirrored to all
+    # edges as the same encoded bytes (both protocols); a fresh state snapshot of
+    # that room follows whenever something was broadcast (at most once per vote
+    # tick), and of every room each BUS_STATE_REFRESH.
+
+    def __init__(self, address: str = BUS_ADDRESS):
+        self.address = address
+        self.edges: Dict[int, asyncio.StreamWriter] = {}
+        self.edge_stats: Dict[int, dict] = {}
+        self.next_edge_id = 1
+        self.dirty_rooms: Set[str] = set(rooms)
+        self.server = None
+
+        # metrics
+        self.frames_out = 0
+        self.frames_in = 0
+        self.edges_dropped = 0
+
+    async def start(self) -> None:
+        self.server = await bus_start_server(self.address, self._handle_edge)
+        for room in rooms.values():
+            room.hub.mirrors.append(lambda payload, compact, topic, room=room: self.broadcast(room, payload, compact, topic))
+        log_event("bus", "State bus listening", address=self.address, rooms=len(rooms))
+
+    def broadcast(self, room: Room, payload: bytes, compact: Optional[bytes] = None, topic: Optional[str] = None) -> None:
+        self.dirty_rooms.add(room.name)
+        self._send_all(bus_frame(BUS_BROADCAST, bus_pack_room(
+            room, bytes((TOPIC_CODES.get(topic, 255),)) + bus_pack_pair(payload, compact))))
+
+    def state_frame(self, room: Room) -> bytes:
+        cache = room.state_cache
+        return bus_frame(BUS_STATE, bus_pack_room(room, struct.pack('<Q', cache.version) +
+                                                  bus_pack_pair(cache.encode(), cache.encode(lean=True))))
+
+    def push_state(self, names) -> None:
+        for name in names:
+            self._send_all(self.state_frame(rooms[name]))
+        self.dirty_rooms.clear()
+
+    def _send_all(self, frame: bytes) -> None:
+        for edge_id, writer in list(self.edges.items()):
+            # An edge that stops reading is cut off; it reconnects and resyncs
+            if writer.transport.get_write_buffer_size() > BUS_MAX_BUFFER:
+                self.edges_dropped += 1
+                self.edges.pop(edge_id, None)
+                writer.close()
+                continue
+            writer.write(frame)
+            self.frames_out += 1
+
+    async def _handle_edge(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        edge_id = self.next_edge_id
+        self.next_edge_id += 1
+        self.edges[edge_id] = writer
+        for room in rooms.values():
+            writer.write(self.state_frame(room))
+        log_event("bus", "edge connected", edge=edge_id, edges=len(self.edges))
+        try:
+            while True:
+                kind, payload = await bus_read_frame(reader)
+                self.frames_in += 1
+                await self._dispatch(edge_id, kind, payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.edges.pop(edge_id, None)
+            self.edge_stats.pop(edge_id, None)
+            writer.close()
+            log_event("bus", "edge disconnected", edge=edge_id, edges=len(self.edges))
+
+    async def _dispatch(self, edge_id: int, kind: bytes, payload: bytes) -> None:
+        try:
+            data = json_loads(payload)
+        except ValueError:
+            return
+        if kind == BUS_VOTE:
+            room = rooms.get(data.get("room"))
+            if room is not None and room.round_active and data.get("item") in ITEMS and data.get("user_id"):
+                await register_vote(room, str(data["user_id"]), data["item"])
+        elif kind == BUS_MOUSE:
+            room = rooms.get(data.get("room"))
+            if room is not None:
+                room.mouse_coalescer.submit(data.get("user_id"), (edge_id, data.get("conn")),
+                                            int(data.get("m", 0)), int(data.get("x", 0)), int(data.get("y", 0)))
+        elif kind == BUS_STATS:
+            self.edge_stats[edge_id] = data
+
+    async def run(self) -> None:
+        await self.start()
+        last_refresh = 0.0
+        while True:
+            await asyncio.sleep(VOTE_TICK_SECONDS)
+            now = time.monotonic()
+            if not self.edges:
+                continue
+            if now - last_refresh >= BUS_STATE_REFRESH:
+                self.push_state(list(rooms))
+                last_refresh = now
+            elif self.dirty_rooms:
+                self.push_state(list(self.dirty_rooms))
+
+    def stats(self) -> dict:
+        return {
+            "address": self.address,
+            "edges": len(self.edges),
+            "edge_clients": sum(s.get("clients", 0) for s in self.edge_stats.values()),
+            "frames_out": self.frames_out,
+            "frames_in": self.frames_in,
+            "edges_dropped": self.edges_dropped,
+            "edge_stats": self.edge_stats,
+        }
+
+
+class EdgeLink:
+    # Runs in an edge worker: keeps one connection to the coordinator, fans its
+    # broadcasts out through the local hub of each room and forwards viewer
+    # input upstream.
+
+    def __init__(self, address: str = BUS_ADDRESS):
+        self.address = address
+        self.writer: Optional[asyncio.StreamWriter] = None
+        # room name -> [version, full state, lean state, not-modified payload or None]
+        self.states: Dict[str, list] = {}
+        # room name -> sockets that asked for state before the room's first one came in
+        self.waiting: Dict[str, Set[Any]] = {}
+
+        # metrics
+        self.connects = 0
+        self.frames_in = 0
+        self.frames_out = 0
+        self.forward_dropped = 0
+
+    def _send(self, kind: bytes, data: dict) -> None:
+        if self.writer is None or self.writer.is_closing():
+            self.forward_dropped += 1
+            return
+        self.writer.write(bus_frame(kind, json_dumpb(data)))
+        self.frames_out += 1
+
+    def forward_vote(self, room: Room, user_id: str, item_key: str) -> None:
+        self._send(BUS_VOTE, {"room": room.name, "user_id": user_id, "item": item_key})
+
+    def forward_mouse(self, room: Room, user_id: Optional[str], conn, m_state: int, x: int, y: int) -> None:
+        self._send(BUS_MOUSE, {"room": room.name, "user_id": user_id, "conn": conn, "m": m_state, "x": x, "y": y})
+
+    async def run(self) -> None:
+        backoff = GAME_RECONNECT_MIN
+        while True:
+            try:
+                reader, writer = await bus_open_connection(self.address)
+            except OSError as e:
+                log_event("bus", "Coordinator connection failed: %s", e, level=logging.WARNING,
+                          retry_in=round(backoff, 2))
+                await asyncio.sleep(backoff)
+                backoff = min(GAME_RECONNECT_MAX, backoff * 2)
+                continue
+
+            backoff = GAME_RECONNECT_MIN
+            self.writer = writer
+            self.connects += 1
+            log_event("bus", "Connected to coordinator", address=self.address)
+            stats_task = asyncio.create_task(self._report_stats())
+            try:
+                while True:
+                    kind, payload = await bus_read_frame(reader)
+                    self.frames_in += 1
+                    if kind not in (BUS_BROADCAST, BUS_STATE):
+                        continue
+                    room, payload = bus_unpack_room(payload)
+                    if room is None:
+                        continue
+                    if kind == BUS_BROADCAST:
+                        topic = TOPICS[payload[0]] if payload[0] < len(TOPICS) else None
+                        room.hub.publish(*bus_unpack_pair(payload[1:]), topic)
+                    else:
+                        version = struct.unpack_from('<Q', payload)[0]
+                        full, lean = bus_unpack_pair(payload[8:])
+                        entry = self.states.get(room.name)
+                        not_modified = entry[3] if entry is not None and entry[0] == version else None
+                        self.states[room.name] = [version, full, lean, not_modified]
+                        for ws in self.waiting.pop(room.name, ()):
+                            await send_state(ws)
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                log_event("bus", "Coordinator connection lost: %s", e, level=logging.WARNING)
+            finally:
+                stats_task.cancel()
+                self.writer = None
+                writer.close()
+
+    def defer_state(self, room: Room, ws) -> None:
+        self.waiting.setdefault(room.name, set()).add(ws)
+
+    def forget(self, ws) -> None:
+        for waiting in self.waiting.values():
+            waiting.discard(ws)
+
+    def state_reply(self, room: Room, since: Optional[int], lean: bool = False) -> Optional[bytes]:
+        # Edges only answer "not modified"; deltas need the coordinator's vote history
+        entry = self.states.get(room.name)
+        if entry is None:
+            return None
+        if since is not None and since == entry[0]:
+            if entry[3] is None:
+                entry[3] = encode_ws({"type": "state_not_modified", "version": since})
+            return entry[3]
+        return entry[2] if lean else entry[1]
+
+    async def _report_stats(self) -> None:
+        while True:
+            self._send(BUS_STATS, {"pid": os.getpid(), "clients": total_clients(), "broadcast": broadcast_totals()})
+            await asyncio.sleep(2.0)
+
+    def stats(self) -> dict:
+        return {
+            "address": self.address,
+            "connected": self.writer is not None,
+            "connects": self.connects,
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "forward_dropped": self.forward_dropped,
+            "rooms_with_state": len(self.states),
+            "waiting_for_state": sum(len(w) for w in self.waiting.values()),
+            "state_versions": {name: entry[0] for name, entry in self.states.items()},
+        }
+
+
+state_bus: Optional[StateBusServer] = StateBusServer() if SERVER_ROLE == "coordinator" else None
+edge_link: Optional[EdgeLink] = EdgeLink() if SERVER_ROLE == "edge" else None
+
+# Gauges read at scrape time from the components' own counters
+def _per_room(fn):
+    return lambda: {(name,): fn(room) for name, room in rooms.items()}
+
+metrics.gauge("overlay_ws_clients", "Connected overlays", _per_room(lambda r: len(r.hub)), ("room",))
+metrics.gauge("overlay_ws_topic_subscribers", "Overlays subscribed to a broadcast topic",
+              lambda: {(name, t): len(room.hub.subscribers[t]) for name, room in rooms.items() for t in TOPICS},
+              ("room", "topic"))
+metrics.gauge("overlay_broadcasts_skipped_total", "Topic messages not encoded because nobody subscribed",
+              lambda: {(name, t): room.hub.skipped_by_topic[t] for name, room in rooms.items() for t in TOPICS},
+              ("room", "topic"), kind="counter")
+metrics.gauge("overlay_ws_queue_depth", "Frames waiting in client send queues",
+              _per_room(lambda r: sum(c.queue.qsize() for c in r.hub.conns.values())), ("room",))
+metrics.gauge("overlay_ws_frames_sent_total", "Frames written to overlays",
+              _per_room(lambda r: r.hub.frames_sent), ("room",), kind="counter")
+metrics.gauge("overlay_ws_frames_dropped_total", "Frames dropped for slow overlays",
+              _per_room(lambda r: r.hub.frames_dropped), ("room",), kind="counter")
+metrics.gauge("overlay_ws_send_failures_total", "Overlay sends that failed",
+              _per_room(lambda r: r.hub.send_failures), ("room",), kind="counter")
+metrics.gauge("overlay_admission_rejected_total", "Messages rejected by admission control", lambda: {
+    tuple(k.split(":", 1)): v for k, v in admission.rejected.items()}, ("scope", "type"), kind="counter")
+metrics.gauge("overlay_connections_refused_total", "Connections refused at MAX_CONNECTIONS",
+              lambda: admission.connections_refused, kind="counter")
+metrics.gauge("overlay_game_connected", "1 if the game event socket is up",
+              _per_room(lambda r: int(r.game_link.connected)), ("room",))
+metrics.gauge("overlay_game_queue_depth", "Game events waiting to be written",
+              _per_room(lambda r: len(r.game_link.queue)), ("room",))
+metrics.gauge("overlay_game_events_sent_total", "Game events written",
+              _per_room(lambda r: r.game_link.events_sent), ("room",), kind="counter")
+metrics.gauge("overlay_game_frames_sent_total", "Game socket frames written (one per batch when batched)",
+              _per_room(lambda r: r.game_link.frames_sent), ("room",), kind="counter")
+metrics.gauge("overlay_game_events_dropped_total", "Game events dropped on a full queue",
+              _per_room(lambda r: r.game_link.events_dropped), ("room",), kind="counter")
+metrics.gauge("overlay_journal_buffered", "Journal records waiting to be written", lambda: len(journal.buffer))
+metrics.gauge("overlay_analytics_buffered", "Analytics rows waiting to be written",
+              lambda: len(analytics.rounds) + len(analytics.votes))
+metrics.gauge("overlay_analytics_dropped_total", "Analytics rows dropped on a full buffer",
+              lambda: analytics.dropped, kind="counter")
+metrics.gauge("overlay_chat_outbox_pending", "Chat messages waiting for budget", lambda: chat_outbox.pending)
+metrics.gauge("overlay_chat_sent_total", "Chat messages sent", lambda: chat_outbox.sent, kind="counter")
+metrics.gauge("overlay_loop_stalls_total", "Event loop stalls seen by the watchdog",
+              lambda: loop_watchdog.stall_count, kind="counter")
+metrics.gauge("overlay_round_id", "Current round id", _per_room(lambda r: r.round_id), ("room",))
+metrics.gauge("overlay_log_suppressed_total", "Log records dropped by the rate limiter",
+              lambda: {(k,): v for k, v in log_limiter.suppressed_total.items()}, ("category",), kind="counter")
 
 # =========================
 # HTTP / WS Handlers (aiohttp)
@@ -468,48 +2459,117 @@ async def rounds_loop():
 async def log_middleware(request, handler):
     # Only log non-WS requests to keep console clean
     if "/ws" not in request.path:
-        print(f"[HTTP] {request.method} {request.path}")
+        log_event("http", "%s %s", request.method, request.path)
     return await handler(request)
 
+async def join_room(ws: web.WebSocketResponse, room: Room) -> None:
+    # Moves a socket to another room (its writer is stopped first, so only one
+    # hub ever writes to it); the overlay gets the new room's state next
+    compact, topics = False, frozenset(TOPICS)
+    old = ws_room.get(ws)
+    if old is not None:
+        previous = old.hub.conns.get(ws)
+        if previous is not None:
+            compact, topics = previous.compact, previous.topics
+        await old.hub.unregister(ws)
+    room.hub.register(ws, compact, topics)
+    ws_room[ws] = room
+
 async def ws_handler(request: web.Request):
-    global pending_placement
+    name = request.match_info.get("room")
+    room = rooms.get(name.lower()) if name else default_room
+    if room is None:
+        return web.Response(status=404, text="Unknown room")
+
+    if not admission.admit_connection(total_clients()):
+        log_event("ws", "connection refused: at capacity", level=logging.WARNING, clients=total_clients())
+        return web.Response(status=503, text="Server at capacity, retry shortly", headers={"Retry-After": "5"})
 
     ws = web.WebSocketResponse(heartbeat=20)
     await ws.prepare(request)
 
-    clients.add(ws)
+    await join_room(ws, room)
     ws_user_id[ws] = None
 
-    print(f"[WS] client connected. clients={len(clients)} path={request.path}")
+    log_event("ws", "client connected", room=room.name, clients=len(room.hub), path=request.path)
 
-    await send_state(ws)
+    state_fallback = asyncio.create_task(send_state_unless_greeted(ws))
 
     try:
         async for msg in ws:
+            if msg.type in (web.WSMsgType.TEXT, web.WSMsgType.BINARY) and not admission.allow_frame(ws):
+                continue
+
             if msg.type == web.WSMsgType.TEXT:
                 try:
-                    data = json.loads(msg.data)
+                    data = json_loads(msg.data)
                 except Exception:
                     continue
-
-                t = data.get("type")
-
+            elif msg.type == web.WSMsgType.BINARY:
+                # Compact protocol input (see decode_compact)
+                data = decode_compact(msg.data)
+                if data is None:
+                    continue
+            else:
+                if msg.type == web.WSMsgType.ERROR:
+                    log_event("ws", "error: %s", ws.exception(), level=logging.ERROR)
+                continue
+
+            t = data.get("type") if isinstance(data, dict) else None
+            if not isinstance(t, str) or not admission.allow_message(ws, ws_user_id.get(ws),
+                                                                     admission.message_kind(data)):
+                continue
+
+            kind = t if t in WS_MESSAGE_TYPES else "other"
+            ws_messages_total.inc(kind)
+            t_msg = time.perf_counter()
+            try:
                 if t == "ping":
-                    await ws.send_str(json.dumps({"type": "pong", "t": int(time.time() * 1000)}))
+                    room.hub.send_to(ws, encode_ws({"type": "pong", "t": int(time.time() * 1000)}))
                     continue
 
                 # Save twitch_user_id from overlay_hello (no prompt needed)
                 if t == "overlay_hello":
+                    state_fallback.cancel()
                     tid = data.get("twitch_user_id")
                     ws_user_id[ws] = str(tid) if tid else None
-                    await send_state(ws)
+
+                    # Room: "room" in the hello overrides the /ws/<room> path
+                    since = client_state_version(data)
+                    requested = data.get("room")
+                    if isinstance(requested, str) and requested:
+                        target = rooms.get(requested.lower())
+                        if target is None:
+                            room.hub.send_to(ws, encode_ws({"type": "room_unknown", "room": requested,
+                                                            "rooms": list(rooms)}))
+                        elif target is not room:
+                            await join_room(ws, target)
+                            room = target
+                            since = None  # a version seen in another room means nothing here
+
+                    # Wire protocol: "compact" if asked for, JSON otherwise; topics: all unless listed
+                    conn = room.hub.conns.get(ws)
+                    if conn is not None and ("protocol" in data or "topics" in data):
+                        compact = data.get("protocol") == "compact" if "protocol" in data else conn.compact
+                        topics = parse_topics(data.get("topics")) if "topics" in data else conn.topics
+                        room.hub.configure(ws, compact, topics)
+                        room.hub.send_to(ws, encode_ws({
+                            "type": "hello_ack",
+                            "protocol": "compact" if compact else "json",
+                            "topics": [t for t in TOPICS if t in topics],
+                            "room": room.name,
+                            "items": ITEM_TYPE_MAP,
+                        }))
+
+                    await send_state(ws, since)
                     continue
 
                 # ✅ Handle click votes from overlay
                 if t == "vote_click":
-                    if not current_round_active:
+                    # Edges do not track rounds; the coordinator checks instead
+                    if not room.round_active and edge_link is None:
                         continue
-                    
+                
                     item_key = data.get("item")
                     if item_key not in ITEMS:
                         continue
@@ -523,59 +2583,174 @@ async def ws_handler(request: web.Request):
                     # Use cached name if available, else generic
                     # user_name = user_id_to_name.get(user_id, "Overlay Viewer")
 
-                    await register_vote(user_id, item_key)
+                    if edge_link is not None:
+                        edge_link.forward_vote(room, user_id, item_key)
+                    else:
+                        await register_vote(room, user_id, item_key)
                     continue
 
                 if t in ("get_state", "sync"):
-                    await send_state(ws)
+                    # "version": last state version seen -> not modified / delta / full
+                    state_fallback.cancel()
+                    await send_state(ws, client_state_version(data))
                     continue
 
                 # Mouse events
                 if t == "mouse_event":
-                    m_state = int(data.get("mouse_type", 0)) # 0=Hover, 1=Start, 2=Drag, 3=End
-                    x = int(data.get("x", 0))
-                    y = int(data.get("y", 0))
-
-                    # Print every mouse message as requested
-                    print(f"[MOUSE] Type: {m_state}, X: {x}, Y: {y}")
-                    
-                    await handle_game_mouse_event(m_state, x, y, ws)
-                    
-                    await broadcast_ws({
-                        "type": "mouse_event",
-                        "mouse_type": m_state,
-                        "x": x,
-                        "y": y
-                    })
+                    try:
+                        m_state = int(data.get("mouse_type", 0)) # 0=Hover, 1=Start, 2=Drag, 3=End
+                        x = int(data.get("x", 0))
+                        y = int(data.get("y", 0))
+                    except (TypeError, ValueError, OverflowError):
+                        continue  # malformed input must not close the socket
+
+                    log_event("mouse", "mouse_event", type=m_state, x=x, y=y)
+                
+                    if edge_link is not None:
+                        edge_link.forward_mouse(room, ws_user_id.get(ws), id(ws), m_state, x, y)
+                    else:
+                        room.mouse_coalescer.submit(ws_user_id.get(ws), id(ws), m_state, x, y)
                     continue
-
-            elif msg.type == web.WSMsgType.ERROR:
-                print(f"[WS] error: {ws.exception()}")
+            finally:
+                ws_handle_seconds.observe(time.perf_counter() - t_msg, kind)
 
     finally:
-        clients.discard(ws)
+        state_fallback.cancel()
+        room = ws_room.pop(ws, room)
+        await room.hub.unregister(ws)
         ws_user_id.pop(ws, None)
-        print(f"[WS] client disconnected. clients={len(clients)}")
+        admission.forget(ws)
+        if edge_link is not None:
+            edge_link.forget(ws)
+        log_event("ws", "client disconnected", room=room.name, clients=len(room.hub))
 
     return ws
 
+async def metrics_handler(request: web.Request):
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8",
+                        headers={"Cache-Control": "no-store"})
+
+def runtime_info() -> dict:
+    loop = asyncio.get_running_loop()
+    return {"loop": "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio",
+            "json": JSON_BACKEND_NAME, "python": sys.version.split()[0]}
+
+def admin_denied(request: web.Request) -> Optional[web.Response]:
+    if not ADMIN_TOKEN:
+        return web.json_response({"error": "admin endpoints disabled (set ADMIN_TOKEN)"}, status=404)
+    if request.headers.get("X-Admin-Token", "") != ADMIN_TOKEN:
+        return web.json_response({"error": "forbidden"}, status=403)
+    return None
+
+async def admin_stalls_handler(request: web.Request):
+    denied = admin_denied(request)
+    if denied is not None:
+        return denied
+    return web.json_response({"loop": loop_watchdog.stats(), "stalls": list(loop_watchdog.stalls)})
+
+async def admin_profile_handler(request: web.Request):
+    # POST /admin/profile?seconds=10&hz=100[&threads=all] -> folded stacks
+    # (one "frame;frame;... count" line each, for flamegraph.pl / speedscope)
+    denied = admin_denied(request)
+    if denied is not None:
+        return denied
+    try:
+        seconds = float(request.query.get("seconds", "10"))
+        hz = float(request.query.get("hz", "100"))
+    except ValueError:
+        return web.json_response({"error": "seconds and hz must be numbers"}, status=400)
+    thread_ids = None if request.query.get("threads") == "all" else {threading.get_ident()}
+
+    log_event("http", "profiling for %.1fs at %.0f Hz", seconds, hz, level=logging.WARNING)
+    folded = await asyncio.get_running_loop().run_in_executor(None, profiler.profile, seconds, hz, thread_ids)
+    if folded is None:
+        return web.json_response({"error": "a profile is already running"}, status=409)
+    lines = [f"{stack} {count}" for stack, count in sorted(folded.items(), key=lambda kv: -kv[1])]
+    return web.Response(text="\n".join(lines) + "\n", content_type="text/plain", charset="utf-8")
+
+ANALYTICS_QUERIES = {
+    # name -> (AnalyticsStore method, accepted options)
+    "win_rates": ("win_rates", ()),
+    "votes_per_round": ("votes_per_round", ("p",)),
+    "top_voters": ("top_voters", ("limit",)),
+}
+
+def analytics_day(value: str) -> str:
+    time.strptime(value, "%Y-%m-%d")  # ValueError if malformed
+    return value
+
+async def analytics_handler(request: web.Request):
+    # GET /analytics/{query}?room=&from=YYYY-MM-DD&to=YYYY-MM-DD|days=N [&p=50,90,99] [&limit=10]
+    if edge_link is not None:
+        return web.json_response({"error": "analytics are served by the coordinator"}, status=404)
+    if not analytics.enabled:
+        reason = "numpy is not installed" if analytics.root is not None else "ANALYTICS_DIR is empty"
+        return web.json_response({"error": f"analytics disabled ({reason})"}, status=503)
+    name = request.match_info["query"]
+    if name not in ANALYTICS_QUERIES:
+        return web.json_response({"error": "unknown query", "queries": sorted(ANALYTICS_QUERIES)}, status=404)
+    method, options = ANALYTICS_QUERIES[name]
+
+    q = request.query
+    kwargs: Dict[str, Any] = {"room": q.get("room") or None}
+    try:
+        if "days" in q:
+            kwargs["start"] = time.strftime("%Y-%m-%d", time.gmtime(time.time() - 86400 * (max(1, int(q["days"])) - 1)))
+        if "from" in q:
+            kwargs["start"] = analytics_day(q["from"])
+        if "to" in q:
+            kwargs["end"] = analytics_day(q["to"])
+        if "p" in options and "p" in q:
+            kwargs["percentiles"] = tuple(min(100.0, max(0.0, float(p))) for p in q["p"].split(","))
+        if "limit" in options and "limit" in q:
+            kwargs["limit"] = min(1000, max(1, int(q["limit"])))
+    except ValueError as e:
+        return web.json_response({"error": f"bad parameter: {e}"}, status=400)
+
+    t0 = time.perf_counter()
+    result = await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(getattr(analytics, method), **kwargs))
+    result["query"] = name
+    result["query_ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+    return web.json_response(result)
+
 async def health_handler(request: web.Request):
+    if edge_link is not None:
+        return web.json_response({
+            "ok": True,
+            "role": SERVER_ROLE,
+            "pid": os.getpid(),
+            "clients": total_clients(),
+            "broadcast": broadcast_totals(),
+            "rooms": {name: {"clients": len(room.hub), "broadcast": room.hub.stats()} for name, room in rooms.items()},
+            "bus": edge_link.stats(),
+            "admission": admission.stats(),
+            "loop": loop_watchdog.stats(),
+            "runtime": runtime_info(),
+            "log_suppressed": dict(log_limiter.suppressed_total),
+        })
+
     return web.json_response({
+        "role": SERVER_ROLE,
         "ok": True,
-        "clients": len(clients),
-        "round_active": current_round_active,
-        "round_id": current_round_id,
-        "pending": pending_placement,
+        "clients": total_clients(),
+        "broadcast": broadcast_totals(),
+        "rooms": {name: room.stats() for name, room in rooms.items()},
+        "log_suppressed": dict(log_limiter.suppressed_total),
+        "journal": journal.stats(),
+        "analytics": analytics.stats(),
+        "chat": chat_source.stats() if chat_source else None,
+        "chat_outbox": chat_outbox.stats(),
+        "admission": admission.stats(),
+        "loop": loop_watchdog.stats(),
+        "runtime": runtime_info(),
+        "bus": state_bus.stats() if state_bus else None,
     })
 
 # =========================
 # Main
 # =========================
-async def main():
-    global BOT_INSTANCE
-
-    # Game socket removed
-
+def create_app() -> web.Application:
     app = web.Application(middlewares=[log_middleware])
 
     # CORS is still needed because the overlay (hosted on Twitch) 
@@ -586,40 +2761,115 @@ async def main():
 
     r_ws1 = app.router.add_get("/ws", ws_handler)
     r_ws2 = app.router.add_get("/ws/", ws_handler)
+    r_ws3 = app.router.add_get("/ws/{room}", ws_handler)
     r_health = app.router.add_get("/health", health_handler)
+    r_metrics = app.router.add_get("/metrics", metrics_handler)
+    r_analytics = app.router.add_get("/analytics/{query}", analytics_handler)
+    app.router.add_get("/admin/stalls", admin_stalls_handler)
+    app.router.add_post("/admin/profile", admin_profile_handler)
 
-    for r in [r_ws1, r_ws2, r_health]:
+    for r in [r_ws1, r_ws2, r_ws3, r_health, r_metrics, r_analytics]:
         cors.add(r)
 
+    return app
+
+def start_background_tasks() -> list:
+    if edge_link is not None:
+        return [asyncio.create_task(edge_link.run()), asyncio.create_task(loop_lag_monitor())]
+
+    tasks = [
+        asyncio.create_task(loop_lag_monitor()),
+        asyncio.create_task(rooms_tick(default_room.vote_batcher.tick_seconds, lambda r: r.vote_batcher.flush())),
+        asyncio.create_task(rooms_tick(default_room.mouse_coalescer.interval, lambda r: r.mouse_coalescer.flush())),
+        asyncio.create_task(journal.run()),
+        asyncio.create_task(analytics.run()),
+        asyncio.create_task(chat_outbox.run()),
+    ]
+    for room in rooms.values():
+        tasks.extend(room.start())
+    if state_bus is not None:
+        tasks.append(asyncio.create_task(state_bus.run()))
+    return tasks
+
+async def stop_background_tasks(tasks: list) -> None:
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(BaseException):
+            await task
+
+    loop_watchdog.stop()
+
+    with contextlib.suppress(Exception):
+        await journal.close()
+    with contextlib.suppress(Exception):
+        await analytics.close()
+
+async def main():
+    global chat_source
+
+    log_listener = setup_logging()
+
+    app = create_app()
+
     runner = web.AppRunner(app)
     await runner.setup()
 
-    site = web.TCPSite(runner, HTTP_HOST, HTTP_PORT)
+    site = web.TCPSite(runner, HTTP_HOST, HTTP_PORT, reuse_port=HTTP_REUSE_PORT or None)
     await site.start()
 
-    print("\n--- SERVER RUNNING (DEPLOY MODE) ---")
-    print(f"WS:     ws://{HTTP_HOST}:{HTTP_PORT}/ws")
+    if WORKER_ADMIN_PORT:
+        # Private per-worker address so the supervisor can reach this exact process
+        admin_site = web.TCPSite(runner, "127.0.0.1", WORKER_ADMIN_PORT)
+        await admin_site.start()
+
+    print(f"\n--- SERVER RUNNING (DEPLOY MODE, {SERVER_ROLE}) ---")
+    print(f"WS:     ws://{HTTP_HOST}:{HTTP_PORT}/ws[/<room>]")
     print(f"Health: http://{HTTP_HOST}:{HTTP_PORT}/health")
+    for room in rooms.values():
+        print(f"Room:   {room.name} -> #{room.channel}, game {room.game_link.host}:{room.game_link.port}")
     print("Note: Static files (overlay.html/js) are NOT served by this script.")
     print("      They should be hosted by Twitch or another web server.\n")
 
-    bot = ChatBot()
-    BOT_INSTANCE = bot
+    if SERVER_ROLE in ("coordinator", "edge"):
+        print(f"Bus:    {BUS_ADDRESS}")
+    print(f"Runtime: loop={runtime_info()['loop']} json={JSON_BACKEND_NAME}")
 
-    rounds_task = asyncio.create_task(rounds_loop())
+    # Edges never talk to Twitch; only one process may own the chat connection
+    if edge_link is None:
+        chat_source = create_chat_source()
+
+    tasks = start_background_tasks()
 
     try:
-        await bot.start()
+        if chat_source is not None:
+            await chat_source.run()
+        else:
+            await asyncio.Event().wait()
     finally:
-        rounds_task.cancel()
-        with contextlib.suppress(Exception):
-            await rounds_task
+        await stop_background_tasks(tasks)
 
         with contextlib.suppress(Exception):
             await runner.cleanup()
 
-        with contextlib.suppress(Exception):
-            await bot._custom_session.close()
+        if chat_source is not None:
+            await chat_source.close()
+
+        log_listener.stop()
+
+# =========================
+# Supervisor (SERVER_WORKERS > 1, see supervisor.py)
+# =========================
+async def run_supervisor() -> None:
+    log_listener = setup_logging()
+    try:
+        await supervise(os.path.abspath(__file__), SERVER_WORKERS, HTTP_HOST, HTTP_PORT, SUPERVISOR_PORT,
+                        WORKER_ADMIN_BASE)
+    finally:
+        log_listener.stop()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    install_event_loop()
+    if SERVER_WORKERS > 1 and SERVER_ROLE == "standalone":
+        asyncio.run(run_supervisor())
+    else:
+        asyncio.run(main())
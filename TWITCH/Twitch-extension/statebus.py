@@ -0,0 +1,52 @@
+# statebus.py
+#
+# Wire format of the state bus between the deploy server's coordinator and its
+# edge workers (SERVER_ROLE), over a unix socket or TCP.
+#
+# Frames on the bus are '<I' length + 1 kind byte + payload. Broadcast and
+# state payloads start with the room name ('<B' length + name); edges must be
+# started with the same ROOMS as the coordinator.
+
+import asyncio
+import contextlib
+import os
+import struct
+from typing import Optional
+
+BUS_BROADCAST = b"B"  # coordinator -> edge: room + '<B' topic (255 = all) + JSON + compact WS frames to fan out
+BUS_STATE = b"S"      # coordinator -> edge: room + '<Q' version + full + lean (no options) state
+BUS_VOTE = b"V"       # edge -> coordinator: {"room", "user_id", "item"}
+BUS_MOUSE = b"M"      # edge -> coordinator: {"room", "user_id", "conn", "m", "x", "y"}
+BUS_STATS = b"H"      # edge -> coordinator: edge health for /health
+
+
+def bus_frame(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack('<I', len(payload) + 1) + kind + payload
+
+def bus_pack_pair(first: bytes, second: Optional[bytes]) -> bytes:
+    # '<I' length of the first part; the rest is the second (may be empty)
+    return struct.pack('<I', len(first)) + first + (second or b"")
+
+def bus_unpack_pair(payload: bytes):
+    n = struct.unpack_from('<I', payload)[0]
+    return payload[4:4 + n], payload[4 + n:] or None
+
+async def bus_read_frame(reader: asyncio.StreamReader):
+    header = await reader.readexactly(4)
+    body = await reader.readexactly(struct.unpack('<I', header)[0])
+    return body[:1], body[1:]
+
+async def bus_open_connection(address: str):
+    if address.startswith("unix:"):
+        return await asyncio.open_unix_connection(address[5:])
+    host, _, port = address[4:].rpartition(":") if address.startswith("tcp:") else address.rpartition(":")
+    return await asyncio.open_connection(host, int(port))
+
+async def bus_start_server(address: str, handler):
+    if address.startswith("unix:"):
+        path = address[5:]
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        return await asyncio.start_unix_server(handler, path)
+    host, _, port = address[4:].rpartition(":") if address.startswith("tcp:") else address.rpartition(":")
+    return await asyncio.start_server(handler, host, int(port))
@@ -0,0 +1,146 @@
+# supervisor.py
+#
+# Multi-process launcher for the deploy server (SERVER_WORKERS > 1): starts one
+# coordinator plus N edge workers of the same script, restarts any that exit
+# and serves their combined /health.
+
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+import aiohttp
+from aiohttp import web
+
+log = logging.getLogger("overlay")
+
+
+class WorkerProcess:
+    def __init__(self, script: str, name: str, role: str, env: Dict[str, str], admin_port: int):
+        self.script = script
+        self.name = name
+        self.role = role
+        self.env = env
+        self.admin_port = admin_port
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.last_exit: Optional[int] = None
+
+    async def supervise(self) -> None:
+        backoff = 1.0
+        while True:
+            self.proc = await asyncio.create_subprocess_exec(sys.executable, self.script, env=self.env)
+            self.started_at = time.time()
+            log.info("worker started", extra={"category": "supervisor", "fields": {
+                "worker": self.name, "pid": self.proc.pid}})
+            self.last_exit = await self.proc.wait()
+
+            # A worker that dies right after starting is crash-looping: back off
+            backoff = 1.0 if time.time() - self.started_at > 30 else min(30.0, backoff * 2)
+            self.restarts += 1
+            log.warning("worker exited", extra={"category": "supervisor", "fields": {
+                "worker": self.name, "code": self.last_exit, "restart_in": backoff}})
+            await asyncio.sleep(backoff)
+
+    def stop(self) -> None:
+        if self.proc is not None and self.proc.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                self.proc.terminate()
+
+    def info(self) -> dict:
+        alive = self.proc is not None and self.proc.returncode is None
+        return {
+            "name": self.name,
+            "role": self.role,
+            "pid": self.proc.pid if self.proc else None,
+            "alive": alive,
+            "uptime_s": round(time.time() - self.started_at, 1) if alive else 0.0,
+            "restarts": self.restarts,
+            "last_exit": self.last_exit,
+        }
+
+
+async def supervise(script: str, n_edges: int, host: str, port: int, supervisor_port: int, admin_base: int):
+    # Runs `script` as one coordinator plus n_edges edges until SIGINT/SIGTERM
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise SystemExit("SERVER_WORKERS > 1 needs SO_REUSEPORT (Linux/macOS/BSD)")
+
+    bus_address = os.environ.get("BUS_ADDRESS") or f"unix:/tmp/overlay_state_bus.{os.getpid()}.sock"
+    base_env = dict(os.environ, SERVER_WORKERS="1", BUS_ADDRESS=bus_address)
+
+    workers = [WorkerProcess(script, "coordinator", "coordinator", dict(
+        base_env, SERVER_ROLE="coordinator", HTTP_HOST="127.0.0.1", HTTP_PORT=str(admin_base),
+    ), admin_base)]
+    for i in range(n_edges):
+        admin_port = admin_base + 1 + i
+        workers.append(WorkerProcess(script, f"edge-{i}", "edge", dict(
+            base_env, SERVER_ROLE="edge", HTTP_REUSE_PORT="1", WORKER_ADMIN_PORT=str(admin_port),
+        ), admin_port))
+
+    session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2))
+
+    async def fetch_health(worker: WorkerProcess) -> Optional[dict]:
+        try:
+            async with session.get(f"http://127.0.0.1:{worker.admin_port}/health") as resp:
+                return await resp.json()
+        except Exception:
+            return None
+
+    async def supervisor_health(request: web.Request):
+        healths = await asyncio.gather(*(fetch_health(w) for w in workers))
+        out = []
+        for w, h in zip(workers, healths):
+            entry = w.info()
+            entry["health"] = h
+            out.append(entry)
+        coordinator = healths[0] or {}
+        edges = [h for h in healths[1:] if h]
+        return web.json_response({
+            "ok": all(w.info()["alive"] for w in workers),
+            "workers_alive": sum(1 for w in workers if w.info()["alive"]),
+            "workers_total": len(workers),
+            "clients": sum(h.get("clients", 0) for h in edges),
+            "frames_sent": sum(h.get("broadcast", {}).get("frames_sent", 0) for h in edges),
+            "frames_dropped": sum(h.get("broadcast", {}).get("frames_dropped", 0) for h in edges),
+            "rounds": {name: {"round_active": r.get("round_active"), "round_id": r.get("round_id")}
+                       for name, r in (coordinator.get("rooms") or {}).items()},
+            "workers": out,
+        })
+
+    app = web.Application()
+    app.router.add_get("/health", supervisor_health)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, supervisor_port).start()
+
+    print(f"\n--- SUPERVISOR: 1 coordinator + {n_edges} edge workers ---")
+    print(f"WS:     ws://{host}:{port}/ws (SO_REUSEPORT)")
+    print(f"Health: http://{host}:{supervisor_port}/health")
+    print(f"Bus:    {bus_address}\n")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+
+    tasks = [asyncio.create_task(w.supervise()) for w in workers]
+    try:
+        await stop.wait()
+    finally:
+        for t in tasks:
+            t.cancel()
+        for w in workers:
+            w.stop()
+        for w in workers:
+            if w.proc is not None:
+                with contextlib.suppress(Exception):
+                    await asyncio.wait_for(w.proc.wait(), 5)
+        await session.close()
+        await runner.cleanup()
@@ -0,0 +1,14 @@
+# Tests import the server and its sibling modules from the folder above, and
+# event_injector from src_python. The server reads its configuration from the
+# environment at import time, so keep it off Twitch and the disk.
+import os
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "..", "..", "src_python"))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+os.environ.setdefault("CHAT_SOURCE", "synthetic")
+os.environ["ANALYTICS_DIR"] = ""
+os.environ["JOURNAL_FILE"] = os.path.join(tempfile.mkdtemp(), "round_journal.jsonl")
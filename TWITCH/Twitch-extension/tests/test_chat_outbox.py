@@ -0,0 +1,62 @@
+import asyncio
+
+from python_server_deploy import CHAT_PRIORITY_HIGH, CHAT_PRIORITY_LOW, CHAT_PRIORITY_NORMAL, ChatOutbox
+
+
+class Sink:
+    def __init__(self):
+        self.sent = []
+
+    async def __call__(self, text: str) -> None:
+        self.sent.append(text)
+
+
+def drain(outbox: ChatOutbox, wait: float = 0.05) -> None:
+    # Run the outbox until it blocks (empty, or out of budget)
+    async def go() -> None:
+        task = asyncio.create_task(outbox.run())
+        await asyncio.sleep(wait)
+        task.cancel()
+
+    asyncio.run(go())
+
+
+def test_priority_then_fifo():
+    outbox, sink = ChatOutbox(budget=10, max_pending=10), Sink()
+    outbox.post("countdown", CHAT_PRIORITY_LOW, send=sink)
+    outbox.post("summary", CHAT_PRIORITY_NORMAL, send=sink)
+    outbox.post("winner", CHAT_PRIORITY_HIGH, send=sink)
+    outbox.post("round start", CHAT_PRIORITY_HIGH, send=sink)
+    drain(outbox)
+    assert sink.sent == ["winner", "round start", "summary", "countdown"]
+    assert outbox.sent == 4 and outbox.pending == 0
+
+
+def test_budget_holds_the_rest():
+    outbox, sink = ChatOutbox(budget=2, max_pending=10), Sink()
+    for i in range(4):
+        outbox.post(f"low {i}", CHAT_PRIORITY_LOW, send=sink)
+    outbox.post("winner", CHAT_PRIORITY_HIGH, send=sink)
+    drain(outbox)
+    assert sink.sent == ["winner", "low 0"]
+    assert outbox.pending == 3
+    assert outbox.stats()["sent_last_30s"] == 2
+
+
+def test_coalesce_expire_and_evict():
+    outbox, sink = ChatOutbox(budget=10, max_pending=2), Sink()
+    outbox.post("10s left", CHAT_PRIORITY_LOW, key="countdown", send=sink)
+    outbox.post("5s left", CHAT_PRIORITY_LOW, key="countdown", send=sink)
+    assert outbox.coalesced == 1 and outbox.pending == 1
+
+    outbox.post("stale", CHAT_PRIORITY_NORMAL, ttl=-1.0, send=sink)
+    # Full: a high-priority post evicts the newest lowest-priority entry
+    outbox.post("winner", CHAT_PRIORITY_HIGH, send=sink)
+    assert outbox.dropped == 1
+    # ...and a low-priority post has nothing below it to evict
+    outbox.post("late reply", CHAT_PRIORITY_LOW, send=sink)
+    assert outbox.dropped == 2
+
+    drain(outbox)
+    assert sink.sent == ["winner"]
+    assert outbox.expired == 1 and outbox.pending == 0
@@ -0,0 +1,35 @@
+import struct
+
+from compact import (OP_MOUSE_EVENT, OP_MOUSE_INPUT, OP_VOTE_CLICK, OP_VOTES_DELTA, ITEM_BY_INDEX,
+                     compact_mouse_event, compact_votes_delta, decode_compact)
+from event_injector import ITEM_TYPE_MAP
+
+
+def test_votes_delta_layout():
+    votes = {"fire": 3, "bomb": 70000}
+    data = compact_votes_delta(42, votes)
+    op, round_id, n = struct.unpack_from("<BIB", data)
+    assert (op, round_id, n) == (OP_VOTES_DELTA, 42, 2)
+    items = [struct.unpack_from("<BI", data, 6 + 5 * i) for i in range(n)]
+    assert {ITEM_BY_INDEX[idx]: count for idx, count in items} == votes
+    assert len(data) == 6 + 5 * n
+
+
+def test_mouse_event_clamps_to_i16():
+    data = compact_mouse_event(2, 40000, -40000)
+    assert struct.unpack("<BBhh", data) == (OP_MOUSE_EVENT, 2, 32767, -32768)
+
+
+def test_client_frames_round_trip():
+    for key, idx in ITEM_TYPE_MAP.items():
+        assert decode_compact(bytes([OP_VOTE_CLICK, idx])) == {"type": "vote_click", "item": key}
+    frame = struct.pack("<BBhh", OP_MOUSE_INPUT, 3, 640, -12)
+    assert decode_compact(frame) == {"type": "mouse_event", "mouse_type": 3, "x": 640, "y": -12}
+
+
+def test_malformed_client_frames():
+    assert decode_compact(b"") is None
+    assert decode_compact(bytes([OP_VOTE_CLICK])) is None
+    assert decode_compact(bytes([OP_MOUSE_INPUT, 1, 0])) is None
+    assert decode_compact(bytes([0x7F, 0])) is None
+    assert decode_compact(bytes([OP_VOTE_CLICK, 250])) == {"type": "vote_click", "item": None}
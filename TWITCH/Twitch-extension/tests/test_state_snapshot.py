@@ -0,0 +1,65 @@
+import json
+
+from python_server_deploy import Room
+
+
+def make_room() -> Room:
+    room = Room("test", "testchannel")
+    room.round_active = True
+    room.round_id = 7
+    return room
+
+
+def test_full_state_carries_version():
+    room = make_room()
+    state = json.loads(room.state_cache.reply(None))
+    assert state["type"] == "state"
+    assert state["version"] == room.state_cache.version
+    assert state["round"]["round_id"] == 7
+    assert "options" in state
+    assert "options" not in json.loads(room.state_cache.reply(None, lean=True))
+
+
+def test_version_moves_on_touch():
+    room = make_room()
+    snap = room.state_cache
+    v0 = snap.version
+    snap.touch()
+    assert snap.version == v0 + 1
+    assert snap.base_version == snap.version
+    snap.touch_items(["fire"])
+    assert snap.version == v0 + 2
+    assert snap.base_version == v0 + 1
+
+
+def test_not_modified_when_current():
+    room = make_room()
+    snap = room.state_cache
+    reply = json.loads(snap.reply(snap.version))
+    assert reply == {"type": "state_not_modified", "version": snap.version}
+    # Same encoding is reused until the version moves
+    assert snap.reply(snap.version) is snap.reply(snap.version)
+    assert snap.not_modified == 3
+
+    old = snap.version
+    snap.touch()
+    assert json.loads(snap.reply(old))["type"] == "state"
+
+
+def test_delta_since_base_version():
+    room = make_room()
+    snap = room.state_cache
+    snap.touch()
+    since = snap.version
+    room.vote_ledger.cast("u1", "fire")
+    snap.touch_items(["fire"])
+    room.vote_ledger.cast("u2", "wind")
+    snap.touch_items(["wind"])
+
+    delta = json.loads(snap.reply(since))
+    assert delta == {"type": "state_delta", "version": snap.version, "round_id": 7,
+                     "votes": {"fire": 1, "wind": 1}}
+    # Only what changed after the client's version
+    assert json.loads(snap.reply(snap.version - 1))["votes"] == {"wind": 1}
+    # Older than the last round/placement change: full state
+    assert json.loads(snap.reply(since - 1))["type"] == "state"
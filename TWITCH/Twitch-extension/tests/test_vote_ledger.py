@@ -0,0 +1,57 @@
+import pytest
+
+from python_server_deploy import VoteLedger
+
+KEYS = ["freeze", "fire", "wind"]
+
+
+def test_cast_switch_retract():
+    ledger = VoteLedger(KEYS)
+    assert ledger.cast("u1", "fire") == (None, True)
+    assert ledger.cast("u2", "fire") == (None, True)
+    assert ledger.snapshot() == {"freeze": 0, "fire": 2, "wind": 0}
+
+    # Repeat vote is a no-op, a different item moves the vote
+    assert ledger.cast("u1", "fire") == ("fire", False)
+    assert ledger.cast("u1", "wind") == ("fire", True)
+    assert ledger.snapshot() == {"freeze": 0, "fire": 1, "wind": 1}
+    assert ledger.vote_of("u1") == "wind"
+    assert sorted(ledger.voters_of("wind")) == ["u1"]
+
+    assert ledger.retract("u1") == "wind"
+    assert ledger.retract("u1") is None
+    assert ledger.snapshot() == {"freeze": 0, "fire": 1, "wind": 0}
+    assert len(ledger) == 1
+
+
+def test_counts_match_voters():
+    ledger = VoteLedger(KEYS)
+    for i in range(30):
+        ledger.cast(f"u{i}", KEYS[i % 3])
+    for i in range(0, 30, 2):
+        ledger.cast(f"u{i}", "freeze")
+    for i in range(0, 30, 5):
+        ledger.retract(f"u{i}")
+    for key in KEYS:
+        assert ledger.count(key) == len(ledger.voters_of(key))
+    assert sum(ledger.snapshot().values()) == len(ledger)
+
+
+def test_leader_and_reset():
+    ledger = VoteLedger(KEYS)
+    assert ledger.leader() == (None, 0)
+    ledger.cast("u1", "wind")
+    ledger.cast("u2", "freeze")
+    # Ties go to the first item in key order
+    assert ledger.leader() == ("freeze", 1)
+    ledger.reset()
+    assert ledger.snapshot() == {"freeze": 0, "fire": 0, "wind": 0}
+    assert len(ledger) == 0
+
+
+def test_unknown_item():
+    ledger = VoteLedger(KEYS)
+    with pytest.raises(KeyError):
+        ledger.cast("u1", "nope")
+    assert ledger.count("nope") == 0
+    assert ledger.voters_of("nope") == []
@@ -13392,6 +13392,791 @@ public final class MessageProto {
 
   }
 
+  public interface GrpcGameEventBatchOrBuilder extends
+      // @@protoc_insertion_point(interface_extends:service.GrpcGameEventBatch)
+      com.google.protobuf.MessageOrBuilder {
+
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    java.util.List<protoc.MessageProto.GrpcGameEvent> 
+        getEventsList();
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    protoc.MessageProto.GrpcGameEvent getEvents(int index);
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    int getEventsCount();
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    java.util.List<? extends protoc.MessageProto.GrpcGameEventOrBuilder> 
+        getEventsOrBuilderList();
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    protoc.MessageProto.GrpcGameEventOrBuilder getEventsOrBuilder(
+        int index);
+  }
+  /**
+   * Protobuf type {@code service.GrpcGameEventBatch}
+   */
+  public static final class GrpcGameEventBatch extends
+      com.google.protobuf.GeneratedMessageV3 implements
+      // @@protoc_insertion_point(message_implements:service.GrpcGameEventBatch)
+      GrpcGameEventBatchOrBuilder {
+  private static final long serialVersionUID = 0L;
+    // Use GrpcGameEventBatch.newBuilder() to construct.
+    private GrpcGameEventBatch(com.google.protobuf.GeneratedMessageV3.Builder<?> builder) {
+      super(builder);
+    }
+    private GrpcGameEventBatch() {
+      events_ = java.util.Collections.emptyList();
+    }
+
+    @java.lang.Override
+    @SuppressWarnings({"unused"})
+    protected java.lang.Object newInstance(
+        UnusedPrivateParameter unused) {
+      return new GrpcGameEventBatch();
+    }
+
+    @java.lang.Override
+    public final com.google.protobuf.UnknownFieldSet
+    getUnknownFields() {
+      return this.unknownFields;
+    }
+    public static final com.google.protobuf.Descriptors.Descriptor
+        getDescriptor() {
+      return protoc.MessageProto.internal_static_service_GrpcGameEventBatch_descriptor;
+    }
+
+    @java.lang.Override
+    protected com.google.protobuf.GeneratedMessageV3.FieldAccessorTable
+        internalGetFieldAccessorTable() {
+      return protoc.MessageProto.internal_static_service_GrpcGameEventBatch_fieldAccessorTable
+          .ensureFieldAccessorsInitialized(
+              protoc.MessageProto.GrpcGameEventBatch.class, protoc.MessageProto.GrpcGameEventBatch.Builder.class);
+    }
+
+    public static final int EVENTS_FIELD_NUMBER = 1;
+    @SuppressWarnings("serial")
+    private java.util.List<protoc.MessageProto.GrpcGameEvent> events_;
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    @java.lang.Override
+    public java.util.List<protoc.MessageProto.GrpcGameEvent> getEventsList() {
+      return events_;
+    }
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    @java.lang.Override
+    public java.util.List<? extends protoc.MessageProto.GrpcGameEventOrBuilder> 
+        getEventsOrBuilderList() {
+      return events_;
+    }
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    @java.lang.Override
+    public int getEventsCount() {
+      return events_.size();
+    }
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    @java.lang.Override
+    public protoc.MessageProto.GrpcGameEvent getEvents(int index) {
+      return events_.get(index);
+    }
+    /**
+     * <code>repeated .service.GrpcGameEvent events = 1;</code>
+     */
+    @java.lang.Override
+    public protoc.MessageProto.GrpcGameEventOrBuilder getEventsOrBuilder(
+        int index) {
+      return events_.get(index);
+    }
+
+    private byte memoizedIsInitialized = -1;
+    @java.lang.Override
+    public final boolean isInitialized() {
+      byte isInitialized = memoizedIsInitialized;
+      if (isInitialized == 1) return true;
+      if (isInitialized == 0) return false;
+
+      memoizedIsInitialized = 1;
+      return true;
+    }
+
+    @java.lang.Override
+    public void writeTo(com.google.protobuf.CodedOutputStream output)
+                        throws java.io.IOException {
+      for (int i = 0; i < events_.size(); i++) {
+        output.writeMessage(1, events_.get(i));
+      }
+      getUnknownFields().writeTo(output);
+    }
+
+    @java.lang.Override
+    public int getSerializedSize() {
+      int size = memoizedSize;
+      if (size != -1) return size;
+
+      size = 0;
+      for (int i = 0; i < events_.size(); i++) {
+        size += com.google.protobuf.CodedOutputStream
+          .computeMessageSize(1, events_.get(i));
+      }
+      size += getUnknownFields().getSerializedSize();
+      memoizedSize = size;
+      return size;
+    }
+
+    @java.lang.Override
+    public boolean equals(final java.lang.Object obj) {
+      if (obj == this) {
+       return true;
+      }
+      if (!(obj instanceof protoc.MessageProto.GrpcGameEventBatch)) {
+        return super.equals(obj);
+      }
+      protoc.MessageProto.GrpcGameEventBatch other = (protoc.MessageProto.GrpcGameEventBatch) obj;
+
+      if (!getEventsList()
+          .equals(other.getEventsList())) return false;
+      if (!getUnknownFields().equals(other.getUnknownFields())) return false;
+      return true;
+    }
+
+    @java.lang.Override
+    public int hashCode() {
+      if (memoizedHashCode != 0) {
+        return memoizedHashCode;
+      }
+      int hash = 41;
+      hash = (19 * hash) + getDescriptor().hashCode();
+      if (getEventsCount() > 0) {
+        hash = (37 * hash) + EVENTS_FIELD_NUMBER;
+        hash = (53 * hash) + getEventsList().hashCode();
+      }
+      hash = (29 * hash) + getUnknownFields().hashCode();
+      memoizedHashCode = hash;
+      return hash;
+    }
+
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(
+        java.nio.ByteBuffer data)
+        throws com.google.protobuf.InvalidProtocolBufferException {
+      return PARSER.parseFrom(data);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(
+        java.nio.ByteBuffer data,
+        com.google.protobuf.ExtensionRegistryLite extensionRegistry)
+        throws com.google.protobuf.InvalidProtocolBufferException {
+      return PARSER.parseFrom(data, extensionRegistry);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(
+        com.google.protobuf.ByteString data)
+        throws com.google.protobuf.InvalidProtocolBufferException {
+      return PARSER.parseFrom(data);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(
+        com.google.protobuf.ByteString data,
+        com.google.protobuf.ExtensionRegistryLite extensionRegistry)
+        throws com.google.protobuf.InvalidProtocolBufferException {
+      return PARSER.parseFrom(data, extensionRegistry);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(byte[] data)
+        throws com.google.protobuf.InvalidProtocolBufferException {
+      return PARSER.parseFrom(data);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(
+        byte[] data,
+        com.google.protobuf.ExtensionRegistryLite extensionRegistry)
+        throws com.google.protobuf.InvalidProtocolBufferException {
+      return PARSER.parseFrom(data, extensionRegistry);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(java.io.InputStream input)
+        throws java.io.IOException {
+      return com.google.protobuf.GeneratedMessageV3
+          .parseWithIOException(PARSER, input);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(
+        java.io.InputStream input,
+        com.google.protobuf.ExtensionRegistryLite extensionRegistry)
+        throws java.io.IOException {
+      return com.google.protobuf.GeneratedMessageV3
+          .parseWithIOException(PARSER, input, extensionRegistry);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseDelimitedFrom(java.io.InputStream input)
+        throws java.io.IOException {
+      return com.google.protobuf.GeneratedMessageV3
+          .parseDelimitedWithIOException(PARSER, input);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseDelimitedFrom(
+        java.io.InputStream input,
+        com.google.protobuf.ExtensionRegistryLite extensionRegistry)
+        throws java.io.IOException {
+      return com.google.protobuf.GeneratedMessageV3
+          .parseDelimitedWithIOException(PARSER, input, extensionRegistry);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(
+        com.google.protobuf.CodedInputStream input)
+        throws java.io.IOException {
+      return com.google.protobuf.GeneratedMessageV3
+          .parseWithIOException(PARSER, input);
+    }
+    public static protoc.MessageProto.GrpcGameEventBatch parseFrom(
+        com.google.protobuf.CodedInputStream input,
+        com.google.protobuf.ExtensionRegistryLite extensionRegistry)
+        throws java.io.IOException {
+      return com.google.protobuf.GeneratedMessageV3
+          .parseWithIOException(PARSER, input, extensionRegistry);
+    }
+
+    @java.lang.Override
+    public Builder newBuilderForType() { return newBuilder(); }
+    public static Builder newBuilder() {
+      return DEFAULT_INSTANCE.toBuilder();
+    }
+    public static Builder newBuilder(protoc.MessageProto.GrpcGameEventBatch prototype) {
+      return DEFAULT_INSTANCE.toBuilder().mergeFrom(prototype);
+    }
+    @java.lang.Override
+    public Builder toBuilder() {
+      return this == DEFAULT_INSTANCE
+          ? new Builder() : new Builder().mergeFrom(this);
+    }
+
+    @java.lang.Override
+    protected Builder newBuilderForType(
+        com.google.protobuf.GeneratedMessageV3.BuilderParent parent) {
+      Builder builder = new Builder(parent);
+      return builder;
+    }
+    /**
+     * Protobuf type {@code service.GrpcGameEventBatch}
+     */
+    public static final class Builder extends
+        com.google.protobuf.GeneratedMessageV3.Builder<Builder> implements
+        // @@protoc_insertion_point(builder_implements:service.GrpcGameEventBatch)
+        protoc.MessageProto.GrpcGameEventBatchOrBuilder {
+      public static final com.google.protobuf.Descriptors.Descriptor
+          getDescriptor() {
+        return protoc.MessageProto.internal_static_service_GrpcGameEventBatch_descriptor;
+      }
+
+      @java.lang.Override
+      protected com.google.protobuf.GeneratedMessageV3.FieldAccessorTable
+          internalGetFieldAccessorTable() {
+        return protoc.MessageProto.internal_static_service_GrpcGameEventBatch_fieldAccessorTable
+            .ensureFieldAccessorsInitialized(
+                protoc.MessageProto.GrpcGameEventBatch.class, protoc.MessageProto.GrpcGameEventBatch.Builder.class);
+      }
+
+      // Construct using protoc.MessageProto.GrpcGameEventBatch.newBuilder()
+      private Builder() {
+
+      }
+
+      private Builder(
+          com.google.protobuf.GeneratedMessageV3.BuilderParent parent) {
+        super(parent);
+
+      }
+      @java.lang.Override
+      public Builder clear() {
+        super.clear();
+        bitField0_ = 0;
+        if (eventsBuilder_ == null) {
+          events_ = java.util.Collections.emptyList();
+        } else {
+          events_ = null;
+          eventsBuilder_.clear();
+        }
+        bitField0_ = (bitField0_ & ~0x00000001);
+        return this;
+      }
+
+      @java.lang.Override
+      public com.google.protobuf.Descriptors.Descriptor
+          getDescriptorForType() {
+        return protoc.MessageProto.internal_static_service_GrpcGameEventBatch_descriptor;
+      }
+
+      @java.lang.Override
+      public protoc.MessageProto.GrpcGameEventBatch getDefaultInstanceForType() {
+        return protoc.MessageProto.GrpcGameEventBatch.getDefaultInstance();
+      }
+
+      @java.lang.Override
+      public protoc.MessageProto.GrpcGameEventBatch build() {
+        protoc.MessageProto.GrpcGameEventBatch result = buildPartial();
+        if (!result.isInitialized()) {
+          throw newUninitializedMessageException(result);
+        }
+        return result;
+      }
+
+      @java.lang.Override
+      public protoc.MessageProto.GrpcGameEventBatch buildPartial() {
+        protoc.MessageProto.GrpcGameEventBatch result = new protoc.MessageProto.GrpcGameEventBatch(this);
+        buildPartialRepeatedFields(result);
+        if (bitField0_ != 0) { buildPartial0(result); }
+        onBuilt();
+        return result;
+      }
+
+      private void buildPartialRepeatedFields(protoc.MessageProto.GrpcGameEventBatch result) {
+        if (eventsBuilder_ == null) {
+          if (((bitField0_ & 0x00000001) != 0)) {
+            events_ = java.util.Collections.unmodifiableList(events_);
+            bitField0_ = (bitField0_ & ~0x00000001);
+          }
+          result.events_ = events_;
+        } else {
+          result.events_ = eventsBuilder_.build();
+        }
+      }
+
+      private void buildPartial0(protoc.MessageProto.GrpcGameEventBatch result) {
+        int from_bitField0_ = bitField0_;
+      }
+
+      @java.lang.Override
+      public Builder clone() {
+        return super.clone();
+      }
+      @java.lang.Override
+      public Builder setField(
+          com.google.protobuf.Descriptors.FieldDescriptor field,
+          java.lang.Object value) {
+        return super.setField(field, value);
+      }
+      @java.lang.Override
+      public Builder clearField(
+          com.google.protobuf.Descriptors.FieldDescriptor field) {
+        return super.clearField(field);
+      }
+      @java.lang.Override
+      public Builder clearOneof(
+          com.google.protobuf.Descriptors.OneofDescriptor oneof) {
+        return super.clearOneof(oneof);
+      }
+      @java.lang.Override
+      public Builder setRepeatedField(
+          com.google.protobuf.Descriptors.FieldDescriptor field,
+          int index, java.lang.Object value) {
+        return super.setRepeatedField(field, index, value);
+      }
+      @java.lang.Override
+      public Builder addRepeatedField(
+          com.google.protobuf.Descriptors.FieldDescriptor field,
+          java.lang.Object value) {
+        return super.addRepeatedField(field, value);
+      }
+      @java.lang.Override
+      public Builder mergeFrom(com.google.protobuf.Message other) {
+        if (other instanceof protoc.MessageProto.GrpcGameEventBatch) {
+          return mergeFrom((protoc.MessageProto.GrpcGameEventBatch)other);
+        } else {
+          super.mergeFrom(other);
+          return this;
+        }
+      }
+
+      public Builder mergeFrom(protoc.MessageProto.GrpcGameEventBatch other) {
+        if (other == protoc.MessageProto.GrpcGameEventBatch.getDefaultInstance()) return this;
+        if (eventsBuilder_ == null) {
+          if (!other.events_.isEmpty()) {
+            if (events_.isEmpty()) {
+              events_ = other.events_;
+              bitField0_ = (bitField0_ & ~0x00000001);
+            } else {
+              ensureEventsIsMutable();
+              events_.addAll(other.events_);
+            }
+            onChanged();
+          }
+        } else {
+          if (!other.events_.isEmpty()) {
+            if (eventsBuilder_.isEmpty()) {
+              eventsBuilder_.dispose();
+              eventsBuilder_ = null;
+              events_ = other.events_;
+              bitField0_ = (bitField0_ & ~0x00000001);
+              eventsBuilder_ = 
+                com.google.protobuf.GeneratedMessageV3.alwaysUseFieldBuilders ?
+                   getEventsFieldBuilder() : null;
+            } else {
+              eventsBuilder_.addAllMessages(other.events_);
+            }
+          }
+        }
+        this.mergeUnknownFields(other.getUnknownFields());
+        onChanged();
+        return this;
+      }
+
+      @java.lang.Override
+      public final boolean isInitialized() {
+        return true;
+      }
+
+      @java.lang.Override
+      public Builder mergeFrom(
+          com.google.protobuf.CodedInputStream input,
+          com.google.protobuf.ExtensionRegistryLite extensionRegistry)
+          throws java.io.IOException {
+        if (extensionRegistry == null) {
+          throw new java.lang.NullPointerException();
+        }
+        try {
+          boolean done = false;
+          while (!done) {
+            int tag = input.readTag();
+            switch (tag) {
+              case 0:
+                done = true;
+                break;
+              case 10: {
+                protoc.MessageProto.GrpcGameEvent m =
+                    input.readMessage(
+                        protoc.MessageProto.GrpcGameEvent.parser(),
+                        extensionRegistry);
+                if (eventsBuilder_ == null) {
+                  ensureEventsIsMutable();
+                  events_.add(m);
+                } else {
+                  eventsBuilder_.addMessage(m);
+                }
+                break;
+              } // case 10
+              default: {
+                if (!super.parseUnknownField(input, extensionRegistry, tag)) {
+                  done = true; // was an endgroup tag
+                }
+                break;
+              } // default:
+            } // switch (tag)
+          } // while (!done)
+        } catch (com.google.protobuf.InvalidProtocolBufferException e) {
+          throw e.unwrapIOException();
+        } finally {
+          onChanged();
+        } // finally
+        return this;
+      }
+      private int bitField0_;
+
+      private java.util.List<protoc.MessageProto.GrpcGameEvent> events_ =
+        java.util.Collections.emptyList();
+      private void ensureEventsIsMutable() {
+        if (!((bitField0_ & 0x00000001) != 0)) {
+          events_ = new java.util.ArrayList<protoc.MessageProto.GrpcGameEvent>(events_);
+          bitField0_ |= 0x00000001;
+         }
+      }
+
+      private com.google.protobuf.RepeatedFieldBuilderV3<
+          protoc.MessageProto.GrpcGameEvent, protoc.MessageProto.GrpcGameEvent.Builder, protoc.MessageProto.GrpcGameEventOrBuilder> eventsBuilder_;
+
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public java.util.List<protoc.MessageProto.GrpcGameEvent> getEventsList() {
+        if (eventsBuilder_ == null) {
+          return java.util.Collections.unmodifiableList(events_);
+        } else {
+          return eventsBuilder_.getMessageList();
+        }
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public int getEventsCount() {
+        if (eventsBuilder_ == null) {
+          return events_.size();
+        } else {
+          return eventsBuilder_.getCount();
+        }
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public protoc.MessageProto.GrpcGameEvent getEvents(int index) {
+        if (eventsBuilder_ == null) {
+          return events_.get(index);
+        } else {
+          return eventsBuilder_.getMessage(index);
+        }
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public Builder setEvents(
+          int index, protoc.MessageProto.GrpcGameEvent value) {
+        if (eventsBuilder_ == null) {
+          if (value == null) {
+            throw new NullPointerException();
+          }
+          ensureEventsIsMutable();
+          events_.set(index, value);
+          onChanged();
+        } else {
+          eventsBuilder_.setMessage(index, value);
+        }
+        return this;
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public Builder setEvents(
+          int index, protoc.MessageProto.GrpcGameEvent.Builder builderForValue) {
+        if (eventsBuilder_ == null) {
+          ensureEventsIsMutable();
+          events_.set(index, builderForValue.build());
+          onChanged();
+        } else {
+          eventsBuilder_.setMessage(index, builderForValue.build());
+        }
+        return this;
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public Builder addEvents(protoc.MessageProto.GrpcGameEvent value) {
+        if (eventsBuilder_ == null) {
+          if (value == null) {
+            throw new NullPointerException();
+          }
+          ensureEventsIsMutable();
+          events_.add(value);
+          onChanged();
+        } else {
+          eventsBuilder_.addMessage(value);
+        }
+        return this;
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public Builder addEvents(
+          int index, protoc.MessageProto.GrpcGameEvent value) {
+        if (eventsBuilder_ == null) {
+          if (value == null) {
+            throw new NullPointerException();
+          }
+          ensureEventsIsMutable();
+          events_.add(index, value);
+          onChanged();
+        } else {
+          eventsBuilder_.addMessage(index, value);
+        }
+        return this;
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public Builder addEvents(
+          protoc.MessageProto.GrpcGameEvent.Builder builderForValue) {
+        if (eventsBuilder_ == null) {
+          ensureEventsIsMutable();
+          events_.add(builderForValue.build());
+          onChanged();
+        } else {
+          eventsBuilder_.addMessage(builderForValue.build());
+        }
+        return this;
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public Builder addEvents(
+          int index, protoc.MessageProto.GrpcGameEvent.Builder builderForValue) {
+        if (eventsBuilder_ == null) {
+          ensureEventsIsMutable();
+          events_.add(index, builderForValue.build());
+          onChanged();
+        } else {
+          eventsBuilder_.addMessage(index, builderForValue.build());
+        }
+        return this;
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public Builder addAllEvents(
+          java.lang.Iterable<? extends protoc.MessageProto.GrpcGameEvent> values) {
+        if (eventsBuilder_ == null) {
+          ensureEventsIsMutable();
+          com.google.protobuf.AbstractMessageLite.Builder.addAll(
+              values, events_);
+          onChanged();
+        } else {
+          eventsBuilder_.addAllMessages(values);
+        }
+        return this;
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public Builder clearEvents() {
+        if (eventsBuilder_ == null) {
+          events_ = java.util.Collections.emptyList();
+          bitField0_ = (bitField0_ & ~0x00000001);
+          onChanged();
+        } else {
+          eventsBuilder_.clear();
+        }
+        return this;
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public Builder removeEvents(int index) {
+        if (eventsBuilder_ == null) {
+          ensureEventsIsMutable();
+          events_.remove(index);
+          onChanged();
+        } else {
+          eventsBuilder_.remove(index);
+        }
+        return this;
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public protoc.MessageProto.GrpcGameEvent.Builder getEventsBuilder(
+          int index) {
+        return getEventsFieldBuilder().getBuilder(index);
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public protoc.MessageProto.GrpcGameEventOrBuilder getEventsOrBuilder(
+          int index) {
+        if (eventsBuilder_ == null) {
+          return events_.get(index);  } else {
+          return eventsBuilder_.getMessageOrBuilder(index);
+        }
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public java.util.List<? extends protoc.MessageProto.GrpcGameEventOrBuilder> 
+           getEventsOrBuilderList() {
+        if (eventsBuilder_ != null) {
+          return eventsBuilder_.getMessageOrBuilderList();
+        } else {
+          return java.util.Collections.unmodifiableList(events_);
+        }
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public protoc.MessageProto.GrpcGameEvent.Builder addEventsBuilder() {
+        return getEventsFieldBuilder().addBuilder(
+            protoc.MessageProto.GrpcGameEvent.getDefaultInstance());
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public protoc.MessageProto.GrpcGameEvent.Builder addEventsBuilder(
+          int index) {
+        return getEventsFieldBuilder().addBuilder(
+            index, protoc.MessageProto.GrpcGameEvent.getDefaultInstance());
+      }
+      /**
+       * <code>repeated .service.GrpcGameEvent events = 1;</code>
+       */
+      public java.util.List<protoc.MessageProto.GrpcGameEvent.Builder> 
+           getEventsBuilderList() {
+        return getEventsFieldBuilder().getBuilderList();
+      }
+      private com.google.protobuf.RepeatedFieldBuilderV3<
+          protoc.MessageProto.GrpcGameEvent, protoc.MessageProto.GrpcGameEvent.Builder, protoc.MessageProto.GrpcGameEventOrBuilder> 
+          getEventsFieldBuilder() {
+        if (eventsBuilder_ == null) {
+          eventsBuilder_ = new com.google.protobuf.RepeatedFieldBuilderV3<
+              protoc.MessageProto.GrpcGameEvent, protoc.MessageProto.GrpcGameEvent.Builder, protoc.MessageProto.GrpcGameEventOrBuilder>(
+                  events_,
+                  ((bitField0_ & 0x00000001) != 0),
+                  getParentForChildren(),
+                  isClean());
+          events_ = null;
+        }
+        return eventsBuilder_;
+      }
+      @java.lang.Override
+      public final Builder setUnknownFields(
+          final com.google.protobuf.UnknownFieldSet unknownFields) {
+        return super.setUnknownFields(unknownFields);
+      }
+
+      @java.lang.Override
+      public final Builder mergeUnknownFields(
+          final com.google.protobuf.UnknownFieldSet unknownFields) {
+        return super.mergeUnknownFields(unknownFields);
+      }
+
+
+      // @@protoc_insertion_point(builder_scope:service.GrpcGameEventBatch)
+    }
+
+    // @@protoc_insertion_point(class_scope:service.GrpcGameEventBatch)
+    private static final protoc.MessageProto.GrpcGameEventBatch DEFAULT_INSTANCE;
+    static {
+      DEFAULT_INSTANCE = new protoc.MessageProto.GrpcGameEventBatch();
+    }
+
+    public static protoc.MessageProto.GrpcGameEventBatch getDefaultInstance() {
+      return DEFAULT_INSTANCE;
+    }
+
+    private static final com.google.protobuf.Parser<GrpcGameEventBatch>
+        PARSER = new com.google.protobuf.AbstractParser<GrpcGameEventBatch>() {
+      @java.lang.Override
+      public GrpcGameEventBatch parsePartialFrom(
+          com.google.protobuf.CodedInputStream input,
+          com.google.protobuf.ExtensionRegistryLite extensionRegistry)
+          throws com.google.protobuf.InvalidProtocolBufferException {
+        Builder builder = newBuilder();
+        try {
+          builder.mergeFrom(input, extensionRegistry);
+        } catch (com.google.protobuf.InvalidProtocolBufferException e) {
+          throw e.setUnfinishedMessage(builder.buildPartial());
+        } catch (com.google.protobuf.UninitializedMessageException e) {
+          throw e.asInvalidProtocolBufferException().setUnfinishedMessage(builder.buildPartial());
+        } catch (java.io.IOException e) {
+          throw new com.google.protobuf.InvalidProtocolBufferException(e)
+              .setUnfinishedMessage(builder.buildPartial());
+        }
+        return builder.buildPartial();
+      }
+    };
+
+    public static com.google.protobuf.Parser<GrpcGameEventBatch> parser() {
+      return PARSER;
+    }
+
+    @java.lang.Override
+    public com.google.protobuf.Parser<GrpcGameEventBatch> getParserForType() {
+      return PARSER;
+    }
+
+    @java.lang.Override
+    public protoc.MessageProto.GrpcGameEventBatch getDefaultInstanceForType() {
+      return DEFAULT_INSTANCE;
+    }
+
+  }
+
   private static final com.google.protobuf.Descriptors.Descriptor
     internal_static_service_GrpcHitArea_descriptor;
   private static final 
@@ -13447,6 +14232,11 @@ public final class MessageProto {
   private static final 
     com.google.protobuf.GeneratedMessageV3.FieldAccessorTable
       internal_static_service_GrpcGameEvent_fieldAccessorTable;
+  private static final com.google.protobuf.Descriptors.Descriptor
+    internal_static_service_GrpcGameEventBatch_descriptor;
+  private static final 
+    com.google.protobuf.GeneratedMessageV3.FieldAccessorTable
+      internal_static_service_GrpcGameEventBatch_fieldAccessorTable;
 
   public static com.google.protobuf.Descriptors.FileDescriptor
       getDescriptor() {
@@ -13509,9 +14299,10 @@ public final class MessageProto {
       "\010event_id\030\001 \001(\005\022\022\n\nevent_type\030\002 \001(\005\022\t\n\001x" +
       "\030\003 \001(\005\022\t\n\001y\030\004 \001(\005\022\n\n\002vx\030\005 \001(\005\022\n\n\002vy\030\006 \001(" +
       "\005\022\014\n\004time\030\007 \001(\005\022\n\n\002hx\030\010 \001(\005\022\n\n\002hy\030\t \001(\005\022" +
-      "\021\n\tterminate\030\n \001(\010B5\n\006protocB\014MessagePro" +
-      "toP\000\252\002\032DareFightingICE.Grpc.Protob\006proto" +
-      "3"
+      "\021\n\tterminate\030\n \001(\010\"<\n\022GrpcGameEventBatch" +
+      "\022&\n\006events\030\001 \003(\0132\026.service.GrpcGameEvent" +
+      "B5\n\006protocB\014MessageProtoP\000\252\002\032DareFightin" +
+      "gICE.Grpc.Protob\006proto3"
     };
     descriptor = com.google.protobuf.Descriptors.FileDescriptor
       .internalBuildGeneratedFileFrom(descriptorData,
@@ -13584,6 +14375,12 @@ public final class MessageProto {
       com.google.protobuf.GeneratedMessageV3.FieldAccessorTable(
         internal_static_service_GrpcGameEvent_descriptor,
         new java.lang.String[] { "EventId", "EventType", "X", "Y", "Vx", "Vy", "Time", "Hx", "Hy", "Terminate", });
+    internal_static_service_GrpcGameEventBatch_descriptor =
+      getDescriptor().getMessageTypes().get(11);
+    internal_static_service_GrpcGameEventBatch_fieldAccessorTable = new
+      com.google.protobuf.GeneratedMessageV3.FieldAccessorTable(
+        internal_static_service_GrpcGameEventBatch_descriptor,
+        new java.lang.String[] { "Events", });
     protoc.EnumProto.getDescriptor();
   }
 
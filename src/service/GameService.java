@@ -38,6 +38,10 @@ public class GameService {
 		this.eventQueue.add(event);
 	}
 	
+	public void addEvents(List<GrpcGameEvent> events) {
+		this.eventQueue.addAll(events);
+	}
+	
 	public GrpcGameEvent getEvent() {
 		return this.eventQueue.poll();
 	}
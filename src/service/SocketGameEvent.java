@@ -1,5 +1,6 @@
 package service;
 
+import java.io.BufferedInputStream;
 import java.io.DataInputStream;
 import java.io.IOException;
 import java.net.Socket;
@@ -7,18 +8,27 @@ import java.util.logging.Level;
 import java.util.logging.Logger;
 
 import protoc.MessageProto.GrpcGameEvent;
+import protoc.MessageProto.GrpcGameEventBatch;
 import util.SocketUtil;
 
 public class SocketGameEvent implements Runnable {
     private Socket socket;
     private DataInputStream din;
     private boolean cancelled;
+    private boolean batched;
 
     public SocketGameEvent(Socket socket) {
+        this(socket, false);
+    }
+
+    // batched: every frame is a GrpcGameEventBatch (role 7) instead of one GrpcGameEvent (role 6)
+    public SocketGameEvent(Socket socket, boolean batched) {
         this.socket = socket;
         this.cancelled = false;
+        this.batched = batched;
         try {
-            this.din = new DataInputStream(socket.getInputStream());
+            // Buffered, so a length header and its frame are usually one read
+            this.din = new DataInputStream(new BufferedInputStream(socket.getInputStream()));
         } catch (IOException e) {
             Logger.getAnonymousLogger().log(Level.SEVERE, e.getMessage());
             this.cancel();
@@ -30,9 +40,13 @@ public class SocketGameEvent implements Runnable {
         while (!cancelled && !socket.isClosed()) {
             try {
                 byte[] data = SocketUtil.socketRecv(din, -1);
-                GrpcGameEvent event = GrpcGameEvent.parseFrom(data);
-                
-                GameService.getInstance().addEvent(event);
+                if (batched) {
+                    GrpcGameEventBatch batch = GrpcGameEventBatch.parseFrom(data);
+                    GameService.getInstance().addEvents(batch.getEventsList());
+                } else {
+                    GrpcGameEvent event = GrpcGameEvent.parseFrom(data);
+                    GameService.getInstance().addEvent(event);
+                }
             } catch (IOException e) {
                 this.cancel();
             }
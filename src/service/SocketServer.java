@@ -178,6 +178,11 @@ public class SocketServer {
 						SocketGameEvent eventClient = new SocketGameEvent(client);
 						new Thread(eventClient).start();
 						Logger.getAnonymousLogger().log(Level.INFO, "Client connected as Game Event Injector");
+					} else if (data[0] == 7) {
+						// Game Event, several per frame (GrpcGameEventBatch)
+						SocketGameEvent eventClient = new SocketGameEvent(client, true);
+						new Thread(eventClient).start();
+						Logger.getAnonymousLogger().log(Level.INFO, "Client connected as Batched Game Event Injector");
 					}
 				} catch (IOException e) {
 					if (!Thread.currentThread().isInterrupted()) Logger.getAnonymousLogger().log(Level.SEVERE, e.getMessage());
@@ -1,10 +1,10 @@
-import socket
-import struct
-import message_pb2
+import logging
 import time
 import tkinter as tk
 import random
 
+from event_injector import EventInjector, encode_event
+
 class EventInjectorGUI:
     def __init__(self, master):
         self.master = master
@@ -19,8 +19,10 @@ class EventInjectorGUI:
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
         
-        self.sock = None
-        self.connect_socket()
+        # Connects, reconnects and sends on its own thread, so the Tk loop never
+        # waits on the socket (role 7: batched GrpcGameEvent frames)
+        self.injector = EventInjector('127.0.0.1', 31415).start()
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
         
         self.current_event_id = 0
         self.is_dragging = False
@@ -29,44 +31,17 @@ class EventInjectorGUI:
         self.vx = 0
         self.vy = 0
         
-    def connect_socket(self):
-        try:
-            if self.sock:
-                self.sock.close()
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect(('127.0.0.1', 31415))
-            # 1. Send Role (6 = Game Event Injector)
-            self.sock.send(b'\x06')
-            print("Connected to game server.")
-        except Exception as e:
-            print(f"Connection failed: {e}")
-            self.sock = None
+    def make_event(self, event_type, terminate):
+        return encode_event(self.current_event_id, event_type, self.current_x, self.current_y,
+                            self.vx, self.vy, terminate)
 
     def send_event(self, event_type, terminate):
-        if self.sock is None:
-            # Try to reconnect once
-            self.connect_socket()
-            if self.sock is None:
-                return
+        self.injector.send(self.make_event(event_type, terminate), hover=not terminate)
+        print(f"Sent: ID={self.current_event_id}, Type={event_type}, X={self.current_x}, Y={self.current_y}, Term={terminate}")
 
-        try:
-            event = message_pb2.GrpcGameEvent()
-            event.event_id = self.current_event_id
-            event.event_type = event_type
-            event.x = self.current_x
-            event.y = self.current_y
-            event.vx = self.vx
-            event.vy = self.vy
-            event.time = 180
-            event.terminate = terminate
-            
-            data = event.SerializeToString()
-            self.sock.send(struct.pack('<I', len(data)))
-            self.sock.send(data)
-            print(f"Sent: ID={event.event_id}, Type={event.event_type}, X={event.x}, Y={event.y}, Term={event.terminate}")
-        except Exception as e:
-            print(f"Send failed: {e}")
-            self.sock = None
+    def on_close(self):
+        self.injector.close(timeout=1.0)
+        self.master.destroy()
 
     def on_press(self, event):
         self.is_dragging = True
@@ -92,8 +67,10 @@ class EventInjectorGUI:
         self.is_dragging = False
         self.current_x = event.x
         self.current_y = event.y
-        # Send final terminate message
-        self.send_event(event_type=1, terminate=True)
+        # Last position (evictable like any hover), then the terminate message
+        self.injector.send(self.make_event(0, False), hover=True)
+        self.injector.send(self.make_event(1, True))
+        print(f"Sent: ID={self.current_event_id}, Type=1, X={self.current_x}, Y={self.current_y}, Term=True")
         self.current_event_id += 1
 
     def send_loop(self):
@@ -103,6 +80,7 @@ class EventInjectorGUI:
             self.master.after(33, self.send_loop)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     root = tk.Tk()
     gui = EventInjectorGUI(root)
     root.mainloop()
@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+# event_injector.py
+#
+# Headless client for the game's event socket (Java SocketGameEvent). Callers
+# only queue events, which never blocks on the network; one sender drains the
+# queue, frames each run into a single buffer (one sendall / write) and
+# reconnects with exponential backoff whenever the socket drops:
+#
+#   - EventInjector: background sender thread, for scripts, the Tk demo and
+#     stress tests
+#   - AsyncEventInjector: asyncio task, used by the deploy server's GameLink
+#
+# With batch=True the connection uses role 7 and every run goes out as
+# GrpcGameEventBatch frames of up to batch_max events; batch=False uses role 6,
+# one GrpcGameEvent per frame, as game builds from before batching expect.
+#
+#   python event_injector.py --rate 5000 --seconds 10                 # synthetic drags
+#   python event_injector.py --script drags.jsonl --speed 2           # scripted stream
+#   python replay_events.py --serve &                                 # stand-in game, then
+#   python event_injector.py --rate 0 --events 200000 --batch-max 128 # as fast as possible
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import message_pb2
+except ImportError:
+    message_pb2 = None  # bytes can still be sent; make_event needs it
+
+ROLE_EVENT = b'\x06'        # one GrpcGameEvent per frame
+ROLE_EVENT_BATCH = b'\x07'  # one GrpcGameEventBatch per frame
+
+# Item name -> event_type of the terminating (placement) event
+ITEM_TYPE_MAP = {
+    "freeze": 1,
+    "fire": 2,
+    "wind": 3,
+    "shield": 4,
+    "chaos": 5,
+    "warp": 6,
+    "bomb": 7,
+    "spout": 8
+}
+
+log = logging.getLogger("event_injector")
+
+
+# =========================
+# Encoding
+# =========================
+def make_event(event_id, event_type, x, y, vx=0, vy=0, terminate=False, event_time=180):
+    if message_pb2 is None:
+        raise RuntimeError("message_pb2 not found; generate it with protoc (see build-linux.sh)")
+    event = message_pb2.GrpcGameEvent()
+    event.event_id = event_id
+    event.event_type = event_type
+    event.x = int(x)
+    event.y = int(y)
+    event.vx = int(vx)
+    event.vy = int(vy)
+    event.time = event_time
+    event.terminate = terminate
+    return event
+
+
+def encode_event(event_id, event_type, x, y, vx=0, vy=0, terminate=False, event_time=180):
+    return make_event(event_id, event_type, x, y, vx, vy, terminate, event_time).SerializeToString()
+
+
+def encode_event_batch(events):
+    # GrpcGameEventBatch on the wire is just each serialized GrpcGameEvent as
+    # field 1 (tag 0x0A, varint length, bytes), so events are never re-encoded
+    parts = []
+    for data in events:
+        n = len(data)
+        header = bytearray(b'\x0a')
+        while n > 0x7f:
+            header.append((n & 0x7f) | 0x80)
+            n >>= 7
+        header.append(n)
+        parts.append(bytes(header))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def frame_events(events, batch=True, batch_max=64):
+    # Serialized events -> '<I' length-prefixed frames
+    if not batch:
+        return [struct.pack('<I', len(data)) + data for data in events]
+    frames = []
+    for i in range(0, len(events), batch_max):
+        body = encode_event_batch(events[i:i + batch_max])
+        frames.append(struct.pack('<I', len(body)) + body)
+    return frames
+
+
+# =========================
+# Event streams
+# =========================
+# A script is any iterable of (offset seconds, event, hover): the event as a
+# GrpcGameEvent or its serialized bytes, hover=True for position updates that
+# a newer one supersedes (they are dropped first when the queue is full).
+
+def load_script(path):
+    # JSONL, one event per line:
+    #   {"t": 0.033, "event_id": 0, "event_type": 0, "x": 10, "y": 20, "vx": 1, "vy": 0, "terminate": false}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            r = json.loads(line)
+            terminate = bool(r.get("terminate", False))
+            event_type = int(r.get("event_type", 0))
+            yield (float(r.get("t", 0.0)),
+                   encode_event(int(r.get("event_id", 0)), event_type, r.get("x", 0), r.get("y", 0),
+                                r.get("vx", 0), r.get("vy", 0), terminate, int(r.get("time", 180))),
+                   event_type == 0 and not terminate)
+
+
+def drag_script(event_id, points, event_type=1, fps=30.0, start=0.0):
+    # A placement drag: a hover per point at `fps`, then the terminating event
+    # at the last point, the way the overlay and the Tk demo produce them
+    events = []
+    prev = points[0]
+    for i, (x, y) in enumerate(points):
+        vx = max(-3, min(3, x - prev[0]))
+        vy = max(-3, min(3, y - prev[1]))
+        events.append((start + i / fps, encode_event(event_id, 0, x, y, vx, vy), True))
+        prev = (x, y)
+    x, y = points[-1]
+    events.append((start + (len(points) - 1) / fps, encode_event(event_id, event_type, x, y, terminate=True), False))
+    return events
+
+
+def synthetic_drags(total, rate=0.0, drag_points=20, width=960, height=640, event_types=(1, 2, 3, 4, 5), seed=None):
+    # `total` events of random straight-ish drags, paced at `rate` events/s (0 = all at t=0)
+    rng = random.Random(seed)
+    event_id = 0
+    sent = 0
+    while sent < total:
+        x, y = rng.randrange(width), rng.randrange(height)
+        dx, dy = rng.randint(-3, 3), rng.randint(-3, 3)
+        points = []
+        for _ in range(max(1, min(drag_points, total - sent - 1))):
+            x = max(0, min(width - 1, x + dx + rng.randint(-1, 1)))
+            y = max(0, min(height - 1, y + dy + rng.randint(-1, 1)))
+            points.append((x, y))
+        for _, event, hover in drag_script(event_id, points, rng.choice(event_types)):
+            yield (sent / rate if rate > 0 else 0.0, event, hover)
+            sent += 1
+        event_id += 1
+
+
+# =========================
+# Senders
+# =========================
+class _InjectorBase:
+    # Queue, framing, metrics and hooks shared by the thread and asyncio senders.
+    # Hooks (on_connect, on_connect_error, on_disconnect, on_drain) log by
+    # default and can be overridden, e.g. to feed a metrics registry.
+
+    def __init__(self, host="127.0.0.1", port=31415, batch=True, batch_max=64, queue_size=4096,
+                 reconnect_min=0.5, reconnect_max=10.0):
+        self.host = host
+        self.port = port
+        self.batch = batch
+        self.batch_max = max(1, batch_max)
+        self.queue_size = max(1, queue_size)
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self.queue = deque()  # (event bytes, hover, enqueue perf_counter)
+        self.connected = False
+
+        # metrics
+        self.connects = 0
+        self.disconnects = 0
+        self.events_enqueued = 0
+        self.events_sent = 0
+        self.events_dropped = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.batches = 0
+        self.last_error = None
+        self.last_drain_ms = 0.0
+        self.avg_drain_ms = 0.0
+        self.avg_latency_ms = 0.0  # EWMA of enqueue -> written
+
+    @property
+    def role(self):
+        return ROLE_EVENT_BATCH if self.batch else ROLE_EVENT
+
+    def _push(self, event, hover):
+        if not isinstance(event, (bytes, bytearray)):
+            event = event.SerializeToString()
+        if len(self.queue) >= self.queue_size:
+            # Hovers are superseded by newer ones, so they go first; the oldest
+            # event is only dropped if the queue is all placements.
+            victim = next((item for item in self.queue if item[1]), None)
+            if victim is not None:
+                self.queue.remove(victim)
+            else:
+                self.queue.popleft()
+            self.events_dropped += 1
+        self.queue.append((bytes(event), hover, time.perf_counter()))
+        self.events_enqueued += 1
+
+    def _take(self):
+        items = list(self.queue)
+        self.queue.clear()
+        return items
+
+    def _requeue(self, items):
+        # Placements survive a reconnect; stale hovers do not
+        self.queue.extendleft(reversed([item for item in items if not item[1]]))
+
+    def _sent(self, items, frames, t0):
+        now = time.perf_counter()
+        drain_ms = (now - t0) * 1000.0
+        self.last_drain_ms = drain_ms
+        self.avg_drain_ms += (drain_ms - self.avg_drain_ms) * 0.05
+        for item in items:
+            self.avg_latency_ms += ((now - item[2]) * 1000.0 - self.avg_latency_ms) * 0.05
+        self.events_sent += len(items)
+        self.frames_sent += len(frames)
+        self.bytes_sent += sum(len(f) for f in frames)
+        self.batches += 1
+        self.on_drain(items, frames, now - t0)
+
+    def frames(self, events):
+        return frame_events(events, self.batch, self.batch_max)
+
+    # --- hooks ---
+    def on_connect(self):
+        log.info("Connected to game server at %s:%d (role %d)", self.host, self.port, self.role[0])
+
+    def on_connect_error(self, error, retry_in):
+        log.warning("Game connection failed: %s (retry in %.1fs)", error, retry_in)
+
+    def on_disconnect(self, error):
+        log.warning("Game connection lost: %s", error)
+
+    def on_drain(self, items, frames, seconds):
+        pass
+
+    def stats(self):
+        return {
+            "connected": self.connected,
+            "address": f"{self.host}:{self.port}",
+            "batched": self.batch,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "queue_depth": len(self.queue),
+            "events_enqueued": self.events_enqueued,
+            "events_sent": self.events_sent,
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "events_dropped": self.events_dropped,
+            "batches": self.batches,
+            "drain_ms_last": round(self.last_drain_ms, 3),
+            "drain_ms_avg": round(self.avg_drain_ms, 3),
+            "latency_ms_avg": round(self.avg_latency_ms, 3),
+            "last_error": self.last_error,
+        }
+
+
+class EventInjector(_InjectorBase):
+    # Thread-backed sender. send() only queues (or, with block=True, waits for
+    # room in the queue); the daemon thread does all socket work. A closed game
+    # socket is noticed on the next write.
+
+    def __init__(self, host="127.0.0.1", port=31415, batch=True, batch_max=64, queue_size=65536,
+                 reconnect_min=0.5, reconnect_max=10.0, connect_timeout=5.0):
+        super().__init__(host, port, batch, batch_max, queue_size, reconnect_min, reconnect_max)
+        self.connect_timeout = connect_timeout
+        self.cond = threading.Condition()
+        self.thread = None
+        self.sock = None
+        self.closing = False
+        self.inflight = 0
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="event-injector", daemon=True)
+            self.thread.start()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send(self, event, hover=False, block=False):
+        with self.cond:
+            if block:
+                self.cond.wait_for(lambda: len(self.queue) < self.queue_size or self.closing)
+            self._push(event, hover)
+            self.cond.notify_all()
+
+    def send_many(self, events, hover=False):
+        with self.cond:
+            for event in events:
+                self._push(event, hover)
+            self.cond.notify_all()
+
+    def play(self, script, speed=1.0, block=True):
+        # Sends a script on its own timing (speed 2 = twice as fast, 0 = no waiting)
+        start = time.perf_counter()
+        n = 0
+        for offset, event, hover in script:
+            if speed > 0:
+                delay = start + offset / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            self.send(event, hover=hover, block=block)
+            n += 1
+        return n
+
+    def flush(self, timeout=None):
+        # True once everything queued so far has been written
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.queue and not self.inflight, timeout)
+
+    def close(self, timeout=5.0):
+        if self.thread is not None and self.connected:
+            self.flush(timeout)
+        with self.cond:
+            self.closing = True
+            self.cond.notify_all()
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        sock.settimeout(None)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.sendall(self.role)
+        return sock
+
+    def _run(self):
+        backoff = self.reconnect_min
+        while not self.closing:
+            try:
+                sock = self._connect()
+            except OSError as e:
+                self.last_error = str(e)
+                self.on_connect_error(e, backoff)
+                with self.cond:
+                    self.cond.wait_for(lambda: self.closing, backoff)
+                backoff = min(self.reconnect_max, backoff * 2)
+                continue
+
+            self.sock = sock
+            self.connected = True
+            self.connects += 1
+            backoff = self.reconnect_min
+            self.on_connect()
+            try:
+                self._pump(sock)
+            except OSError as e:
+                self.last_error = str(e)
+                if not self.closing:
+                    self.on_disconnect(e)
+            finally:
+                self.connected = False
+                self.disconnects += 1
+                self.sock = None
+                sock.close()
+
+    def _pump(self, sock):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.queue or self.closing)
+                if not self.queue:
+                    return
+                items = self._take()
+                self.inflight = len(items)
+                self.cond.notify_all()  # room in the queue for blocked senders
+            t0 = time.perf_counter()
+            frames = self.frames([item[0] for item in items])
+            try:
+                sock.sendall(b"".join(frames))
+            except OSError:
+                with self.cond:
+                    self._requeue(items)
+                    self.inflight = 0
+                raise
+            with self.cond:
+                self.inflight = 0
+                self._sent(items, frames, t0)
+                self.cond.notify_all()
+
+
+class AsyncEventInjector(_InjectorBase):
+    # asyncio sender: run() is the supervisor task, send() only queues. The
+    # game never writes on this socket, so a finished read means it closed.
+
+    def __init__(self, host="127.0.0.1", port=31415, batch=True, batch_max=64, queue_size=4096,
+                 reconnect_min=0.5, reconnect_max=10.0):
+        super().__init__(host, port, batch, batch_max, queue_size, reconnect_min, reconnect_max)
+        self.wakeup = asyncio.Event()
+
+    def send(self, event, hover=False):
+        self._push(event, hover)
+        self.wakeup.set()
+
+    async def play(self, script, speed=1.0):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        n = 0
+        for offset, event, hover in script:
+            if speed > 0:
+                delay = start + offset / speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self.send(event, hover=hover)
+            n += 1
+        return n
+
+    async def run(self):
+        backoff = self.reconnect_min
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                sock = writer.get_extra_info("socket")
+                if sock is not None:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                writer.write(self.role)
+                await writer.drain()
+            except (OSError, asyncio.TimeoutError) as e:
+                self.last_error = str(e)
+                self.on_connect_error(e, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(self.reconnect_max, backoff * 2)
+                continue
+
+            self.connected = True
+            self.connects += 1
+            backoff = self.reconnect_min
+            self.on_connect()
+            try:
+                await self._pump(reader, writer)
+            except Exception as e:
+                self.last_error = str(e)
+                self.on_disconnect(e)
+            finally:
+                self.connected = False
+                self.disconnects += 1
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except Exception:
+                    pass
+
+    async def _pump(self, reader, writer):
+        eof = asyncio.create_task(reader.read())
+        try:
+            while True:
+                if not self.queue:
+                    self.wakeup.clear()
+                    waiter = asyncio.create_task(self.wakeup.wait())
+                    done, _ = await asyncio.wait({waiter, eof}, return_when=asyncio.FIRST_COMPLETED)
+                    if eof in done:
+                        waiter.cancel()
+                        raise ConnectionResetError("game closed the event socket")
+
+                items = self._take()
+                t0 = time.perf_counter()
+                frames = self.frames([item[0] for item in items])
+                try:
+                    writer.write(b"".join(frames))
+                    await writer.drain()
+                except Exception:
+                    self._requeue(items)
+                    raise
+                self._sent(items, frames, t0)
+        finally:
+            eof.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inject synthetic or scripted events into the game event socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=31415)
+    parser.add_argument("--script", help="JSONL event script (see load_script); default: synthetic drags")
+    parser.add_argument("--speed", type=float, default=1.0, help="script time scale; 0 = as fast as possible")
+    parser.add_argument("--rate", type=float, default=1000, help="synthetic events per second (0 = as fast as possible)")
+    parser.add_argument("--seconds", type=float, default=10, help="synthetic stream length")
+    parser.add_argument("--events", type=int, default=0, help="synthetic event count (default rate * seconds)")
+    parser.add_argument("--drag-points", type=int, default=20, help="hover events per synthetic drag")
+    parser.add_argument("--batch-max", type=int, default=64, help="events per GrpcGameEventBatch frame")
+    parser.add_argument("--no-batch", action="store_true", help="one GrpcGameEvent per frame (role 6)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.script:
+        script, speed = load_script(args.script), args.speed
+    else:
+        total = args.events or int(args.rate * args.seconds)
+        if total <= 0:
+            parser.error("--rate 0 needs --events")
+        script = synthetic_drags(total, max(0.0, args.rate), args.drag_points, seed=args.seed)
+        speed = 1.0 if args.rate > 0 else 0.0
+
+    injector = EventInjector(args.host, args.port, batch=not args.no_batch, batch_max=args.batch_max).start()
+    deadline = time.time() + 5
+    while not injector.connected and time.time() < deadline:
+        time.sleep(0.01)
+    t0 = time.perf_counter()
+    n = injector.play(script, speed=speed)
+    injector.flush(30)
+    elapsed = time.perf_counter() - t0
+    injector.close()
+
+    report = injector.stats()
+    report.update({
+        "played": n,
+        "elapsed_s": round(elapsed, 4),
+        "events_per_s": round(injector.events_sent / elapsed, 1) if elapsed > 0 else 0.0,
+    })
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
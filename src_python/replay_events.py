@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# replay_events.py
+#
+# Replays recorded viewer traffic (spawn_log.jsonl, or the deploy server's
+# round_journal.jsonl, plain or .gz) against the game's event socket, using the same
+# '<I' length-prefixed framing as the deploy server: one GrpcGameEvent per
+# frame (role 6), or with --batch N up to N events per GrpcGameEventBatch
+# frame (role 7).
+#
+#   python replay_events.py ../TWITCH/Twitch-extension/spawn_log.jsonl            # original timing
+#   python replay_events.py spawn_log.jsonl --speed 10                             # 10x faster
+#   python replay_events.py spawn_log.jsonl --speed 0 --loop 20                    # as fast as possible
+#   python replay_events.py spawn_log.jsonl --speed 0 --local                      # no game needed
+#   python replay_events.py spawn_log.jsonl --speed 0 --local --batch 32           # batched frames
+#   python replay_events.py --serve --port 31415                                   # stand-in receiver only
+
+import argparse
+import gzip
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+
+import message_pb2
+
+from event_injector import ITEM_TYPE_MAP, ROLE_EVENT, ROLE_EVENT_BATCH, encode_event, frame_events
+
+
+def open_log(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_records(path):
+    # Lazy: one line in memory at a time
+    with open_log(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def iter_events(records):
+    # -> (ts, event_type, x, y, vx, vy, terminate)
+    for r in records:
+        t = r.get("type")
+        if t == "game_event":
+            # Deploy server journal
+            event_type = int(r.get("event_type", 0))
+        elif t == "mouse_event" and "terminate" in r:
+            # Legacy spawn_log: the item type is only sent with the terminating event
+            if r.get("sent_to_game") is False:
+                continue
+            event_type = max(min(ITEM_TYPE_MAP.get(r.get("item"), 1), 5), 0) if r.get("terminate") else 0
+        else:
+            continue
+        yield (float(r.get("ts", 0.0)), event_type, int(r.get("x", 0)), int(r.get("y", 0)),
+               int(r.get("vx", 0)), int(r.get("vy", 0)), bool(r.get("terminate", False)))
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def summarize(name, values_ms):
+    values_ms.sort()
+    return {
+        f"{name}_p50_ms": round(percentile(values_ms, 50), 4),
+        f"{name}_p90_ms": round(percentile(values_ms, 90), 4),
+        f"{name}_p99_ms": round(percentile(values_ms, 99), 4),
+        f"{name}_max_ms": round(values_ms[-1], 4) if values_ms else 0.0,
+    }
+
+
+def replay(path, host, port, speed, loops, limit, max_gap=0.0, batch=1):
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.sendall(ROLE_EVENT_BATCH if batch > 1 else ROLE_EVENT)
+
+    event_id = 0
+    sent = 0
+    frames = 0
+    nbytes = 0
+    send_ms = []
+    late_ms = []
+    pending = []  # serialized events not yet sent when batching
+
+    def send(frame):
+        t0 = time.perf_counter()
+        sock.sendall(frame)
+        send_ms.append((time.perf_counter() - t0) * 1000.0)
+        return len(frame)
+
+    start = time.perf_counter()
+    try:
+        for _ in range(loops):
+            prev_ts = None
+            offset = 0.0  # recorded seconds since the first event, idle gaps clamped
+            loop_start = time.perf_counter()
+            for ts, event_type, x, y, vx, vy, terminate in iter_events(iter_records(path)):
+                if speed > 0:
+                    if prev_ts is not None:
+                        gap = max(0.0, ts - prev_ts)
+                        offset += min(gap, max_gap) if max_gap > 0 else gap
+                    prev_ts = ts
+                    due = loop_start + offset / speed
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        if pending:
+                            # Never hold events back over a gap
+                            nbytes += send(frame_events(pending, batch_max=batch)[0])
+                            frames += 1
+                            pending = []
+                        time.sleep(delay)
+                    late_ms.append(max(0.0, time.perf_counter() - due) * 1000.0)
+
+                data = encode_event(event_id, event_type, x, y, vx, vy, terminate)
+                if batch > 1:
+                    pending.append(data)
+                    if len(pending) >= batch:
+                        nbytes += send(frame_events(pending, batch_max=batch)[0])
+                        frames += 1
+                        pending = []
+                else:
+                    nbytes += send(frame_events([data], batch=False)[0])
+                    frames += 1
+
+                sent += 1
+                if terminate:
+                    event_id += 1
+                if limit and sent >= limit:
+                    break
+            if limit and sent >= limit:
+                break
+        if pending:
+            nbytes += send(frame_events(pending, batch_max=batch)[0])
+            frames += 1
+    finally:
+        sock.close()
+
+    elapsed = time.perf_counter() - start
+    report = {
+        "events": sent,
+        "frames": frames,
+        "bytes": nbytes,
+        "placements": event_id,
+        "elapsed_s": round(elapsed, 4),
+        "events_per_s": round(sent / elapsed, 1) if elapsed > 0 else 0.0,
+        "speed": speed if speed > 0 else "max",
+    }
+    report.update(summarize("send", send_ms))
+    if late_ms:
+        report.update(summarize("schedule_lag", late_ms))
+    return report
+
+
+# =========================
+# Stand-in receiver
+# =========================
+class StandInServer:
+    # Minimal stand-in for the Java SocketGameEvent receiver: accepts role 6
+    # (one GrpcGameEvent per frame) and role 7 (GrpcGameEventBatch) connections
+    # and parses every length-prefixed frame.
+
+    def __init__(self, host, port, verbose=False):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(8)
+        self.port = self.sock.getsockname()[1]
+        self.verbose = verbose
+        self.received = 0
+        self.frames = 0
+        self.parse_errors = 0
+
+    def serve_forever(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _recv_exact(self, client, n):
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = client.recv(n - len(buf))
+            if not chunk:
+                return None
+            buf += chunk
+        return bytes(buf)
+
+    def _handle(self, client):
+        with client:
+            role = self._recv_exact(client, 1)
+            if role not in (b'\x06', b'\x07'):
+                return
+            batched = role == b'\x07'
+            while True:
+                header = self._recv_exact(client, 4)
+                if header is None:
+                    return
+                data = self._recv_exact(client, struct.unpack('<I', header)[0])
+                if data is None:
+                    return
+                try:
+                    if batched:
+                        events = message_pb2.GrpcGameEventBatch.FromString(data).events
+                    else:
+                        events = [message_pb2.GrpcGameEvent.FromString(data)]
+                except Exception:
+                    self.parse_errors += 1
+                    continue
+                self.received += len(events)
+                self.frames += 1
+                if self.verbose:
+                    for event in events:
+                        print(f"Recv: ID={event.event_id}, Type={event.event_type}, X={event.x}, Y={event.y}, Term={event.terminate}")
+
+    def close(self):
+        self.sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay spawn_log.jsonl / journal traffic against the game event socket.")
+    parser.add_argument("log", nargs="?", help="spawn_log.jsonl or journal file (.gz ok)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=31415)
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale; 1 = original timing, 0 = as fast as possible")
+    parser.add_argument("--max-gap", type=float, default=2.0,
+                        help="clamp idle gaps between recorded events to this many seconds (0 = keep)")
+    parser.add_argument("--loop", type=int, default=1, help="replay the file this many times")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many events")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="events per GrpcGameEventBatch frame (role 7); 1 = one event per frame (role 6)")
+    parser.add_argument("--local", action="store_true", help="replay against an in-process stand-in receiver")
+    parser.add_argument("--serve", action="store_true", help="only run the stand-in receiver")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        server = StandInServer(args.host, args.port, verbose=args.verbose)
+        print(f"Stand-in game event receiver on {args.host}:{server.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            print(json.dumps({"received": server.received, "frames": server.frames,
+                              "parse_errors": server.parse_errors}))
+        return 0
+
+    if not args.log:
+        parser.error("a log file is required unless --serve is given")
+
+    server = None
+    host, port = args.host, args.port
+    if args.local:
+        server = StandInServer("127.0.0.1", 0, verbose=args.verbose)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = "127.0.0.1", server.port
+
+    report = replay(args.log, host, port, args.speed, max(1, args.loop), args.limit, args.max_gap, max(1, args.batch))
+
+    if server is not None:
+        # Let the receiver drain what is still in flight
+        deadline = time.time() + 5
+        while server.received < report["events"] and server.frames + server.parse_errors < report["frames"] \
+                and time.time() < deadline:
+            time.sleep(0.01)
+        report["received"] = server.received
+        report["parse_errors"] = server.parse_errors
+        server.close()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())